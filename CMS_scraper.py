@@ -1,27 +1,66 @@
 import os
 import json
+import asyncio
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 from config_loader import get_config
+from crawl_scheduler import fetch, navigate_async
+from forensics import close_context, get_forensics, open_context
+from locations import matches_location
+from resilience import ScrapeError
+from selector_cache import get_selector_cache
+from snapshots import capture, capture_enabled
 import logging
 
 # Load environment variables
 load_dotenv()
-NETID = os.getenv("KELLOGG_NETID") or os.getenv("UNIVERSITY_USERNAME")
-PASSWORD = os.getenv("KELLOGG_PASS") or os.getenv("UNIVERSITY_PASSWORD")
-
 logger = logging.getLogger(__name__)
 
-assert NETID, "❌ NETID not found in .env"
-assert PASSWORD, "❌ PASSWORD not found in .env"
-
-
-def debug_page_structure(page):
+BASE_URL = "https://kellogg-northwestern.12twenty.com"
+SSO_URL = "https://12twenty-sso.kellogg.northwestern.edu/"
+# JSON endpoint behind the postings table; override with scrapers.cms.api_url
+DEFAULT_API_URL = BASE_URL + "/api/v2/jobPostings?pageNumber={page}&pageSize={page_size}"
+
+# Fallback chains for postings table cells, most specific first. The *_FALLBACKS match
+# almost any row, so they are tried last and never learned by the selector cache.
+TITLE_SELECTORS = [
+    "span.primary-item-text",
+    "a.job-title",
+    "[class*='title']"
+]
+TITLE_FALLBACKS = [
+    "span",
+    "a",
+    "td:first-child span",
+    "td:first-child a"
+]
+LINK_SELECTORS = [
+    "a.job-title"
+]
+LINK_FALLBACKS = [
+    "a",
+    "td a"
+]
+
+
+
+def get_credentials():
+    """Read 12twenty credentials at run time so importing this module never fails"""
+    netid = os.getenv("KELLOGG_NETID") or os.getenv("UNIVERSITY_USERNAME")
+    password = os.getenv("KELLOGG_PASS") or os.getenv("UNIVERSITY_PASSWORD")
+    if not netid:
+        raise RuntimeError("❌ NETID not found in .env")
+    if not password:
+        raise RuntimeError("❌ PASSWORD not found in .env")
+    return netid, password
+
+
+async def debug_page_structure(page):
     """Debug function to inspect the page structure"""
     logger.debug("🔍 DEBUGGING PAGE STRUCTURE:")
 
     # Check if table exists
-    table = page.query_selector("table#jobPostingsContent")
+    table = await page.query_selector("table#jobPostingsContent")
     if table:
         logger.debug("✅ Found table#jobPostingsContent")
     else:
@@ -38,24 +77,24 @@ def debug_page_structure(page):
     ]
 
     for selector in possible_selectors:
-        rows = page.query_selector_all(selector)
+        rows = await page.query_selector_all(selector)
         logger.debug(f"🔍 Selector '{selector}': {len(rows)} elements found")
         if len(rows) > 0:
             # Print first row's HTML structure
-            first_row_html = rows[0].inner_html()
+            first_row_html = await rows[0].inner_html()
             logger.debug(f"   First row HTML: {first_row_html[:200]}...")
 
     # Check for title, company, location, and link elements in first few rows
-    all_rows = page.query_selector_all("tr")
+    all_rows = await page.query_selector_all("tr")
     logger.debug("🔍 Checking first 3 rows for all elements:")
     for i, row in enumerate(all_rows[:3]):
         logger.debug(f"Row {i+1}:")
 
         # Check all table cells
-        cells = row.query_selector_all("td")
+        cells = await row.query_selector_all("td")
         logger.debug(f"  📊 Found {len(cells)} table cells")
         for j, cell in enumerate(cells):
-            cell_text = cell.inner_text().strip()
+            cell_text = (await cell.inner_text()).strip()
             if cell_text:
                 logger.debug(f"    Cell {j+1}: '{cell_text[:50]}...'")
 
@@ -72,18 +111,18 @@ def debug_page_structure(page):
         for element_type, selectors in element_types.items():
             logger.debug(f"  🔍 {element_type.upper()} candidates:")
             for selector in selectors:
-                elements = row.query_selector_all(selector)
+                elements = await row.query_selector_all(selector)
                 if elements:
                     logger.debug(f"    {selector}: {len(elements)} found")
                     for k, el in enumerate(elements[:2]):  # Show first 2
-                        text = el.inner_text().strip()
+                        text = (await el.inner_text()).strip()
                         if text:
                             logger.debug(f"      [{k+1}] '{text[:50]}...'")
 
 
-def extract_company_and_location(row, title):
+async def extract_company_and_location(row, title):
     """Extract company and location from table row using intelligent analysis"""
-    cells = row.query_selector_all("td")
+    cells = await row.query_selector_all("td")
     company = "Unknown"
     location = "N/A"
 
@@ -93,7 +132,7 @@ def extract_company_and_location(row, title):
     # Analyze each cell to determine what it contains
     cell_data = []
     for i, cell in enumerate(cells):
-        text = cell.inner_text().strip()
+        text = (await cell.inner_text()).strip()
         if text and text != title:
             cell_data.append({
                 'index': i,
@@ -128,12 +167,12 @@ def extract_company_and_location(row, title):
     return company, location
 
 
-def scroll_to_load_all(page, row_selector="tr", pause=1500, max_scrolls=30):
+async def scroll_to_load_all(page, row_selector="tr", pause=1500, max_scrolls=30):
     """Scroll until all lazy-loaded rows are visible or max_scrolls reached."""
     last_count = 0
     for i in range(max_scrolls):
         # Count current rows
-        rows = page.query_selector_all(row_selector)
+        rows = await page.query_selector_all(row_selector)
         count = len(rows)
         logger.debug(f"Scroll {i+1}: found {count} rows")
 
@@ -144,136 +183,307 @@ def scroll_to_load_all(page, row_selector="tr", pause=1500, max_scrolls=30):
         last_count = count
 
         # Scroll to bottom and wait
-        page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-        page.wait_for_timeout(pause)
-
-    return page.query_selector_all(row_selector)
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        await page.wait_for_timeout(pause)
+
+    return await page.query_selector_all(row_selector)
+
+
+async def sso_login(page, netid, password):
+    """Log in through 12twenty SSO and open the job postings view"""
+    # Step 1: Navigate to 12twenty SSO
+    await navigate_async(page, SSO_URL)
+    await page.locator("p:has-text('Student Login')").click()
+
+    # Step 2: Login
+    await page.wait_for_selector("#txtUsername", timeout=15000)
+    await page.fill("#txtUsername", netid)
+    await page.fill("#txtPassword", password)
+    await page.click("#btnLogin")
+
+    # Step 3: Navigate to job postings
+    await navigate_async(page, f"{BASE_URL}/jobPostings")
+    await page.wait_for_selector("table#jobPostingsContent", timeout=20000)
+    logger.info("📄 Job postings table loaded successfully")
+
+
+async def login_and_scrape_async(on_job=None, row_concurrency=10):
+    """
+    Scrape 12twenty job postings. In "api" mode (scrapers.cms.mode) the browser is only
+    used for SSO and postings come from 12twenty's JSON endpoint; if that fails the run
+    falls back to reading the postings table in the browser.
+    """
+    settings = get_config().get_scraper_settings("cms")
+    if settings.get("mode", "browser") == "api":
+        try:
+            jobs = await scrape_postings_api(on_job, page_size=settings.get("page_size", 100),
+                                             concurrency=settings.get("api_concurrency", 4),
+                                             api_url=settings.get("api_url") or DEFAULT_API_URL)
+            # Armed by an earlier browser run; there's nothing to trace here, so don't leave it pending
+            get_forensics().disarm("cms")
+            return jobs
+        except (ScrapeError, OSError) as e:
+            logger.warning(f"⚠️ 12twenty API mode failed ({e}); falling back to the browser")
+    return await scrape_postings_table(on_job, row_concurrency)
 
 
-def login_and_scrape():
+async def scrape_postings_table(on_job=None, row_concurrency=10):
+    """Log in and scrape the job postings table with Playwright's async API"""
     jobs = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
-
-        # Step 1: Navigate to 12twenty SSO
-        page.goto("https://12twenty-sso.kellogg.northwestern.edu/")
-        page.locator("p:has-text('Student Login')").click()
-
-        # Step 2: Login
-        page.wait_for_selector("#txtUsername", timeout=15000)
-        page.fill("#txtUsername", NETID or "")
-        page.fill("#txtPassword", PASSWORD or "")
-        page.click("#btnLogin")
-
-        # Step 3: Navigate to job postings
-        page.goto("https://kellogg-northwestern.12twenty.com/jobPostings")
-        page.wait_for_selector("table#jobPostingsContent", timeout=20000)
-        logger.info("📄 Job postings table loaded successfully")
-
-        # DEBUG: Inspect page structure (only runs if log level is DEBUG)
-        if logger.isEnabledFor(logging.DEBUG):
-            debug_page_structure(page)
-
-        # Wait a bit more for dynamic content
-        page.wait_for_timeout(3000)
-
-        # Step 4: Scroll to load all rows (try different selectors)
-        possible_row_selectors = ["tr", "tbody tr", ".job-posting", "table tr"]
-        rows = []
-
-        for selector in possible_row_selectors:
-            rows = scroll_to_load_all(page, selector)
-            if len(rows) > 0:
-                logger.info(f"✅ Using selector '{selector}' - found {len(rows)} rows")
-                break
+    netid, password = get_credentials()
+    config = get_config()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        # Records a trace and HAR only if the last run went over its latency budget
+        context, forensic = await open_context(browser, "cms")
+        page = await context.new_page()
+        error = None
+
+        try:
+            await sso_login(page, netid, password)
+
+            # DEBUG: Inspect page structure (only runs if log level is DEBUG)
+            if logger.isEnabledFor(logging.DEBUG):
+                await debug_page_structure(page)
+
+            # Wait a bit more for dynamic content
+            await page.wait_for_timeout(3000)
+
+            # Step 4: Scroll to load all rows (try different selectors)
+            possible_row_selectors = ["tr", "tbody tr", ".job-posting", "table tr"]
+            rows = []
+
+            for selector in possible_row_selectors:
+                rows = await scroll_to_load_all(page, selector)
+                if len(rows) > 0:
+                    logger.info(f"✅ Using selector '{selector}' - found {len(rows)} rows")
+                    break
 
-        if not rows:
-            logger.error("❌ No rows found with any selector!")
-            browser.close()
-            return jobs
+            if not rows:
+                logger.error("❌ No rows found with any selector!")
+                return jobs
+
+            logger.info(f"Final row count: {len(rows)}")
+            if capture_enabled():
+                capture("cms", page.url, await page.content(), kind="dom")
+
+            # Step 5: Scrape job data with multiple selector attempts.
+            # Rows are parsed concurrently so their element round-trips overlap.
+            semaphore = asyncio.Semaphore(row_concurrency)
+
+            async def parse_row(i, row):
+                async with semaphore:
+                    job_data = await parse_job_row(row, i)
+                if job_data and config.matches_title_filter(job_data["title"]) and matches_location(job_data["location"]):
+                    jobs.append(job_data)
+                    if on_job:
+                        on_job(job_data)
+                    logger.info(f"  ✅ Added to jobs list: {job_data['title']}")
+                elif job_data:
+                    logger.debug("  ⏭️ Skipped (doesn't match filter)")
+
+            await asyncio.gather(*(parse_row(i, row) for i, row in enumerate(rows)))
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            # Failed runs keep their hit/miss counts too
+            get_selector_cache().flush("cms")
+            await close_context(context, forensic, error)
+            await browser.close()
+    return jobs
 
-        logger.info(f"Final row count: {len(rows)}")
-
-        # Step 5: Scrape job data with multiple selector attempts
-        for i, row in enumerate(rows):
-            logger.debug(f"🔍 Processing row {i+1}:")
-
-            # Try multiple selectors for title and link
-            title_selectors = [
-                "span.primary-item-text",
-                "a.job-title",
-                "span",
-                "a",
-                "[class*='title']",
-                "td:first-child span",
-                "td:first-child a"
-            ]
-
-            title_el = None
-            link_el = None
-
-            for selector in title_selectors:
-                title_el = row.query_selector(selector)
-                if title_el and title_el.inner_text().strip():
-                    title_text = title_el.inner_text().strip()[:50]
-                    logger.debug(f"  ✅ Found title with selector '{selector}': {title_text}...")
-                    break
 
-            # Look for link elements
-            link_selectors = [
-                "a.job-title",
-                "a",
-                "td a"
-            ]
-
-            for selector in link_selectors:
-                link_el = row.query_selector(selector)
-                if link_el and link_el.get_attribute("href"):
-                    logger.debug(f"  ✅ Found link with selector '{selector}'")
-                    break
+async def parse_job_row(row, i=0):
+    """Extract title, company, location and URL from one postings table row"""
+    logger.debug(f"🔍 Processing row {i+1}:")
+
+    cache = get_selector_cache()
+
+    async def find_title(selector):
+        el = await row.query_selector(selector)
+        if el and (await el.inner_text()).strip():
+            logger.debug(f"  ✅ Found title with selector '{selector}'")
+            return el
+        return None
+
+    async def find_link(selector):
+        el = await row.query_selector(selector)
+        if el and await el.get_attribute("href"):
+            logger.debug(f"  ✅ Found link with selector '{selector}'")
+            return el
+        return None
+
+    # The selector that worked last time is tried first; the rest only on a miss
+    title_el = await cache.first_match("cms", "title", TITLE_SELECTORS, find_title, TITLE_FALLBACKS)
+    link_el = await cache.first_match("cms", "link", LINK_SELECTORS, find_link, LINK_FALLBACKS)
+
+    if not title_el:
+        logger.debug(f"  ❌ Skipping row {i+1} - missing title")
+        return None
+
+    title = (await title_el.inner_text()).strip()
+    href = await link_el.get_attribute("href") if link_el else None
+
+    # Extract company and location using intelligent analysis
+    company, location = await extract_company_and_location(row, title)
 
-            if not title_el:
-                logger.debug(f"  ❌ Skipping row {i+1} - missing title")
-                continue
-
-            title = title_el.inner_text().strip()
-            href = link_el.get_attribute("href") if link_el else None
-
-            # Extract company and location using intelligent analysis
-            company, location = extract_company_and_location(row, title)
-
-            logger.debug(f"  📝 Title: {title}")
-            logger.debug(f"  🏢 Company: {company}")
-            logger.debug(f"  📍 Location: {location}")
-            if href:
-                logger.debug(f"  🔗 Link: {href}")
-            else:
-                logger.debug(f"  ⚠️ No link found for this job")
-
-            # Filter by keywords using config
-            config = get_config()
-            if config.matches_title_filter(title):
-                job_data = {
-                    "title": title,
-                    "company": company,
-                    "location": location
-                }
-                # Only add URL if href is available
-                if href:
-                    job_data["url"] = f"https://kellogg-northwestern.12twenty.com{href}"
-                else:
-                    job_data["url"] = ""
-
-                jobs.append(job_data)
-                logger.info(f"  ✅ Added to jobs list: {title}")
-            else:
-                logger.debug("  ⏭️ Skipped (doesn't match filter)")
-
-        browser.close()
+    logger.debug(f"  📝 Title: {title}")
+    logger.debug(f"  🏢 Company: {company}")
+    logger.debug(f"  📍 Location: {location}")
+    if href:
+        logger.debug(f"  🔗 Link: {href}")
+    else:
+        logger.debug(f"  ⚠️ No link found for this job")
+
+    job_data = {
+        "title": title,
+        "company": company,
+        "location": location
+    }
+    # Only add URL if href is available
+    if href:
+        job_data["url"] = f"{BASE_URL}{href}"
+    else:
+        job_data["url"] = ""
+    return job_data
+
+
+MAX_API_PAGES = 50
+
+# Field names 12twenty uses in its postings JSON (they vary between API versions)
+_API_LIST_KEYS = ("Items", "items", "Results", "results", "Data", "data", "JobPostings")
+_API_TOTAL_KEYS = ("TotalCount", "totalCount", "Total", "total", "TotalItems")
+_API_FIELDS = {
+    "id": ("Id", "id", "JobPostingId", "jobPostingId"),
+    "title": ("JobTitle", "jobTitle", "Title", "title", "Name", "name"),
+    "company": ("EmployerName", "employerName", "CompanyName", "companyName", "Employer", "Company"),
+    "location": ("Location", "location", "Locations", "locations", "City", "city"),
+}
+
+
+def _first(record, keys):
+    for key in keys:
+        value = record.get(key)
+        if value not in (None, "", []):
+            return value
+    return None
+
+
+def _text(value):
+    """Flatten the nested shapes 12twenty uses for names and locations"""
+    if isinstance(value, dict):
+        return _text(_first(value, ("Name", "name", "DisplayName", "displayName", "Text", "text")) or "")
+    if isinstance(value, list):
+        return "; ".join(filter(None, (_text(item) for item in value)))
+    return str(value or "").strip()
+
+
+def parse_postings_page(data):
+    """Turn one page of postings JSON into (jobs, total count or None)"""
+    records = data if isinstance(data, list) else _first(data, _API_LIST_KEYS)
+    if not isinstance(records, list):
+        raise ScrapeError(f"unexpected 12twenty postings JSON: keys {sorted(data)[:10] if isinstance(data, dict) else type(data).__name__}")
+    total = None if isinstance(data, list) else _first(data, _API_TOTAL_KEYS)
+
+    jobs = []
+    for record in records:
+        title = _text(_first(record, _API_FIELDS["title"]))
+        if not title:
+            continue
+        posting_id = _first(record, _API_FIELDS["id"])
+        jobs.append({
+            "title": title,
+            "company": _text(_first(record, _API_FIELDS["company"])) or "Unknown",
+            "location": _text(_first(record, _API_FIELDS["location"])) or "N/A",
+            "url": f"{BASE_URL}/jobPostings/{posting_id}" if posting_id else "",
+        })
+    return jobs, int(total) if total is not None else None
+
+
+async def sso_cookies(netid, password):
+    """Run SSO in a throwaway browser and return its cookies; the browser closes right after"""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        try:
+            context = await browser.new_context()
+            page = await context.new_page()
+            await sso_login(page, netid, password)
+            cookies = await context.cookies()
+            user_agent = await page.evaluate("navigator.userAgent")
+        finally:
+            await browser.close()
+    logger.info(f"🍪 SSO complete; browser closed with {len(cookies)} cookies handed to HTTP")
+    return cookies, user_agent
+
+
+async def scrape_postings_api(on_job=None, page_size=100, concurrency=4, api_url=DEFAULT_API_URL):
+    """
+    Log in with the browser, then page through the postings JSON endpoint over the shared
+    HTTP session, fetching pages concurrently once the first page reveals the total
+    """
+    import requests
+
+    netid, password = get_credentials()
+    cookies, user_agent = await sso_cookies(netid, password)
+    jar = requests.cookies.RequestsCookieJar()
+    for cookie in cookies:
+        jar.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+    headers = {
+        "Accept": "application/json",
+        "X-Requested-With": "XMLHttpRequest",
+        "User-Agent": user_agent,
+        "Referer": f"{BASE_URL}/jobPostings",
+    }
+
+    def get_page(page_number):
+        response = fetch(api_url.format(page=page_number, page_size=page_size), cookies=jar, headers=headers,
+                         allow_redirects=False, timeout=30)
+        if response.status_code != 200:
+            raise ScrapeError(f"12twenty postings API returned {response.status_code} for page {page_number}")
+        try:
+            return parse_postings_page(response.json())
+        except ValueError as e:
+            raise ScrapeError(f"12twenty postings API returned non-JSON for page {page_number}") from e
+
+    first_jobs, total = await asyncio.to_thread(get_page, 1)
+    pages = [first_jobs]
+    if total is not None and total > page_size:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def get_page_async(page_number):
+            async with semaphore:
+                return await asyncio.to_thread(get_page, page_number)
+
+        last_page = (total + page_size - 1) // page_size
+        pages += await asyncio.gather(*(get_page_async(n) for n in range(2, last_page + 1)))
+    elif total is None and len(first_jobs) >= page_size:
+        # No total in the response: keep paging until a short page
+        page_number = 2
+        while page_number <= MAX_API_PAGES:
+            page_jobs, _ = await asyncio.to_thread(get_page, page_number)
+            pages.append(page_jobs)
+            if len(page_jobs) < page_size:
+                break
+            page_number += 1
+
+    config = get_config()
+    jobs = []
+    for job in (job for page_jobs in pages for job in page_jobs):
+        if config.matches_title_filter(job["title"]) and matches_location(job["location"]):
+            jobs.append(job)
+            if on_job:
+                on_job(job)
+            logger.info(f"  ✅ Added to jobs list: {job['title']}")
+    logger.info(f"📡 12twenty API: {sum(len(p) for p in pages)} postings in {len(pages)} pages, {len(jobs)} matched")
     return jobs
 
 
+def login_and_scrape():
+    """Synchronous entry point: runs the async scraper on its own event loop"""
+    return asyncio.run(login_and_scrape_async())
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     results = login_and_scrape()
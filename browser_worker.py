@@ -0,0 +1,360 @@
+"""
+Supervised worker processes for browser-based sources
+Chromium runs inside a separate worker process so a leaking or hung page can't bloat or
+block the API process. Workers are killed on timeout or when their process tree exceeds
+a memory limit, recycled after a number of runs, and stream results back over a pipe.
+Inside a worker, sources with an async entry point share one event loop and run concurrently
+"""
+import os
+import time
+import asyncio
+import queue
+import signal
+import logging
+import threading
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+# Extra time the parent allows past the slowest source's own timeout before killing the worker
+KILL_GRACE_SECONDS = 15
+
+
+class WorkerError(Exception):
+    """Raised when a worker run fails, crashes or is killed"""
+
+
+class WorkerTimeoutError(WorkerError):
+    """Raised when a worker run exceeds its timeout and is killed"""
+
+
+class WorkerMemoryError(WorkerError):
+    """Raised when a worker's process tree exceeds its memory limit and is killed"""
+
+
+# Process tree inspection (Linux /proc; other platforms run without memory limits)
+def _children_map() -> Dict[int, List[int]]:
+    children: Dict[int, List[int]] = {}
+    try:
+        pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError:
+        return children
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat", "r") as f:
+                # The command name may contain spaces, so split after its closing paren
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(pid)
+    return children
+
+
+def process_tree(pid: int) -> List[int]:
+    """The pid and all of its descendants (Chromium runs as a grandchild of the worker)"""
+    children = _children_map()
+    tree, stack = [], [pid]
+    while stack:
+        current = stack.pop()
+        tree.append(current)
+        stack.extend(children.get(current, []))
+    return tree
+
+
+def _status_rss(pid: int) -> int:
+    with open(f"/proc/{pid}/status", "r") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    return 0
+
+
+def rss_bytes(pids: List[int]) -> int:
+    """
+    Memory of the given processes, as PSS: each shared page is split between the processes
+    mapping it. Summed RSS would count Chromium's shared pages once per renderer and kill
+    workers early. Falls back to RSS where smaps_rollup is unavailable (kernels before 4.14).
+    """
+    total = 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1]) * 1024
+                        break
+        except FileNotFoundError:
+            try:
+                total += _status_rss(pid)
+            except (OSError, ValueError):
+                continue
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+def _kill_tree(pid: int):
+    for child in reversed(process_tree(pid)):
+        try:
+            os.kill(child, signal.SIGKILL)
+        except (OSError, AttributeError):
+            pass
+
+
+async def _run_task(conn, sources: List[Dict[str, Any]]):
+    """Run a task's sources concurrently on one event loop, tagging every message with its source"""
+    from sources import load_async_source, load_source
+
+    async def run_one(name: str, timeout: float):
+        started = time.monotonic()
+        sent = set()
+
+        def emit(job):
+            job.setdefault("source", name)
+            sent.add(id(job))
+            conn.send(("job", name, job))
+
+        try:
+            func = load_async_source(name)
+            if func is not None:
+                jobs = await asyncio.wait_for(func(on_job=emit), timeout)
+            else:
+                jobs = await asyncio.wait_for(asyncio.to_thread(load_source(name)), timeout)
+            jobs = jobs or []
+            for job in jobs:
+                if id(job) not in sent:
+                    emit(job)
+            from crawl_scheduler import get_crawl_scheduler
+            # The worker has its own crawl scheduler; its stats ride along so /health can show them
+            conn.send(("done", name, {"count": len(jobs), "duration": round(time.monotonic() - started, 2),
+                                      "crawl": get_crawl_scheduler().stats()}))
+        except asyncio.TimeoutError:
+            conn.send(("timeout", name, f"timed out after {timeout}s"))
+        except Exception as e:
+            logging.getLogger(__name__).exception(f"❌ Worker run of '{name}' failed: {e}")
+            conn.send(("error", name, f"{type(e).__name__}: {e}"))
+
+    await asyncio.gather(*(run_one(source["name"], source["timeout"]) for source in sources))
+
+
+def _worker_main(conn, log_level: str):
+    """Entry point of a worker process: run sources on request and stream their jobs back"""
+    logging.basicConfig(level=getattr(logging, log_level, logging.INFO))
+
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        asyncio.run(_run_task(conn, task["sources"]))
+
+
+class _Worker:
+    """One worker process and the parent's end of its pipe"""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, os.getenv("LOG_LEVEL", "INFO")),
+            name="jobbot-browser-worker",
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+        self.runs = 0
+
+    @property
+    def alive(self) -> bool:
+        return self.process.is_alive()
+
+    def kill(self):
+        if self.process.pid and self.alive:
+            _kill_tree(self.process.pid)
+        self.process.join(timeout=5)
+        self.conn.close()
+
+    def stop(self):
+        """Ask the worker to exit after its current task, killing it if it won't"""
+        try:
+            self.conn.send(None)
+            self.process.join(timeout=10)
+        except (OSError, EOFError, BrokenPipeError):
+            pass
+        if self.alive:
+            self.kill()
+        else:
+            self.conn.close()
+
+
+class BrowserWorkerPool:
+    """A small pool of supervised worker processes for browser sources"""
+
+    def __init__(self, size: int = 1, max_rss_mb: float = 400, max_runs_per_worker: int = 5,
+                 poll_interval: float = 0.5, memory_check_interval: float = 2.0):
+        # spawn, not fork: the parent has scheduler threads and an event loop we must not clone
+        self._ctx = multiprocessing.get_context("spawn")
+        self.size = max(1, int(size))
+        self.max_rss = int(max_rss_mb * 1024 * 1024) if max_rss_mb else 0
+        self.max_runs_per_worker = max(1, int(max_runs_per_worker))
+        self.poll_interval = poll_interval
+        self.memory_check_interval = memory_check_interval
+        self._idle: "queue.Queue[Optional[_Worker]]" = queue.Queue()
+        for _ in range(self.size):
+            self._idle.put(None)  # Workers are started lazily on first use
+        self.last_runs: Dict[str, Dict[str, Any]] = {}
+        # Per-domain crawl stats of the most recent worker (cumulative over that worker's lifetime)
+        self.crawl_stats: Dict[str, Dict[str, Any]] = {}
+
+    def run(self, name: str, timeout: float,
+            on_job: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+        """Run a source in a worker; returns (jobs, stats) where stats includes peak_rss_mb"""
+        outcomes, stats = self.run_batch({name: timeout}, on_job and (lambda _, job: on_job(job)))
+        outcome = outcomes[name]
+        if outcome["status"] == "timeout":
+            raise WorkerTimeoutError(outcome["error"])
+        if outcome["status"] == "memory":
+            raise WorkerMemoryError(outcome["error"])
+        if outcome["status"] == "error":
+            raise WorkerError(outcome["error"])
+        return outcome["jobs"], stats
+
+    def run_batch(self, timeouts: Dict[str, float],
+                  on_job: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        """
+        Run several sources concurrently in one worker, sharing a single event loop and browser
+        process budget. Returns ({name: {"status", "jobs", "error", "duration"}}, stats); status is one of
+        "ok", "error", "timeout" or "memory". Each source keeps its own timeout inside the worker;
+        the worker is killed if the slowest one overruns it. on_job(name, job) is called as jobs stream in.
+        """
+        worker = self._idle.get()
+        try:
+            if worker is None or not worker.alive:
+                worker = _Worker(self._ctx)
+            outcomes, stats = self._supervise(worker, timeouts, on_job)
+            if worker.alive:
+                worker.runs += 1
+                if worker.runs >= self.max_runs_per_worker:
+                    logger.info(f"♻️ Recycling browser worker after {worker.runs} runs")
+                    worker.stop()
+                    worker = None
+            else:
+                # A killed or crashed worker is replaced next time
+                worker = None
+            return outcomes, stats
+        finally:
+            self._idle.put(worker)
+
+    def _supervise(self, worker: _Worker, timeouts: Dict[str, float], on_job) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, Any]]:
+        started = time.monotonic()
+        deadline = max(timeouts.values()) + KILL_GRACE_SECONDS
+        peak = 0
+        outcomes = {name: {"status": "ok", "jobs": [], "error": None, "duration": 0.0} for name in timeouts}
+        pending = set(timeouts)
+        stats: Dict[str, Any] = {}
+        worker.conn.send({"sources": [{"name": name, "timeout": timeout} for name, timeout in timeouts.items()]})
+
+        def finish(status: Optional[str] = None, error: Optional[str] = None):
+            # Sources still running when the worker dies share its fate
+            for name in pending:
+                outcomes[name].update(status=status, error=error, duration=round(time.monotonic() - started, 2))
+            stats.update({
+                "peak_rss_mb": round(peak / (1024 * 1024), 1),
+                "duration": round(time.monotonic() - started, 2),
+                "worker_pid": worker.process.pid,
+            })
+            for name in timeouts:
+                self.last_runs[name] = dict(stats, status=outcomes[name]["status"], source_duration=outcomes[name]["duration"])
+            return outcomes, stats
+
+        last_check = 0.0
+        while pending:
+            # Walking /proc costs a scan of every process, so memory is sampled on an interval, not per message
+            if time.monotonic() - last_check >= self.memory_check_interval:
+                last_check = time.monotonic()
+                current = rss_bytes(process_tree(worker.process.pid))
+                peak = max(peak, current)
+                if self.max_rss and current > self.max_rss:
+                    worker.kill()
+                    return finish("memory", f"worker exceeded {self.max_rss // (1024 * 1024)} MB "
+                                            f"({current // (1024 * 1024)} MB PSS); killed")
+            if time.monotonic() - started > deadline:
+                worker.kill()
+                return finish("timeout", f"timed out after {deadline}s; worker killed")
+
+            try:
+                if not worker.conn.poll(self.poll_interval):
+                    if not worker.alive:
+                        return finish("error", f"worker exited unexpectedly (exit code {worker.process.exitcode})")
+                    continue
+                kind, name, payload = worker.conn.recv()
+            except (EOFError, OSError) as e:
+                worker.kill()
+                return finish("error", f"lost connection to worker: {e}")
+
+            if kind == "job":
+                outcomes[name]["jobs"].append(payload)
+                if on_job:
+                    on_job(name, payload)
+                continue
+            pending.discard(name)
+            # Each source's own wall time, not the whole task's, so one slow source doesn't skew the others
+            if kind == "done":
+                outcomes[name]["duration"] = payload["duration"]
+                self.crawl_stats = payload.get("crawl", self.crawl_stats)
+                logger.info(f"🧠 {name} worker run: {len(outcomes[name]['jobs'])} jobs in {payload['duration']}s")
+            else:
+                outcomes[name].update(status=kind, error=payload, duration=round(time.monotonic() - started, 2))
+
+        finish()
+        if any(outcome["status"] == "timeout" for outcome in outcomes.values()):
+            # A timed-out sync source leaves its thread running, and asyncio.run() would wait for it
+            # on shutdown; a timed-out browser run may leave Chromium behind. Start from a fresh worker.
+            logger.info("♻️ Killing browser worker after a timed-out source")
+            worker.kill()
+        logger.info(f"🧠 Worker task ({', '.join(timeouts)}) finished, peak RSS {stats['peak_rss_mb']} MB")
+        return outcomes, stats
+
+    def shutdown(self):
+        """Stop all idle workers"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if worker is not None:
+                worker.stop()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": self.size, "last_runs": dict(self.last_runs), "crawl": dict(self.crawl_stats)}
+
+
+_pool: Optional[BrowserWorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserWorkerPool:
+    """Get the process-wide browser worker pool (singleton pattern)"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            settings = get_config().get_browser_worker_settings()
+            _pool = BrowserWorkerPool(
+                size=settings.get("pool_size", 1),
+                max_rss_mb=settings.get("max_rss_mb", 400),
+                max_runs_per_worker=settings.get("max_runs_per_worker", 5),
+                poll_interval=settings.get("poll_interval", 0.5),
+                memory_check_interval=settings.get("memory_check_interval", 2.0),
+            )
+        return _pool
+
+
+def shutdown_browser_pool():
+    """Stop the pool's workers if it was ever started"""
+    if _pool is not None:
+        _pool.shutdown()
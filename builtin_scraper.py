@@ -1,25 +1,102 @@
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from config_loader import get_config
+from crawl_scheduler import fetch
+from locations import matches_location
+from search_queries import run_queries, search_urls
+from snapshots import capture
+from structured_data import extract_job_postings
+from job_record import is_missing, normalize_text
+import re
 import logging
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_URL = "https://builtin.com/jobs/hybrid/office/product?search=Product+Manager%2C+Intern&country=USA&allLocations=true"
+
+
 def scrape_builtin_pm_internships():
-    config = get_config()
-    url = config.get_scraper_url("builtin")
+    """Run every configured BuiltIn query concurrently and keep in-area jobs"""
+    settings = get_config().get_scraper_settings("builtin")
+    urls = search_urls("builtin", DEFAULT_URL)
+    jobs = run_queries("builtin", urls, search_builtin, settings.get("max_concurrent_queries", 3))
+    return filter_jobs(jobs)
+
+
+def filter_jobs(jobs):
+    """Keep the merged search results that are in a configured location"""
+    kept = []
+    for job in jobs:
+        if not matches_location(job["location"]):
+            logger.debug(f"⏭️ Skipped {job['title']} (outside configured locations: {job['location']})")
+            continue
+        kept.append(job)
+        logger.info(f"✅ {job['title']} at {job['company']}")
+        logger.info(f"📍 {job['location']}")
+        if job["url"]:
+            logger.info(f"🔗 {job['url']}")
+        else:
+            logger.warning(f"⚠️ No URL available")
+    return kept
+
+
+def search_builtin(url):
+    """Fetch one BuiltIn search page and return its job cards, unfiltered"""
+    response = fetch(url, timeout=30)
+    response.raise_for_status()
+    capture("builtin", url, response.text)
+    return parse_search_page(response.text)
+
+
+_JOB_CARD = re.compile(r"""data-id\s*=\s*["']job-card["']""")
 
-    if not url:
-        logger.warning("⚠️ BuiltIn scraper URL not configured, using default")
-        url = "https://builtin.com/jobs/hybrid/office/product?search=Product+Manager%2C+Intern&country=USA&allLocations=true"
 
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
+def parse_search_page(html):
+    """Job cards from a BuiltIn search page's HTML (live or a stored snapshot)"""
+    # Embedded JobPosting data is exact and needs no DOM. The cards are parsed as well when the
+    # page has more cards than postings, or postings without a URL, and the two are merged.
+    postings = [{**posting, "url": urljoin("https://builtin.com", posting["url"]) if posting["url"] else ""}
+                for posting in extract_job_postings(html) if posting["title"]]
+    if postings and all(posting["url"] for posting in postings) and len(_JOB_CARD.findall(html)) <= len(postings):
+        logger.info(f"🔍 Found {len(postings)} jobs in structured data")
+        jobs = postings
+    else:
+        cards = parse_job_cards(html)
+        jobs = merge_cards(postings, cards)
+        if postings:
+            logger.info(f"🔍 Found {len(jobs)} jobs ({len(postings)} in structured data, {len(cards)} cards)")
+    return [{**job, "company": job["company"] or "Unknown", "location": job["location"] or "N/A"} for job in jobs]
 
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
+
+def merge_cards(postings, cards):
+    """
+    Structured postings plus the cards that have none, matched by URL or else by title and company
+    A field missing from a posting is filled from its card.
+    """
+    merged = [dict(posting) for posting in postings]
+    by_url = {job["url"]: job for job in merged if job["url"]}
+    # A posting with no company is keyed on its title alone, so any card with that title matches it
+    by_name = {}
+    for job in merged:
+        by_name.setdefault((normalize_text(job["title"]), normalize_text(job["company"])), job)
+
+    for card in cards:
+        card = {key: "" if is_missing(value) else value for key, value in card.items()}
+        match = (by_url.get(card["url"]) if card["url"] else None) \
+            or by_name.get((normalize_text(card["title"]), normalize_text(card["company"]))) \
+            or by_name.get((normalize_text(card["title"]), ""))
+        if match is None:
+            merged.append(card)
+            continue
+        for key, value in card.items():
+            if value and not match.get(key):
+                match[key] = value
+    return merged
+
+
+def parse_job_cards(html):
+    """Jobs read from the search page's job card markup"""
+    soup = BeautifulSoup(html, "html.parser")
 
     jobs = []
     listings = soup.select('div[data-id="job-card"]')
@@ -49,25 +126,17 @@ def scrape_builtin_pm_internships():
             if tooltip:
                 tooltip_html = tooltip.get('data-bs-title', '')
                 locations_soup = BeautifulSoup(tooltip_html, 'html.parser')
-                location = ', '.join([div.text for div in locations_soup.select('div')])
+                # One location per div; "; " keeps "City, ST" pairs apart for the location parser
+                location = '; '.join([div.text.strip() for div in locations_soup.select('div')])
             else:
                 location = "N/A"
 
-            job = {
+            jobs.append({
                 "title": title,
                 "company": company,
                 "location": location,
                 "url": job_url
-            }
-
-            jobs.append(job)
-
-            logger.info(f"✅ {title} at {company}")
-            logger.info(f"📍 {location}")
-            if job_url:
-                logger.info(f"🔗 {job_url}")
-            else:
-                logger.warning(f"⚠️ No URL available")
+            })
 
         except Exception as e:
             logger.error(f"❌ Error parsing job: {e}")
@@ -1,9 +1,10 @@
 """
 Configuration loader for JobBot
-Loads and validates configuration from config.yaml
+Loads and validates configuration from config.yaml (plus an optional overrides file)
 """
 import os
 import yaml
+from urllib.parse import quote_plus
 import logging
 from typing import Dict, List, Any
 
@@ -13,9 +14,11 @@ logger = logging.getLogger(__name__)
 class Config:
     """Configuration manager for JobBot"""
 
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", overrides_path: str = ""):
         self.config_path = config_path
         self._config = self._load_config()
+        if overrides_path:
+            self._config = _merged(self._config, self._load_overrides(overrides_path))
 
     def _load_config(self) -> Dict[str, Any]:
         """Load configuration from YAML file"""
@@ -30,6 +33,17 @@ class Config:
             logger.warning("⚠️ Using default configuration.")
             return self._default_config()
 
+    def _load_overrides(self, path: str) -> Dict[str, Any]:
+        """Load a YAML file of settings that replace the matching keys of the main config"""
+        try:
+            with open(path, 'r') as f:
+                overrides = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            logger.error(f"❌ Error loading config overrides {path}: {e}")
+            return {}
+        logger.info(f"🧩 Applied config overrides from {path}")
+        return overrides
+
     def _default_config(self) -> Dict[str, Any]:
         """Return default configuration if config file is missing"""
         return {
@@ -94,6 +108,10 @@ class Config:
         """Get remote work preferences"""
         return self._config.get("job_search", {}).get("remote_preferences", ["onsite", "hybrid"])
 
+    def location_filter_enabled(self) -> bool:
+        """Whether scrapers drop jobs outside job_search.locations / remote_preferences"""
+        return bool(self._config.get("job_search", {}).get("filter_by_location", False))
+
     # Scraper Configuration
     def is_scraper_enabled(self, scraper_name: str) -> bool:
         """Check if a scraper is enabled"""
@@ -103,11 +121,89 @@ class Config:
         """Get the search URL for a scraper"""
         return self._config.get("scrapers", {}).get(scraper_name, {}).get("search_url", "")
 
+    def get_scraper_urls(self, scraper_name: str) -> List[str]:
+        """
+        Get every search URL for a scraper: its `search_urls`, plus `search_url_template` filled
+        with each of `queries` (default: one query per title keyword group). Falls back to the
+        single `search_url`.
+        """
+        settings = self.get_scraper_settings(scraper_name)
+        urls = list(settings.get("search_urls") or [])
+        template = settings.get("search_url_template")
+        if template:
+            queries = settings.get("queries") or [
+                " ".join(group.get("keywords", [])) for group in self.get_title_keywords()
+            ]
+            urls += [template.replace("{query}", quote_plus(query)) for query in queries if query.strip()]
+        if not urls and settings.get("search_url"):
+            urls = [settings["search_url"]]
+        return list(dict.fromkeys(urls))
+
+    def get_scraper_names(self) -> List[str]:
+        """Get the names of all scrapers declared in config"""
+        return list(self._config.get("scrapers", {}).keys())
+
+    def get_scraper_settings(self, scraper_name: str) -> Dict[str, Any]:
+        """Get the full settings block for a scraper"""
+        return self._config.get("scrapers", {}).get(scraper_name, {}) or {}
+
+    # Crawl Configuration
+    def get_crawl_settings(self) -> Dict[str, Any]:
+        """Get per-domain politeness budgets for the crawl scheduler"""
+        return self._config.get("crawl", {}) or {}
+
+    def get_browser_worker_settings(self) -> Dict[str, Any]:
+        """Get settings for the browser worker process pool"""
+        return self._config.get("browser_worker", {}) or {}
+
+    # Storage Configuration
+    def get_data_dir(self) -> str:
+        """Get the directory for local state (breaker state, caches, indexes), creating it if needed"""
+        path = os.getenv("JOBBOT_DATA_DIR") or self._config.get("storage", {}).get("data_dir", "data")
+        os.makedirs(path, exist_ok=True)
+        return path
+
+    def get_history_settings(self) -> Dict[str, Any]:
+        """Get settings for the Parquet run history (enabled, compact_after_days)"""
+        return self._config.get("storage", {}).get("history", {}) or {}
+
+    def get_outbox_settings(self) -> Dict[str, Any]:
+        """Get settings for the durable Notion outbox (park_after_hours, retry)"""
+        return self._config.get("storage", {}).get("outbox", {}) or {}
+
+    def get_event_settings(self) -> Dict[str, Any]:
+        """Get settings for the /events stream (buffer_size, keepalive_seconds)"""
+        return self._config.get("events", {}) or {}
+
+    def get_forensics_settings(self) -> Dict[str, Any]:
+        """Get settings for slow-run trace/HAR capture (enabled, max_captures, max_total_mb)"""
+        return self._config.get("storage", {}).get("forensics", {}) or {}
+
+    def get_snapshot_settings(self) -> Dict[str, Any]:
+        """Get settings for the raw page snapshot archive (enabled, level)"""
+        return self._config.get("storage", {}).get("snapshots", {}) or {}
+
+    def get_sink_settings(self) -> Dict[str, Any]:
+        """Get settings for the job storage sink (backend, dsn, table, pool_size, notion_mirror)"""
+        return self._config.get("storage", {}).get("sink", {}) or {}
+
+    def get_liveness_settings(self) -> Dict[str, Any]:
+        """Get settings for the posting liveness sweeper"""
+        return self._config.get("liveness", {}) or {}
+
+    def get_data_path(self, filename: str) -> str:
+        """Get the path of a file inside the data directory"""
+        return os.path.join(self.get_data_dir(), filename)
+
     # Notion Configuration
     def get_notion_property(self, property_key: str) -> str:
         """Get Notion property name by key (title, company, location, url, date_added)"""
         return self._config.get("notion", {}).get("properties", {}).get(property_key, property_key.title())
 
+    def get_notion_mirror_settings(self) -> Dict[str, Any]:
+        """Get settings for the local Notion mirror (reconcile_hours, max_age_seconds)"""
+        return self._config.get("notion", {}).get("mirror", {}) or {}
+
     # Scheduler Configuration
     def get_cron_schedule(self) -> str:
         """Get cron schedule expression"""
@@ -117,6 +213,25 @@ class Config:
         """Get scheduler timezone"""
         return self._config.get("scheduler", {}).get("timezone", "America/New_York")
 
+    def get_scheduler_settings(self) -> Dict[str, Any]:
+        """Get the full scheduler block (tick, stagger and default per-source schedule)"""
+        return self._config.get("scheduler", {}) or {}
+
+    def get_lease_settings(self) -> Dict[str, Any]:
+        """Get settings for the cross-process run lease (backend, ttl_seconds, heartbeat_seconds)"""
+        return self._config.get("scheduler", {}).get("lease", {}) or {}
+
+
+def _merged(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """base with overrides applied; nested mappings are merged, anything else is replaced"""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merged(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
 
 # Global configuration instance
 _config_instance = None
@@ -125,7 +240,8 @@ def get_config() -> Config:
     """Get the global configuration instance (singleton pattern)"""
     global _config_instance
     if _config_instance is None:
-        _config_instance = Config()
+        # JOBBOT_CONFIG_OVERRIDES names a file layered over config.yaml (e.g. config.sharded.yaml in CI)
+        _config_instance = Config(overrides_path=os.getenv("JOBBOT_CONFIG_OVERRIDES", ""))
     return _config_instance
 
 
@@ -0,0 +1,263 @@
+"""
+Per-process crawl scheduler for JobBot
+Every outbound page fetch and browser navigation goes through here so that no two code
+paths can burst the same host: per-domain concurrency caps, a token-bucket request rate,
+adaptive slowdown on 429/503 responses and per-domain latency stats.
+Budgets are per process: browser worker processes run their own scheduler, so a domain
+fetched from both the API process and a worker gets a budget in each. In practice the
+sources don't overlap (HTTP sources in the API process, browser sources in the worker).
+"""
+import time
+import random
+import asyncio
+import logging
+import threading
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+from urllib.parse import urlparse
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLICY = {
+    "concurrency": 2,      # Simultaneous requests/navigations per domain
+    "rate": 1.0,           # Sustained requests per second per domain
+    "burst": 2,            # Token bucket capacity
+    "max_slowdown": 16.0,  # Cap on the adaptive slowdown multiplier
+}
+THROTTLE_STATUSES = {429, 503}
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+
+
+def domain_of(url: str) -> str:
+    """Domain key used for budgets: lowercase host without a leading www."""
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class DomainState:
+    """Budget and statistics for a single domain"""
+
+    def __init__(self, domain: str, policy: Dict[str, Any]):
+        self.domain = domain
+        self.concurrency = max(1, int(policy["concurrency"]))
+        self.rate = max(0.01, float(policy["rate"]))
+        self.burst = max(1.0, float(policy["burst"]))
+        self.max_slowdown = max(1.0, float(policy["max_slowdown"]))
+        self.semaphore = threading.BoundedSemaphore(self.concurrency)
+        self.lock = threading.Lock()
+        self.tokens = self.burst
+        self.last_refill = time.monotonic()
+        self.slowdown = 1.0
+        self.blocked_until = 0.0
+        # Stats
+        self.requests = 0
+        self.errors = 0
+        self.throttled = 0
+        self.total_wait = 0.0
+        self.latencies = deque(maxlen=500)
+
+    def reserve(self) -> float:
+        """Take a token and return how long the caller must wait before using it"""
+        with self.lock:
+            now = time.monotonic()
+            effective_rate = self.rate / self.slowdown
+            self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * effective_rate)
+            self.last_refill = now
+            self.tokens -= 1
+            # A negative balance queues the caller behind earlier reservations
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / effective_rate
+            wait = max(wait, self.blocked_until - now)
+            self.total_wait += wait
+            return wait
+
+    def record(self, status: Optional[int], latency: float, retry_after: Optional[float] = None):
+        """Record a finished request and adapt the pace to how the host responded"""
+        with self.lock:
+            self.requests += 1
+            self.latencies.append(latency)
+            if status is None or (status >= 500 and status not in THROTTLE_STATUSES):
+                self.errors += 1
+            if status in THROTTLE_STATUSES:
+                self.throttled += 1
+                self.slowdown = min(self.max_slowdown, self.slowdown * 2)
+                backoff = retry_after if retry_after is not None else self.slowdown / self.rate
+                self.blocked_until = max(self.blocked_until, time.monotonic() + backoff)
+                logger.warning(
+                    f"🐢 {self.domain} returned {status}; slowing to {self.rate / self.slowdown:.2f} req/s "
+                    f"and pausing {backoff:.1f}s"
+                )
+            elif status is not None and status < 400:
+                # Recover gradually once the host is happy again
+                self.slowdown = max(1.0, self.slowdown * 0.9)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            ordered = sorted(self.latencies)
+        count = len(ordered)
+
+        def percentile(p):
+            return round(ordered[min(count - 1, int(p * count))], 3) if count else None
+
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "throttled": self.throttled,
+            "slowdown": round(self.slowdown, 2),
+            "effective_rate": round(self.rate / self.slowdown, 3),
+            "total_wait": round(self.total_wait, 2),
+            "latency_avg": round(sum(ordered) / count, 3) if count else None,
+            "latency_p50": percentile(0.5),
+            "latency_p95": percentile(0.95),
+            "latency_max": round(ordered[-1], 3) if count else None,
+        }
+
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or HTTP date)"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CrawlScheduler:
+    """Per-domain politeness budgets shared by every scraper in the process"""
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None):
+        settings = settings or {}
+        self.default_policy = {**DEFAULT_POLICY, **(settings.get("default") or {})}
+        self.domain_policies = {
+            domain_of(f"//{domain}"): policy or {}
+            for domain, policy in (settings.get("domains") or {}).items()
+        }
+        self._domains: Dict[str, DomainState] = {}
+        self._lock = threading.Lock()
+        self._session = None
+
+    def _state(self, url: str) -> DomainState:
+        domain = domain_of(url)
+        with self._lock:
+            state = self._domains.get(domain)
+            if state is None:
+                policy = {**self.default_policy, **self.domain_policies.get(domain, {})}
+                state = self._domains[domain] = DomainState(domain, policy)
+            return state
+
+    @property
+    def session(self):
+        """Pooled HTTP session shared by every HTTP fetch"""
+        with self._lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update(DEFAULT_HEADERS)
+                self._session = session
+            return self._session
+
+    @contextmanager
+    def slot(self, url: str):
+        """Hold one of the domain's concurrency slots, paced by its token bucket"""
+        state = self._state(url)
+        state.semaphore.acquire()
+        try:
+            wait = state.reserve()
+            if wait > 0:
+                # A little jitter keeps concurrent waiters from firing in lockstep
+                time.sleep(wait + random.uniform(0, 0.1 * wait))
+            yield state
+        finally:
+            state.semaphore.release()
+
+    @asynccontextmanager
+    async def async_slot(self, url: str):
+        """Async variant of slot() for Playwright's async API"""
+        state = self._state(url)
+        while not state.semaphore.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        try:
+            wait = state.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait + random.uniform(0, 0.1 * wait))
+            yield state
+        finally:
+            state.semaphore.release()
+
+    def fetch(self, url: str, method: str = "GET", **kwargs):
+        """HTTP request through the shared session, within the domain's budget"""
+        kwargs.setdefault("timeout", 30)
+        with self.slot(url) as state:
+            started = time.monotonic()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except Exception:
+                state.record(None, time.monotonic() - started)
+                raise
+            state.record(response.status_code, time.monotonic() - started,
+                         _retry_after_seconds(response.headers.get("Retry-After")))
+            return response
+
+    async def navigate_async(self, page, url: str, **kwargs):
+        """page.goto() for Playwright's async API, within the domain's budget"""
+        async with self.async_slot(url) as state:
+            started = time.monotonic()
+            try:
+                response = await page.goto(url, **kwargs)
+            except Exception:
+                state.record(None, time.monotonic() - started)
+                raise
+            self._record_navigation(state, response, time.monotonic() - started)
+            return response
+
+    @staticmethod
+    def _record_navigation(state: DomainState, response, latency: float):
+        # goto() returns None for same-document navigations; count those as successes
+        status = response.status if response is not None else 200
+        retry_after = None
+        if response is not None and status in THROTTLE_STATUSES:
+            retry_after = _retry_after_seconds((response.headers or {}).get("retry-after"))
+        state.record(status, latency, retry_after)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-domain request counts, throttling and latency percentiles"""
+        with self._lock:
+            domains = dict(self._domains)
+        return {domain: state.stats() for domain, state in domains.items()}
+
+
+_scheduler: Optional[CrawlScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_crawl_scheduler() -> CrawlScheduler:
+    """Get this process's crawl scheduler (singleton pattern; not shared with worker processes)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = CrawlScheduler(get_config().get_crawl_settings())
+        return _scheduler
+
+
+# Convenience functions
+def fetch(url: str, method: str = "GET", **kwargs):
+    """Fetch a URL through this process's crawl scheduler"""
+    return get_crawl_scheduler().fetch(url, method, **kwargs)
+
+
+async def navigate_async(page, url: str, **kwargs):
+    """Navigate an async Playwright page through this process's crawl scheduler"""
+    return await get_crawl_scheduler().navigate_async(page, url, **kwargs)
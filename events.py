@@ -0,0 +1,121 @@
+"""
+In-process event broadcast for JobBot
+Pipeline stages publish events (jobs committed to Notion, per-source progress, run start and
+finish) from whatever thread they run on; each /events subscriber gets its own bounded
+buffer on the server's event loop. Publishing never blocks: when a slow client's buffer
+is full, its oldest event is dropped and counted.
+"""
+import json
+import asyncio
+import logging
+import itertools
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Set
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """One client's bounded buffer, drained by the coroutine streaming to it"""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, buffer_size: int, kinds: Optional[Set[str]] = None):
+        self.loop = loop
+        self.kinds = kinds
+        self.dropped = 0
+        self._queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=max(1, buffer_size))
+
+    def offer(self, event: Dict[str, Any]):
+        """Hand an event over from any thread"""
+        if self.kinds and event["event"] not in self.kinds:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # The client's loop is gone; it will be unsubscribed shortly
+
+    def _put(self, event: Dict[str, Any]):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class EventBroker:
+    """Fans published events out to every current subscriber"""
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.published = 0
+
+    def publish(self, kind: str, data: Dict[str, Any]):
+        event = {
+            "id": next(self._ids),
+            "event": kind,
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "data": data,
+        }
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.published += 1
+        for subscription in subscribers:
+            subscription.offer(event)
+
+    def subscribe(self, loop: asyncio.AbstractEventLoop, kinds: Optional[Set[str]] = None) -> Subscription:
+        subscription = Subscription(loop, self.buffer_size, kinds)
+        with self._lock:
+            self._subscribers.add(subscription)
+        logger.debug(f"📡 Event subscriber connected ({len(self._subscribers)} total)")
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+        if subscription.dropped:
+            logger.info(f"📡 Slow event subscriber disconnected after {subscription.dropped} dropped events")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "dropped": sum(subscription.dropped for subscription in self._subscribers),
+            }
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event in the text/event-stream wire format"""
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {json.dumps({**event['data'], 'time': event['time']})}\n\n"
+
+
+_broker: Optional[EventBroker] = None
+_broker_lock = threading.Lock()
+
+
+def get_event_broker() -> EventBroker:
+    """Get the process-wide event broker (singleton pattern)"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = EventBroker(buffer_size=get_config().get_event_settings().get("buffer_size", 256))
+        return _broker
+
+
+def publish(kind: str, **data: Any):
+    """Publish an event to every /events subscriber; never raises into the pipeline"""
+    try:
+        get_event_broker().publish(kind, data)
+    except Exception as e:
+        logger.debug(f"⚠️ Could not publish {kind} event: {e}")
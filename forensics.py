@@ -0,0 +1,209 @@
+"""
+Slow-run forensics for JobBot
+Browser sources can have a latency budget (`latency_budget` seconds). When a run goes over
+it, the source is armed, and its next run records a Playwright trace, a HAR with timings
+and a per-navigation timing table. Captures live in data/forensics/, a ring buffer bounded
+by count and size. Runs within budget pay nothing.
+"""
+import os
+import csv
+import json
+import time
+import shutil
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+FORENSICS_DIR = "forensics"
+STATE_FILE = "forensics.json"
+
+# Request.timing fields, in milliseconds relative to startTime (-1 when not applicable)
+TIMING_COLUMNS = ["domainLookupStart", "domainLookupEnd", "connectStart", "secureConnectionStart",
+                  "connectEnd", "requestStart", "responseStart", "responseEnd"]
+
+
+class ForensicCapture:
+    """One armed run's trace, HAR and navigation timings"""
+
+    def __init__(self, source: str, directory: str, reason: str):
+        self.source = source
+        self.directory = directory
+        self.reason = reason
+        self.started = time.monotonic()
+        self.navigations: List[Dict[str, Any]] = []
+
+    def context_options(self) -> Dict[str, Any]:
+        """Extra browser.new_context() options: record a HAR (timings, no bodies)"""
+        return {"record_har_path": os.path.join(self.directory, "network.har"), "record_har_content": "omit"}
+
+    async def attach(self, context):
+        await context.tracing.start(screenshots=True, snapshots=True)
+        context.on("requestfinished", self._on_finished)
+        context.on("requestfailed", self._on_failed)
+
+    def _record(self, request, failure: str = ""):
+        if not request.is_navigation_request():
+            return
+        timing = request.timing or {}
+        row = {"url": request.url, "method": request.method, "failure": failure,
+               "started_at": datetime.fromtimestamp(timing.get("startTime", 0) / 1000, timezone.utc).isoformat()}
+        row.update({column: round(timing.get(column, -1), 1) for column in TIMING_COLUMNS})
+        self.navigations.append(row)
+
+    def _on_finished(self, request):
+        self._record(request)
+
+    def _on_failed(self, request):
+        self._record(request, request.failure or "failed")
+
+    async def finish(self, context, error: Optional[str] = None):
+        """Stop tracing and close the context (which writes the HAR), then save the timing table"""
+        try:
+            await context.tracing.stop(path=os.path.join(self.directory, "trace.zip"))
+        finally:
+            await context.close()
+
+        with open(os.path.join(self.directory, "navigations.csv"), "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=["started_at", "method", "url", *TIMING_COLUMNS, "failure"])
+            writer.writeheader()
+            writer.writerows(self.navigations)
+        with open(os.path.join(self.directory, "meta.json"), "w") as f:
+            json.dump({"source": self.source, "reason": self.reason, "error": error,
+                       "duration": round(time.monotonic() - self.started, 2),
+                       "navigations": len(self.navigations)}, f, indent=2)
+        logger.info(f"🔬 Saved slow-run capture for {self.source} to {self.directory}")
+        get_forensics().disarm(self.source)
+
+
+class Forensics:
+    """Latency budgets, armed sources and the on-disk capture ring buffer"""
+
+    def __init__(self, root: Optional[str] = None, max_captures: int = 10, max_total_mb: float = 500):
+        config = get_config()
+        self.root = root or config.get_data_path(FORENSICS_DIR)
+        self.state_path = config.get_data_path(STATE_FILE)
+        self.max_captures = max(1, int(max_captures))
+        self.max_total_bytes = max_total_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+    # Armed state is a file because the check runs in the API process and the capture in a browser worker
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.state_path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read forensics state: {e}")
+            return {}
+
+    def _save(self, state: Dict[str, Dict[str, Any]]):
+        try:
+            tmp_path = f"{self.state_path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(state, f, indent=2)
+            os.replace(tmp_path, self.state_path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist forensics state: {e}")
+
+    def record_run(self, source: str, duration: float, budget: Optional[float]):
+        """Arm the source's next run if this one went over its latency budget"""
+        if not budget or duration <= budget:
+            return
+        with self._lock:
+            state = self._load()
+            if source in state:
+                return
+            state[source] = {"reason": f"run took {duration:.0f}s (budget {budget:.0f}s)",
+                             "armed_at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+            self._save(state)
+        logger.warning(f"🐢 {source} {state[source]['reason']}; its next run will record a trace and HAR")
+
+    def disarm(self, source: str):
+        with self._lock:
+            state = self._load()
+            if state.pop(source, None) is not None:
+                self._save(state)
+
+    def armed_capture(self, source: str) -> Optional[ForensicCapture]:
+        """A new capture if the source is armed, else None"""
+        armed = self._load().get(source)
+        if not armed:
+            return None
+        directory = os.path.join(self.root, f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{source}")
+        os.makedirs(directory, exist_ok=True)
+        self.prune(keep=directory)
+        logger.info(f"🔬 Recording trace and HAR for {source}: {armed['reason']}")
+        return ForensicCapture(source, directory, armed["reason"])
+
+    def captures(self) -> List[Tuple[str, int]]:
+        """(directory, size in bytes) of every capture, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        found = []
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if os.path.isdir(path):
+                size = sum(os.path.getsize(os.path.join(dirpath, f))
+                           for dirpath, _, files in os.walk(path) for f in files)
+                found.append((path, size))
+        return found
+
+    def prune(self, keep: Optional[str] = None):
+        """Drop the oldest captures until the buffer is within max_captures and max_total_mb"""
+        captures = self.captures()
+        total = sum(size for _, size in captures)
+        while captures and (len(captures) > self.max_captures or total > self.max_total_bytes):
+            path, size = captures.pop(0)
+            if path == keep:
+                continue
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        return {"armed": self._load(), "captures": [os.path.basename(path) for path, _ in self.captures()]}
+
+
+_forensics: Optional[Forensics] = None
+_forensics_lock = threading.Lock()
+
+
+def get_forensics() -> Forensics:
+    """Get the process-wide forensics manager (singleton pattern)"""
+    global _forensics
+    with _forensics_lock:
+        if _forensics is None:
+            settings = get_config().get_forensics_settings()
+            _forensics = Forensics(max_captures=settings.get("max_captures", 10),
+                                   max_total_mb=settings.get("max_total_mb", 500))
+        return _forensics
+
+
+async def open_context(browser, source: str, **options):
+    """
+    browser.new_context(), recording a trace and HAR when the source is armed.
+    Returns (context, capture); pass both to close_context() when the run ends.
+    """
+    capture = get_forensics().armed_capture(source) if get_config().get_forensics_settings().get("enabled", True) else None
+    if capture:
+        options.update(capture.context_options())
+    context = await browser.new_context(**options)
+    if capture:
+        await capture.attach(context)
+    return context, capture
+
+
+async def close_context(context, capture: Optional[ForensicCapture], error: Optional[str] = None):
+    """Close a context from open_context(), saving the capture if one was recording"""
+    if capture:
+        try:
+            await capture.finish(context, error)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not save slow-run capture for {capture.source}: {e}")
+    else:
+        await context.close()
@@ -1,36 +1,127 @@
 import os
 import json
+import asyncio
 import logging
 from dotenv import load_dotenv
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
 from config_loader import get_config
+from crawl_scheduler import navigate_async
+from forensics import close_context, open_context
+from locations import matches_location
+from resilience import ScrapeError
+from search_queries import dedupe_jobs, search_urls
+from selector_cache import get_selector_cache
+from snapshots import capture, capture_enabled
+from structured_data import extract_job_posting
 
 # Load environment variables
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-# Support both institution-specific and generic env var names
-KELLOGG_EMAIL = os.getenv("KELLOGG_EMAIL") or os.getenv("UNIVERSITY_EMAIL")
-KELLOGG_PASS = os.getenv("KELLOGG_PASS") or os.getenv("UNIVERSITY_PASSWORD")
-NETID = os.getenv("KELLOGG_NETID") or os.getenv("UNIVERSITY_USERNAME")
-PASSWORD = os.getenv("KELLOGG_PASS") or os.getenv("UNIVERSITY_PASSWORD")
-
-# Use existing CMS credentials if Handshake-specific ones aren't available
-if not KELLOGG_EMAIL:
-    KELLOGG_EMAIL = os.getenv("KELLOGG_NETID") + "@kellogg.northwestern.edu"
-if not KELLOGG_PASS:
-    KELLOGG_PASS = os.getenv("KELLOGG_PASS")
-
-assert NETID, "❌ KELLOGG_NETID not found in .env"
-assert PASSWORD, "❌ KELLOGG_PASS not found in .env"
-
-
-def debug_page_structure(page):
+# jobType=3 (Internship), jobRoleGroups=34 (Product Management), SF/NYC/California/Chicago
+DEFAULT_URL = "https://app.joinhandshake.com/job-search?query=product+manager+intern&pay%5BsalaryType%5D=1&jobType=3&jobRoleGroups=34&remoteWork=onsite&remoteWork=hybrid&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22San+Francisco%2C+CA%22%2C%22type%22%3A%22place%22%2C%22point%22%3A%2237.774929%2C-122.419415%22%2C%22text%22%3Anull%7D&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22New+York%2C+NY%22%2C%22type%22%3A%22place%22%2C%22point%22%3A%2240.712784%2C-74.005941%22%2C%22text%22%3Anull%7D&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22California%2C+United+States%22%2C%22type%22%3A%22region%22%2C%22point%22%3A%2237.07436%2C-119.699375%22%2C%22text%22%3A%22California%22%7D&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22Chicago%2C+Illinois%2C+United+States%22%2C%22type%22%3A%22place%22%2C%22point%22%3A%2241.881953%2C-87.632362%22%2C%22text%22%3A%22Chicago%22%7D&page=1&per_page=25"
+
+# Fallback chains, most specific first. The selector cache tries the last one that worked first.
+# The *_FALLBACKS match loosely (any element after a "Company" label), so they are tried last
+# and never learned.
+COMPANY_SELECTORS = [
+    "[data-testid*='company']",
+    "[data-testid*='employer']",
+    "h3:has-text('Company')",
+    "h4:has-text('Company')",
+    ".company-name",
+    ".employer-name",
+    "a[href*='/employers/']"
+]
+COMPANY_FALLBACKS = [
+    "span:has-text('Company') + *",
+    "div:has-text('Company') + *"
+]
+LOCATION_SELECTORS = [
+    "[data-testid*='location']",
+    "h3:has-text('Location')",
+    "h4:has-text('Location')",
+    ".location",
+    ".job-location"
+]
+LOCATION_FALLBACKS = [
+    "span:has-text('Location') + *",
+    "div:has-text('Location') + *",
+    "[class*='location']"
+]
+EMAIL_SELECTORS = [
+    "#email-address-identifier",
+    "input[type='email']",
+    "input[name='email']",
+    "input[placeholder*='email']",
+    "input[placeholder*='Email']",
+    "input[data-testid*='email']",
+    "input[id*='email']"
+]
+NEXT_SELECTORS = [
+    "button:has-text('Next')",
+    "input[type='submit']",
+    "button[type='submit']",
+    "button:has-text('Continue')",
+    "button:has-text('Sign in')"
+]
+NETID_SELECTORS = [
+    "button:has-text('Northwestern University Student NetID Login')",
+    "a:has-text('Northwestern University Student NetID Login')",
+    "button:has-text('Northwestern')",
+    "a:has-text('Northwestern')",
+    "[data-testid*='northwestern']"
+]
+USERNAME_SELECTORS = [
+    "#txtUsername",
+    "input[name='username']",
+    "input[name='user']",
+    "input[type='text']",
+    "input[placeholder*='username']",
+    "input[placeholder*='Username']",
+    "input[id*='username']",
+    "input[id*='user']"
+]
+PASSWORD_SELECTORS = [
+    "#txtPassword",
+    "input[name='password']",
+    "input[type='password']",
+    "input[placeholder*='password']",
+    "input[placeholder*='Password']",
+    "input[id*='password']"
+]
+LOGIN_SELECTORS = [
+    "#btnLogin",
+    "input[type='submit']",
+    "button[type='submit']",
+    "button:has-text('Login')",
+    "button:has-text('Sign in')",
+    "input[value*='Login']",
+    "input[value*='Sign in']"
+]
+
+
+def get_credentials():
+    """Read Handshake/NetID credentials at run time so importing this module never fails"""
+    # Support both institution-specific and generic env var names
+    netid = os.getenv("KELLOGG_NETID") or os.getenv("UNIVERSITY_USERNAME")
+    password = os.getenv("KELLOGG_PASS") or os.getenv("UNIVERSITY_PASSWORD")
+    if not netid:
+        raise RuntimeError("❌ KELLOGG_NETID not found in .env")
+    if not password:
+        raise RuntimeError("❌ KELLOGG_PASS not found in .env")
+
+    # Use existing CMS credentials if Handshake-specific ones aren't available
+    email = os.getenv("KELLOGG_EMAIL") or os.getenv("UNIVERSITY_EMAIL") or f"{netid}@kellogg.northwestern.edu"
+    return email, netid, password
+
+
+async def debug_page_structure(page):
     """Debug function to inspect the page structure"""
     logger.debug("🔍 DEBUGGING PAGE STRUCTURE:")
 
     # Check for job listings
-    job_links = page.query_selector_all("a[href*='/job-search/']")
+    job_links = await page.query_selector_all("a[href*='/job-search/']")
     logger.debug(f"🔍 Found {len(job_links)} job links")
 
     # Check for different possible selectors
@@ -43,75 +134,48 @@ def debug_page_structure(page):
     ]
 
     for selector in possible_selectors:
-        elements = page.query_selector_all(selector)
+        elements = await page.query_selector_all(selector)
         logger.debug(f"🔍 Selector '{selector}': {len(elements)} elements found")
         if len(elements) > 0:
             # Print first few elements
             for i, el in enumerate(elements[:3]):
-                text = el.inner_text().strip()
-                aria_label = el.get_attribute("aria-label") or ""
-                href = el.get_attribute("href") or ""
+                text = (await el.inner_text()).strip()
+                aria_label = await el.get_attribute("aria-label") or ""
+                href = await el.get_attribute("href") or ""
                 if text or aria_label:
                     logger.debug(f"  [{i+1}] Text: '{text[:50]}...'")
                     logger.debug(f"      Aria-label: '{aria_label[:50]}...'")
                     logger.debug(f"      Href: '{href[:50]}...'")
 
 
-def extract_job_info_from_page(page, job_url):
+async def extract_job_info_from_page(page, job_url):
     """Extract detailed job information by visiting the job page"""
     try:
         # Navigate to the job page
-        page.goto(job_url)
-        page.wait_for_timeout(2000)
-
-        # Extract company name
-        company = "Unknown"
-        company_selectors = [
-            "[data-testid*='company']",
-            "[data-testid*='employer']",
-            "h3:has-text('Company')",
-            "h4:has-text('Company')",
-            ".company-name",
-            ".employer-name",
-            "a[href*='/employers/']",
-            "span:has-text('Company') + *",
-            "div:has-text('Company') + *"
-        ]
-
-        for selector in company_selectors:
-            try:
-                company_el = page.query_selector(selector)
-                if company_el:
-                    company_text = company_el.inner_text().strip()
-                    if company_text and len(company_text) < 100:
-                        company = company_text
-                        break
-            except:
-                continue
-
-        # Extract location
-        location = "N/A"
-        location_selectors = [
-            "[data-testid*='location']",
-            "h3:has-text('Location')",
-            "h4:has-text('Location')",
-            ".location",
-            ".job-location",
-            "span:has-text('Location') + *",
-            "div:has-text('Location') + *",
-            "[class*='location']"
-        ]
-
-        for selector in location_selectors:
-            try:
-                location_el = page.query_selector(selector)
-                if location_el:
-                    location_text = location_el.inner_text().strip()
-                    if location_text and len(location_text) < 100:
-                        location = location_text
-                        break
-            except:
-                continue
+        await navigate_async(page, job_url)
+        await page.wait_for_timeout(2000)
+
+        # One round-trip for the page source; an embedded JobPosting saves walking the selector chains
+        html = await page.content()
+        capture("handshake", job_url, html, kind="dom")
+        posting = extract_job_posting(html)
+        if posting and posting["company"] and posting["location"]:
+            return posting["company"], posting["location"]
+
+        cache = get_selector_cache()
+
+        async def short_text(selector):
+            el = await page.query_selector(selector)
+            if el:
+                text = (await el.inner_text()).strip()
+                if text and len(text) < 100:
+                    return text
+            return None
+
+        company = await cache.first_match("handshake", "company", COMPANY_SELECTORS, short_text,
+                                          COMPANY_FALLBACKS) or "Unknown"
+        location = await cache.first_match("handshake", "location", LOCATION_SELECTORS, short_text,
+                                           LOCATION_FALLBACKS) or "N/A"
 
         return company, location
 
@@ -120,12 +184,12 @@ def extract_job_info_from_page(page, job_url):
         return "Unknown", "N/A"
 
 
-def extract_job_info(job_element, page=None):
+async def extract_job_info(job_element, page=None):
     """Extract job information from a job link element"""
     try:
         # Get the aria-label which contains the job title
-        aria_label = job_element.get_attribute("aria-label") or ""
-        href = job_element.get_attribute("href") or ""
+        aria_label = await job_element.get_attribute("aria-label") or ""
+        href = await job_element.get_attribute("href") or ""
 
         # Extract job title from aria-label
         title = aria_label.replace("View ", "").strip()
@@ -141,7 +205,7 @@ def extract_job_info(job_element, page=None):
         location = "N/A"
 
         if page:
-            company, location = extract_job_info_from_page(page, url)
+            company, location = await extract_job_info_from_page(page, url)
 
         return {
             "title": title,
@@ -154,289 +218,260 @@ def extract_job_info(job_element, page=None):
         return None
 
 
-def login_and_scrape():
+async def login_and_scrape_async(on_job=None, detail_concurrency=3):
+    """
+    Scrape Handshake with Playwright's async API. Listings from every configured search
+    are read concurrently (one tab per query) and merged by canonical ID. Detail pages for
+    the ones matching the title filter are then visited concurrently in separate tabs
+    (bounded by detail_concurrency and the crawl scheduler's budget).
+    on_job is called with each job as soon as its details are in.
+    """
     jobs = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=True)
-        page = browser.new_page()
+    email, netid, password = get_credentials()
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True)
+        # Records a trace and HAR only if the last run went over its latency budget
+        context, forensic = await open_context(browser, "handshake")
+        page = await context.new_page()
+        error = None
 
         try:
             # Step 1: Navigate to Handshake login
             logger.info("🔐 Step 1: Navigating to Handshake login...")
-            page.goto("https://app.joinhandshake.com/login")
-            page.wait_for_timeout(3000)
+            await navigate_async(page, "https://app.joinhandshake.com/login")
+            await page.wait_for_timeout(3000)
 
             # Debug: Check what's on the page
             logger.debug(f"🔍 Current page URL: {page.url}")
-            logger.debug(f"🔍 Page title: {page.title()}")
+            logger.debug(f"🔍 Page title: {await page.title()}")
 
             # Step 2: Enter Kellogg email
             logger.info("📧 Step 2: Entering Kellogg email...")
+            cache = get_selector_cache()
+
+            # The email field is the first thing after the redirect, so its first selector gets the long
+            # wait for slow SSO pages (scrapers.handshake.login_wait_seconds); other probes get 3s
+            login_wait = get_config().get_scraper_settings("handshake").get("login_wait_seconds", 10)
+
+            def find_input(first_timeout=3000):
+                tried = []
+
+                async def probe(selector):
+                    timeout = first_timeout if not tried else 3000
+                    tried.append(selector)
+                    return await page.wait_for_selector(selector, timeout=timeout)
+                return probe
+
+            async def click_visible(selector):
+                button = page.locator(selector).first
+                if await button.is_visible():
+                    await button.click()
+                    logger.debug(f"✅ Clicked {selector}")
+                    return True
+                return False
+
+            async def click_enabled(selector):
+                # Next stays disabled until the email is accepted
+                button = page.locator(selector).first
+                if await button.is_visible() and await button.is_enabled():
+                    await button.click()
+                    logger.debug(f"✅ Clicked {selector}")
+                    return True
+                return False
+
             try:
-                # Try to find the specific email input field
-                email_input = page.wait_for_selector("#email-address-identifier", timeout=10000)
-                if not email_input:
-                    # Fallback to other selectors if the specific ID isn't found
-                    email_selectors = [
-                        "input[type='email']",
-                        "input[name='email']",
-                        "input[placeholder*='email']",
-                        "input[placeholder*='Email']",
-                        "input[data-testid*='email']",
-                        "input[id*='email']"
-                    ]
-
-                    for selector in email_selectors:
-                        try:
-                            email_input = page.wait_for_selector(selector, timeout=3000)
-                            if email_input:
-                                logger.debug(f"✅ Found email input with selector: {selector}")
-                                break
-                        except:
-                            continue
+                email_input = await cache.first_match("handshake", "email_input", EMAIL_SELECTORS,
+                                                      find_input(int(login_wait * 1000)))
 
                 if not email_input:
                     logger.error("❌ Could not find email input field")
                     # Take a screenshot for debugging
-                    page.screenshot(path="handshake_debug.png")
-                    return jobs
+                    await page.screenshot(path="handshake_debug.png")
+                    raise ScrapeError("Handshake login failed: Could not find email input field")
 
                 logger.info("✅ Found email input field")
-                email_input.fill(KELLOGG_EMAIL or "")
+                await email_input.fill(email)
 
                 # Blur the input field to enable the Next button
                 logger.debug("🖱️ Blurring email input to enable Next button...")
-                # Use JavaScript to blur the element
-                page.evaluate("document.getElementById('email-address-identifier').blur()")
-                page.wait_for_timeout(1000)
+                await email_input.evaluate("el => el.blur()")
+                await page.wait_for_timeout(1000)
 
                 # Click Next button
-                next_selectors = [
-                    "button:has-text('Next')",
-                    "input[type='submit']",
-                    "button[type='submit']",
-                    "button:has-text('Continue')",
-                    "button:has-text('Sign in')"
-                ]
-
-                next_clicked = False
-                for selector in next_selectors:
-                    try:
-                        next_button = page.locator(selector).first
-                        if next_button.is_visible() and next_button.is_enabled():
-                            next_button.click()
-                            logger.debug(f"✅ Clicked next button with selector: {selector}")
-                            next_clicked = True
-                            break
-                    except:
-                        continue
-
-                if not next_clicked:
+                if not await cache.first_match("handshake", "next_button", NEXT_SELECTORS, click_enabled):
                     logger.error("❌ Could not find or click next button")
                     # Take a screenshot for debugging
-                    page.screenshot(path="handshake_next_button_debug.png")
-                    return jobs
+                    await page.screenshot(path="handshake_next_button_debug.png")
+                    raise ScrapeError("Handshake login failed: Could not find or click next button")
 
-                page.wait_for_timeout(3000)
+                await page.wait_for_timeout(3000)
 
                 # Step 3: Select Northwestern University Student NetID Login
                 logger.info("🎓 Step 3: Selecting Northwestern University Student NetID Login...")
-                netid_selectors = [
-                    "button:has-text('Northwestern University Student NetID Login')",
-                    "a:has-text('Northwestern University Student NetID Login')",
-                    "button:has-text('Northwestern')",
-                    "a:has-text('Northwestern')",
-                    "[data-testid*='northwestern']"
-                ]
-
-                netid_clicked = False
-                for selector in netid_selectors:
-                    try:
-                        netid_button = page.locator(selector).first
-                        if netid_button.is_visible():
-                            netid_button.click()
-                            logger.debug(f"✅ Clicked Northwestern button with selector: {selector}")
-                            netid_clicked = True
-                            break
-                    except:
-                        continue
-
-                if not netid_clicked:
+                if not await cache.first_match("handshake", "netid_button", NETID_SELECTORS, click_visible):
                     logger.error("❌ Could not find Northwestern University login button")
-                    return jobs
+                    raise ScrapeError("Handshake login failed: Could not find Northwestern University login button")
 
-                page.wait_for_timeout(3000)
+                await page.wait_for_timeout(3000)
 
                 # Step 4: Login with NetID and Password
                 logger.info("🔑 Step 4: Logging in with NetID and Password...")
                 try:
                     # Wait for page to load and check current URL
-                    page.wait_for_timeout(3000)
+                    await page.wait_for_timeout(3000)
                     logger.debug(f"🔍 Current URL after Northwestern click: {page.url}")
-                    logger.debug(f"🔍 Page title: {page.title()}")
-
-                    # Try different selectors for username field
-                    username_selectors = [
-                        "#txtUsername",
-                        "input[name='username']",
-                        "input[name='user']",
-                        "input[type='text']",
-                        "input[placeholder*='username']",
-                        "input[placeholder*='Username']",
-                        "input[id*='username']",
-                        "input[id*='user']"
-                    ]
-
-                    username_input = None
-                    for selector in username_selectors:
-                        try:
-                            username_input = page.wait_for_selector(selector, timeout=3000)
-                            if username_input:
-                                logger.debug(f"✅ Found username input with selector: {selector}")
-                                break
-                        except:
-                            continue
+                    logger.debug(f"🔍 Page title: {await page.title()}")
 
+                    username_input = await cache.first_match("handshake", "username_input", USERNAME_SELECTORS, find_input())
                     if not username_input:
                         logger.error("❌ Could not find username input field")
-                        page.screenshot(path="handshake_netid_debug.png")
-                        return jobs
-
-                    # Try different selectors for password field
-                    password_selectors = [
-                        "#txtPassword",
-                        "input[name='password']",
-                        "input[type='password']",
-                        "input[placeholder*='password']",
-                        "input[placeholder*='Password']",
-                        "input[id*='password']"
-                    ]
-
-                    password_input = None
-                    for selector in password_selectors:
-                        try:
-                            password_input = page.wait_for_selector(selector, timeout=3000)
-                            if password_input:
-                                logger.debug(f"✅ Found password input with selector: {selector}")
-                                break
-                        except:
-                            continue
+                        await page.screenshot(path="handshake_netid_debug.png")
+                        raise ScrapeError("Handshake login failed: Could not find username input field")
 
+                    password_input = await cache.first_match("handshake", "password_input", PASSWORD_SELECTORS, find_input())
                     if not password_input:
                         logger.error("❌ Could not find password input field")
-                        return jobs
+                        raise ScrapeError("Handshake login failed: Could not find password input field")
 
                     # Fill in credentials
-                    username_input.fill(NETID or "")
-                    password_input.fill(PASSWORD or "")
-
-                    # Try different selectors for login button
-                    login_selectors = [
-                        "#btnLogin",
-                        "input[type='submit']",
-                        "button[type='submit']",
-                        "button:has-text('Login')",
-                        "button:has-text('Sign in')",
-                        "input[value*='Login']",
-                        "input[value*='Sign in']"
-                    ]
-
-                    login_clicked = False
-                    for selector in login_selectors:
-                        try:
-                            login_button = page.locator(selector).first
-                            if login_button.is_visible():
-                                login_button.click()
-                                logger.debug(f"✅ Clicked login button with selector: {selector}")
-                                login_clicked = True
-                                break
-                        except:
-                            continue
-
-                    if not login_clicked:
+                    await username_input.fill(netid)
+                    await password_input.fill(password)
+
+                    if not await cache.first_match("handshake", "login_button", LOGIN_SELECTORS, click_visible):
                         logger.error("❌ Could not find login button")
-                        return jobs
+                        raise ScrapeError("Handshake login failed: Could not find login button")
 
-                    page.wait_for_timeout(5000)
+                    await page.wait_for_timeout(5000)
                     logger.info("✅ Successfully logged in with NetID")
 
+                except ScrapeError:
+                    raise
                 except Exception as e:
                     logger.error(f"❌ Error during NetID login: {e}")
-                    page.screenshot(path="handshake_netid_error.png")
-                    return jobs
+                    await page.screenshot(path="handshake_netid_error.png")
+                    raise ScrapeError(f"Handshake NetID login failed: {e}") from e
 
+            except ScrapeError:
+                raise
             except Exception as e:
                 logger.error(f"❌ Error during email entry: {e}")
-                return jobs
+                raise ScrapeError(f"Handshake email entry failed: {e}") from e
 
-            # Step 5: Navigate to job search page
-            logger.info("🔍 Step 5: Navigating to job search page...")
+            # Step 5-7: Run every configured search; extra queries get their own tabs
+            logger.info("🔍 Step 5: Running job searches...")
             config = get_config()
-            job_search_url = config.get_scraper_url("handshake")
-
-            if not job_search_url:
-                logger.warning("⚠️ Handshake scraper URL not configured, using default")
-                job_search_url = "https://app.joinhandshake.com/job-search?query=product+manager+intern&pay%5BsalaryType%5D=1&jobType=3&jobRoleGroups=34&remoteWork=onsite&remoteWork=hybrid&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22San+Francisco%2C+CA%22%2C%22type%22%3A%22place%22%2C%22point%22%3A%2237.774929%2C-122.419415%22%2C%22text%22%3Anull%7D&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22New+York%2C+NY%22%2C%22type%22%3A%22place%22%2C%22point%22%3A%2240.712784%2C-74.005941%22%2C%22text%22%3Anull%7D&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22California%2C+United+States%22%2C%22type%22%3A%22region%22%2C%22point%22%3A%2237.07436%2C-119.699375%22%2C%22text%22%3A%22California%22%7D&locationFilter=%7B%22distance%22%3A%2250mi%22%2C%22label%22%3A%22Chicago%2C+Illinois%2C+United+States%22%2C%22type%22%3A%22place%22%2C%22point%22%3A%2241.881953%2C-87.632362%22%2C%22text%22%3A%22Chicago%22%7D&page=1&per_page=25"
+            urls = search_urls("handshake", DEFAULT_URL)
+            query_semaphore = asyncio.Semaphore(max(1, config.get_scraper_settings("handshake").get("max_concurrent_queries", 3)))
 
-            page.goto(job_search_url)
-            page.wait_for_timeout(5000)
-
-            # DEBUG: Inspect page structure (only runs if log level is DEBUG)
-            if logger.isEnabledFor(logging.DEBUG):
-                debug_page_structure(page)
-
-            # Step 6: Scroll to load all jobs
-            logger.info("📜 Step 6: Scrolling to load all jobs...")
-            last_count = 0
-            for i in range(10):  # Max 10 scrolls
-                job_links = page.query_selector_all("a[href*='/job-search/']")
-                count = len(job_links)
-                logger.debug(f"🔽 Scroll {i+1}: found {count} job links")
-
-                if count == last_count and i > 2:
-                    logger.debug("✅ All jobs loaded")
-                    break
-                last_count = count
-
-                page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                page.wait_for_timeout(2000)
-
-            # Step 7: Scrape job data
-            logger.info("🎯 Step 7: Scraping job data...")
-            job_links = page.query_selector_all("a[href*='/job-search/']")
-            logger.info(f"🔍 Final job count: {len(job_links)}")
-
-            config = get_config()
-            for i, job_link in enumerate(job_links):
-                logger.debug(f"🔍 Processing job {i+1}:")
+            async def run_query(i, url):
+                async with query_semaphore:
+                    query_page = page if i == 0 else await context.new_page()
+                    try:
+                        return await collect_listings(query_page, url)
+                    finally:
+                        if query_page is not page:
+                            await query_page.close()
+
+            listings = await asyncio.gather(*(run_query(i, url) for i, url in enumerate(urls)))
+            merged = dedupe_jobs(job for jobs_found in listings for job in jobs_found)
+            if len(urls) > 1:
+                logger.info(f"🔎 handshake: {len(urls)} queries, {sum(map(len, listings))} results, {len(merged)} unique")
+
+            # Filter by keywords using config before spending a page visit on details
+            candidates = []
+            for job_info in merged:
+                if config.matches_title_filter(job_info["title"]):
+                    candidates.append(job_info)
+                else:
+                    logger.debug(f"  ⏭️ Skipped {job_info['title']} (doesn't match filter)")
 
-                job_info = extract_job_info(job_link, page)
-                if not job_info:
-                    continue
+            semaphore = asyncio.Semaphore(max(1, detail_concurrency))
 
-                title = job_info["title"]
-                company = job_info["company"]
-                location = job_info["location"]
-                logger.debug(f"  📝 Title: {title}")
+            async def fill_details(job_info):
+                async with semaphore:
+                    detail_page = await context.new_page()
+                    try:
+                        company, location = await extract_job_info_from_page(detail_page, job_info["url"])
+                    finally:
+                        await detail_page.close()
+                job_info["company"] = company
+                job_info["location"] = location
                 logger.debug(f"  🏢 Company: {company}")
                 logger.debug(f"  📍 Location: {location}")
+                # Handshake cards carry no location, so the geo filter runs once the details are in
+                if not matches_location(location):
+                    logger.debug(f"  ⏭️ Skipped (outside configured locations: {location})")
+                    return
+                jobs.append(job_info)
+                logger.info(f"  ✅ Added to jobs list: {job_info['title']}")
+                if on_job:
+                    on_job(job_info)
 
-                # Filter by keywords using config
-                if config.matches_title_filter(title):
-                    jobs.append(job_info)
-                    logger.info(f"  ✅ Added to jobs list: {title}")
-                else:
-                    logger.debug("  ⏭️ Skipped (doesn't match filter)")
+            await asyncio.gather(*(fill_details(job_info) for job_info in candidates))
 
         except Exception as e:
             logger.error(f"❌ Error during scraping: {e}")
+            error = str(e)
+            # Surface the failure (for retries/circuit breaking) unless we already have results
+            if not jobs:
+                raise
 
         finally:
-            browser.close()
+            get_selector_cache().flush("handshake")
+            await close_context(context, forensic, error)
+            await browser.close()
 
     return jobs
 
 
+async def collect_listings(page, url):
+    """Open one search URL, scroll until no new jobs load, and read every listing (unfiltered)"""
+    await navigate_async(page, url)
+    await page.wait_for_timeout(5000)
+
+    # DEBUG: Inspect page structure (only runs if log level is DEBUG)
+    if logger.isEnabledFor(logging.DEBUG):
+        await debug_page_structure(page)
+
+    # Step 6: Scroll to load all jobs
+    logger.info("📜 Step 6: Scrolling to load all jobs...")
+    last_count = 0
+    for i in range(10):  # Max 10 scrolls
+        job_links = await page.query_selector_all("a[href*='/job-search/']")
+        count = len(job_links)
+        logger.debug(f"🔽 Scroll {i+1}: found {count} job links")
+
+        if count == last_count and i > 2:
+            logger.debug("✅ All jobs loaded")
+            break
+        last_count = count
+
+        await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
+        await page.wait_for_timeout(2000)
+
+    # Step 7: Scrape job data
+    logger.info("🎯 Step 7: Scraping job data...")
+    job_links = await page.query_selector_all("a[href*='/job-search/']")
+    logger.info(f"🔍 Final job count: {len(job_links)}")
+    if capture_enabled():
+        capture("handshake", url, await page.content(), kind="dom")
+
+    # Read every listing before navigating anywhere, so element handles stay valid
+    listings = []
+    for i, job_link in enumerate(job_links):
+        logger.debug(f"🔍 Processing job {i+1}:")
+        job_info = await extract_job_info(job_link)
+        if job_info:
+            logger.debug(f"  📝 Title: {job_info['title']}")
+            listings.append(job_info)
+    return listings
+
+
+def login_and_scrape():
+    """Synchronous entry point used by the source registry"""
+    return asyncio.run(login_and_scrape_async())
+
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     results = login_and_scrape()
@@ -0,0 +1,217 @@
+"""
+Local full-text index of scraped postings for JobBot
+SQLite FTS5 keeps searches over every posting we've seen local and fast,
+instead of paging through the Notion API
+"""
+import re
+import json
+import base64
+import sqlite3
+import logging
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from config_loader import get_config
+from job_record import JobBatch
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "jobs.db"
+MAX_LIMIT = 100
+
+# bm25 column weights: title, company, location, description
+_RANK = "bm25(jobs_fts, 10.0, 5.0, 2.0, 1.0)"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    canonical_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    first_seen TEXT NOT NULL,
+    last_seen TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_first_seen ON jobs(first_seen, id);
+CREATE INDEX IF NOT EXISTS jobs_last_seen ON jobs(last_seen, id);
+CREATE INDEX IF NOT EXISTS jobs_source ON jobs(source, last_seen);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+    title, company, location, description,
+    content='jobs', content_rowid='id', tokenize='porter unicode61'
+);
+
+CREATE TRIGGER IF NOT EXISTS jobs_ai AFTER INSERT ON jobs BEGIN
+    INSERT INTO jobs_fts(rowid, title, company, location, description)
+    VALUES (new.id, new.title, new.company, new.location, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_ad AFTER DELETE ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS jobs_au AFTER UPDATE OF title, company, location, description ON jobs BEGIN
+    INSERT INTO jobs_fts(jobs_fts, rowid, title, company, location, description)
+    VALUES ('delete', old.id, old.title, old.company, old.location, old.description);
+    INSERT INTO jobs_fts(rowid, title, company, location, description)
+    VALUES (new.id, new.title, new.company, new.location, new.description);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO jobs (canonical_id, title, company, location, url, source, description, first_seen, last_seen)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(canonical_id) DO UPDATE SET
+    title = excluded.title,
+    company = CASE WHEN excluded.company = '' THEN jobs.company ELSE excluded.company END,
+    location = CASE WHEN excluded.location = '' THEN jobs.location ELSE excluded.location END,
+    url = CASE WHEN excluded.url = '' THEN jobs.url ELSE excluded.url END,
+    source = excluded.source,
+    description = CASE WHEN excluded.description = '' THEN jobs.description ELSE excluded.description END,
+    last_seen = excluded.last_seen
+"""
+
+_initialized = set()
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the index, creating the schema on first use"""
+    path = path or get_config().get_data_path(INDEX_FILE)
+    conn = sqlite3.connect(path, timeout=30)
+    conn.row_factory = sqlite3.Row
+    if path not in _initialized:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(_SCHEMA)
+        _initialized.add(path)
+    return conn
+
+
+# Columns written per posting, in _UPSERT's parameter order (seen is bound twice)
+_UPSERT_FIELDS = ("canonical_id", "title", "company", "location", "url", "source", "description")
+
+
+def ingest_jobs(batch: JobBatch, seen_at: Optional[datetime] = None, path: Optional[str] = None) -> int:
+    """Upsert a run's jobs in one transaction; returns the number of rows written"""
+    if not len(batch):
+        return 0
+    seen = (seen_at or datetime.now(timezone.utc)).isoformat(timespec="seconds")
+    rows = [(*values, seen, seen) for values in batch.rows(_UPSERT_FIELDS)]
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(_UPSERT, rows)
+    finally:
+        conn.close()
+    logger.info(f"🗂️ Indexed {len(rows)} jobs locally")
+    return len(rows)
+
+
+def unseen_jobs(batch: JobBatch, path: Optional[str] = None) -> JobBatch:
+    """The part of a batch whose canonical IDs aren't in the index yet"""
+    ids = batch.column("canonical_id")
+    if not ids:
+        return batch
+    unique = list(set(ids))
+    known = set()
+    conn = connect(path)
+    try:
+        for start in range(0, len(unique), 500):
+            chunk = unique[start:start + 500]
+            rows = conn.execute(
+                f"SELECT canonical_id FROM jobs WHERE canonical_id IN ({','.join('?' * len(chunk))})", chunk
+            ).fetchall()
+            known.update(row["canonical_id"] for row in rows)
+    finally:
+        conn.close()
+    return batch.take(i for i, key in enumerate(ids) if key not in known)
+
+
+def _fts_query(q: str) -> str:
+    """Turn free text into a safe FTS5 query: every term required, last term as a prefix"""
+    terms = re.findall(r"\w+", q.lower())
+    if not terms:
+        return ""
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def _encode_cursor(values: List[Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(values).encode("utf-8")).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> List[Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+    # Valid JSON isn't enough: the keyset needs exactly (sort key, id), both SQL scalars
+    if (not isinstance(values, list) or len(values) != 2
+            or not all(isinstance(value, (str, int, float)) and not isinstance(value, bool) for value in values)):
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return values
+
+
+def search_jobs(q: str = "", source: str = "", since: str = "", limit: int = 20,
+                cursor: str = "", path: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Ranked search over indexed postings with keyset (cursor) pagination.
+    With `q`, results are ordered by relevance; without it, newest first.
+    `since` keeps postings first seen on or after that ISO date/time.
+    """
+    limit = max(1, min(int(limit or 20), MAX_LIMIT))
+    match = _fts_query(q or "")
+    where, params = [], []
+
+    if source:
+        where.append("j.source = ?")
+        params.append(source)
+    if since:
+        where.append("j.first_seen >= ?")
+        params.append(since)
+
+    if match:
+        select = f"SELECT j.*, {_RANK} AS rank FROM jobs_fts JOIN jobs j ON j.id = jobs_fts.rowid"
+        where.insert(0, "jobs_fts MATCH ?")
+        params.insert(0, match)
+        order = "rank, j.id"
+        if cursor:
+            last_rank, last_id = _decode_cursor(cursor)
+            where.append(f"({_RANK} > ? OR ({_RANK} = ? AND j.id > ?))")
+            params.extend([last_rank, last_rank, last_id])
+    else:
+        select = "SELECT j.*, NULL AS rank FROM jobs j"
+        order = "j.first_seen DESC, j.id DESC"
+        if cursor:
+            last_seen, last_id = _decode_cursor(cursor)
+            where.append("(j.first_seen < ? OR (j.first_seen = ? AND j.id < ?))")
+            params.extend([last_seen, last_seen, last_id])
+
+    sql = select
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += f" ORDER BY {order} LIMIT ?"
+    params.append(limit + 1)
+
+    conn = connect(path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    next_cursor = None
+    if has_more and rows:
+        last = rows[-1]
+        next_cursor = _encode_cursor([last["rank"], last["id"]] if match else [last["first_seen"], last["id"]])
+
+    results = [
+        {key: row[key] for key in ("canonical_id", "title", "company", "location", "url", "source",
+                                   "first_seen", "last_seen")}
+        for row in rows
+    ]
+    return {"results": results, "count": len(results), "next_cursor": next_cursor}
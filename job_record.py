@@ -0,0 +1,186 @@
+"""
+Job record helpers for JobBot
+Canonical IDs identify the same posting across runs, sources and the Notion database.
+JobRecord is the validated, immutable form every stage after the scrapers works with;
+JobBatch holds a run's records column by column.
+"""
+import re
+import hashlib
+import logging
+from dataclasses import asdict, dataclass, fields, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+logger = logging.getLogger(__name__)
+
+# Placeholder values scrapers use when a field couldn't be found
+MISSING_VALUES = {"", "n/a", "unknown", "none", "null", "-"}
+
+# Source-native posting IDs embedded in URLs. These survive title edits and
+# tracking-parameter changes, so they are preferred over the title/company fallback.
+_URL_ID_PATTERNS = [
+    ("linkedin", re.compile(r"linkedin\.com/jobs/view/(?:[^/?#]*-)?(\d+)", re.IGNORECASE)),
+    ("linkedin", re.compile(r"linkedin\.com/jobs-guest/jobs/api/jobPosting/(\d+)", re.IGNORECASE)),
+    ("handshake", re.compile(r"joinhandshake\.com/(?:job-search|jobs|stu/jobs)/(\d+)", re.IGNORECASE)),
+    ("12twenty", re.compile(r"12twenty\.com/jobPostings/(?:[^?#]*/)?(\d+)", re.IGNORECASE)),
+    ("12twenty", re.compile(r"12twenty\.com/[^?#]*[?&]jobPostingId=(\d+)", re.IGNORECASE)),
+    ("builtin", re.compile(r"builtin\.com/job/[^?#]*/(\d+)", re.IGNORECASE)),
+]
+
+# Per-visit tracking parameters that change on every scrape without the posting changing
+_TRACKING_PARAMS = {"trk", "trackingid", "refid", "position", "pagenum", "ebp", "lipi", "currentjobid"}
+
+
+def is_missing(value: Optional[str]) -> bool:
+    """True for empty values and the placeholders scrapers use for missing fields"""
+    return value is None or str(value).strip().lower() in MISSING_VALUES
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """Lowercase, collapse whitespace and drop punctuation for comparisons"""
+    if is_missing(value):
+        return ""
+    value = re.sub(r"[^\w\s]", " ", str(value).lower())
+    return " ".join(value.split())
+
+
+def canonical_job_id(title: str, company: str, url: str = "") -> str:
+    """
+    Stable identifier for a posting: the source-native ID from the URL when there is one,
+    otherwise a hash of the normalized title and company
+    """
+    for prefix, pattern in _URL_ID_PATTERNS:
+        match = pattern.search(url or "")
+        if match:
+            return f"{prefix}:{match.group(1)}"
+
+    key = f"{normalize_text(title)}|{normalize_text(company)}"
+    return "tc:" + hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def strip_tracking_params(url: str) -> str:
+    """Drop per-visit tracking query parameters (utm_*, LinkedIn trk/refId/...) from a URL"""
+    if not url:
+        return ""
+    parsed = urlparse(url.strip())
+    if not parsed.query:
+        return url.strip()
+    query = [
+        (key, value) for key, value in parse_qsl(parsed.query, keep_blank_values=True)
+        if key.lower() not in _TRACKING_PARAMS and not key.lower().startswith("utm_")
+    ]
+    return urlunparse(parsed._replace(query=urlencode(query)))
+
+
+def clean_field(value: Any) -> str:
+    """Strip and collapse whitespace; every missing-value placeholder becomes an empty string"""
+    if is_missing(value):
+        return ""
+    return " ".join(str(value).split())
+
+
+class InvalidJobError(ValueError):
+    """Raised when a scraped job can't be turned into a JobRecord"""
+
+
+@dataclass(frozen=True, slots=True)
+class JobRecord:
+    """A validated posting. Missing values are always "", never "N/A"/"Unknown"."""
+
+    source: str
+    canonical_id: str
+    title: str
+    company: str = ""
+    location: str = ""
+    url: str = ""
+    description: str = ""
+    posted_date: str = ""
+    seniority: str = ""
+    employment_type: str = ""
+    scraped_at: str = ""
+
+    @classmethod
+    def from_scraped(cls, job: Dict[str, Any], source: str, scraped_at: Optional[str] = None) -> "JobRecord":
+        """Validate and normalize a scraper's dict; raises InvalidJobError if it has no title"""
+        title = clean_field(job.get("title"))
+        if not title:
+            raise InvalidJobError(f"job from {source} has no title: {job!r}")
+        company = clean_field(job.get("company"))
+        url = strip_tracking_params((job.get("url") or "").strip())
+        return cls(
+            source=job.get("source") or source,
+            canonical_id=canonical_job_id(title, company, url),
+            title=title,
+            company=company,
+            location=clean_field(job.get("location")),
+            url=url,
+            # Descriptions keep their line breaks
+            description="" if is_missing(job.get("description")) else str(job["description"]).strip(),
+            posted_date=clean_field(job.get("posted_date")),
+            seniority=clean_field(job.get("seniority")),
+            employment_type=clean_field(job.get("employment_type")),
+            scraped_at=scraped_at or datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        )
+
+    def to_dict(self) -> Dict[str, str]:
+        return asdict(self)
+
+    def with_changes(self, **changes) -> "JobRecord":
+        return replace(self, **changes)
+
+
+JOB_FIELDS: Tuple[str, ...] = tuple(field.name for field in fields(JobRecord))
+
+
+def to_job_records(jobs: Iterable[Dict[str, Any]], source: str) -> List[JobRecord]:
+    """Validate a source's output once; invalid jobs are logged and dropped"""
+    scraped_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    records = []
+    for job in jobs:
+        try:
+            records.append(JobRecord.from_scraped(job, source, scraped_at))
+        except InvalidJobError as e:
+            logger.warning(f"⚠️ Dropping invalid job: {e}")
+    return records
+
+
+class JobBatch:
+    """
+    Column-oriented batch of JobRecords: one tuple per field instead of one object per job.
+    Bulk stages (indexing, dedupe lookups) read whole columns; iterating yields JobRecords.
+    """
+
+    __slots__ = ("_columns", "_length")
+
+    def __init__(self, columns: Dict[str, Sequence[str]]):
+        self._columns = {name: tuple(columns.get(name, ())) for name in JOB_FIELDS}
+        lengths = {len(column) for column in self._columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"JobBatch columns have different lengths: {sorted(lengths)}")
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_records(cls, records: Iterable[JobRecord]) -> "JobBatch":
+        rows = [tuple(getattr(record, name) for name in JOB_FIELDS) for record in records]
+        columns = zip(*rows) if rows else [()] * len(JOB_FIELDS)
+        return cls(dict(zip(JOB_FIELDS, columns)))
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[JobRecord]:
+        for values in zip(*(self._columns[name] for name in JOB_FIELDS)):
+            yield JobRecord(*values)
+
+    def column(self, name: str) -> Tuple[str, ...]:
+        return self._columns[name]
+
+    def rows(self, names: Sequence[str]) -> Iterator[Tuple[str, ...]]:
+        """Tuples of the given columns, e.g. for executemany()"""
+        return zip(*(self._columns[name] for name in names))
+
+    def take(self, indices: Iterable[int]) -> "JobBatch":
+        """A new batch with only the rows at the given positions"""
+        indices = list(indices)
+        return JobBatch({name: [column[i] for i in indices] for name, column in self._columns.items()})
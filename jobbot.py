@@ -0,0 +1,186 @@
+"""
+Command-line entry point for JobBot
+    python -m jobbot run --source linkedin --shard 2/4 --output jsonl --out shard-2.jsonl
+    python -m jobbot merge shard-*.jsonl
+    python -m jobbot replay --source builtin --since 2025-09-01 --out replayed.jsonl
+`run` scrapes sources (optionally one shard of their search queries) and writes validated
+records instead of storing them, so one run can be spread across a CI job matrix. `merge`
+dedupes the shard outputs by canonical ID and stores them in one batch: search index, run
+history and every configured sink. `replay` re-parses archived pages with no network.
+"""
+import os
+import sys
+import json
+import logging
+import argparse
+from typing import Dict, Iterable, Iterator, List
+
+from config_loader import get_config
+from job_record import JobBatch, JobRecord
+from search_queries import parse_shard, shard_of
+
+logger = logging.getLogger("jobbot")
+
+
+def shard_has_work(name: str, shard) -> bool:
+    """Sources without a query list (or on their built-in default) are one unit of work, run by shard 1"""
+    return bool(shard_of(get_config().get_scraper_urls(name) or [None], shard))
+
+
+def write_records(records: List[JobRecord], fmt: str, stream):
+    if fmt == "json":
+        json.dump([record.to_dict() for record in records], stream, indent=2)
+        stream.write("\n")
+        return
+    for record in records:
+        stream.write(json.dumps(record.to_dict()) + "\n")
+
+
+def read_records(paths: Iterable[str]) -> Iterator[JobRecord]:
+    """Records from run outputs (JSON Lines or a JSON array); "-" reads stdin"""
+    for path in paths:
+        stream = sys.stdin if path == "-" else open(path, "r")
+        try:
+            text = stream.read()
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+        rows = json.loads(text) if text.lstrip().startswith("[") else (
+            json.loads(line) for line in text.splitlines() if line.strip())
+        for row in rows:
+            # Re-validated, so hand-edited or older outputs get the same canonical IDs
+            yield JobRecord.from_scraped(row, row.get("source", ""), row.get("scraped_at") or None)
+
+
+def merge_records(records: Iterable[JobRecord]) -> List[JobRecord]:
+    """One record per canonical ID; a field empty in the first copy is filled from later ones"""
+    merged: Dict[str, JobRecord] = {}
+    for record in records:
+        existing = merged.get(record.canonical_id)
+        if existing is None:
+            merged[record.canonical_id] = record
+            continue
+        missing = {field: value for field, value in record.to_dict().items() if value and not getattr(existing, field)}
+        if missing:
+            merged[record.canonical_id] = existing.with_changes(**missing)
+    return list(merged.values())
+
+
+def cmd_run(args) -> int:
+    from sources import get_enabled_sources, get_source_names, run_sources
+
+    shard = parse_shard(args.shard)
+    # Read by search_urls() here and in browser worker processes, which inherit the environment
+    os.environ["JOBBOT_SHARD"] = f"{shard[0]}/{shard[1]}"
+    if args.capture:
+        os.environ["JOBBOT_SNAPSHOTS"] = "1"
+
+    names = args.source or get_enabled_sources()
+    unknown = [name for name in names if name not in get_source_names()]
+    if unknown:
+        logger.error(f"❌ Unknown source(s): {', '.join(unknown)}")
+        return 2
+    names = [name for name in names if shard_has_work(name, shard)]
+    if not names:
+        logger.info(f"🧩 Nothing to do in shard {args.shard}")
+
+    results = run_sources(names) if names else {}
+    records = [record for result in results.values() for record in result["jobs"]]
+    for name, result in results.items():
+        logger.info(f"📊 {name}: {result['count']} jobs ({result['status']}, {result['duration']}s)")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            write_records(records, args.output, f)
+        logger.info(f"💾 Wrote {len(records)} records to {args.out}")
+    else:
+        write_records(records, args.output, sys.stdout)
+    # A failed source fails the job, so the matrix shows which shard broke
+    return 1 if any(result["status"] in ("error", "timeout") for result in results.values()) else 0
+
+
+def cmd_merge(args) -> int:
+    records = list(read_records(args.files))
+    merged = merge_records(records)
+    logger.info(f"🔀 Merged {len(records)} records from {len(args.files)} file(s) into {len(merged)} unique")
+
+    if args.out:
+        with open(args.out, "w") as f:
+            write_records(merged, args.output, f)
+    if args.dry_run:
+        return 0
+
+    from storage_sink import store_batch
+    from run_lease import LeaseHeldError, run_lease
+
+    try:
+        # Same lease as a server run, so a merge never interleaves with one
+        with run_lease():
+            stored = store_batch(JobBatch.from_records(merged))
+    except LeaseHeldError as e:
+        logger.error(f"⏳ Could not store the merged batch: {e}")
+        return 1
+    for name, report in stored["sinks"].items():
+        logger.info(f"✅ {name}: {report['inserted']} inserted, {report['updated']} updated, "
+                    f"{report['unchanged']} unchanged, {report['failed']} failed")
+    return 1 if any(report["failed"] for report in stored["sinks"].values()) else 0
+
+
+def cmd_replay(args) -> int:
+    from snapshots import replay
+    from job_record import to_job_records
+
+    result = replay(args.source, since=args.since, until=args.until, workers=args.workers)
+    records = [record for source, jobs in result["jobs"].items() for record in to_job_records(jobs, source)]
+    if args.out:
+        with open(args.out, "w") as f:
+            write_records(records, args.output, f)
+        logger.info(f"💾 Wrote {len(records)} records to {args.out}")
+    else:
+        write_records(records, args.output, sys.stdout)
+    return 1 if result["errors"] else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="jobbot", description="Scrape job sources and store the results")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="scrape sources and write their records (nothing is stored)")
+    run.add_argument("--source", action="append", help="source to run (repeatable; default: every enabled source)")
+    run.add_argument("--shard", default="1/1", help="run only this slice of each source's queries, e.g. 2/4")
+    run.add_argument("--output", choices=("jsonl", "json"), default="jsonl", help="output format")
+    run.add_argument("--out", help="output file (default: stdout)")
+    run.add_argument("--capture", action="store_true", help="archive every fetched page for offline replay")
+    run.set_defaults(handler=cmd_run)
+
+    merge = commands.add_parser("merge", help="dedupe run outputs and store them in one batch")
+    merge.add_argument("files", nargs="+", help="run outputs to merge ('-' for stdin)")
+    merge.add_argument("--out", help="also write the merged records to this file")
+    merge.add_argument("--output", choices=("jsonl", "json"), default="jsonl", help="format for --out")
+    merge.add_argument("--dry-run", action="store_true", help="merge without storing anything")
+    merge.set_defaults(handler=cmd_merge)
+
+    replay = commands.add_parser("replay", help="re-parse archived search pages offline and write the records")
+    replay.add_argument("--source", action="append", help="source to replay (repeatable; default: every replayable source)")
+    replay.add_argument("--since", default="", help="only pages seen on or after this date (ISO)")
+    replay.add_argument("--until", default="", help="only pages first seen before this date (ISO)")
+    replay.add_argument("--workers", type=int, help="parser processes (default: one per core)")
+    replay.add_argument("--output", choices=("jsonl", "json"), default="jsonl", help="output format")
+    replay.add_argument("--out", help="output file (default: stdout)")
+    replay.set_defaults(handler=cmd_replay)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    # Logs go to stderr so stdout carries only records
+    logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "INFO")), stream=sys.stderr)
+    try:
+        return args.handler(args)
+    except (ValueError, OSError) as e:
+        logger.error(f"❌ {e}")
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
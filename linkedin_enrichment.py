@@ -0,0 +1,189 @@
+"""
+LinkedIn job-detail enrichment for JobBot
+Search cards only carry title, company, location and link. This fetches each posting's
+guest job-posting page for posting date, seniority, employment type and description,
+concurrently through the shared crawl scheduler, and caches results by LinkedIn job id
+so every posting is fetched at most once
+"""
+import re
+import sqlite3
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+from config_loader import get_config
+from crawl_scheduler import fetch
+from job_record import canonical_job_id
+from structured_data import extract_job_posting
+
+logger = logging.getLogger(__name__)
+
+CACHE_FILE = "linkedin_postings.db"
+POSTING_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+ENRICHED_FIELDS = ("posted_date", "seniority", "employment_type", "description")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS postings (
+    job_id TEXT PRIMARY KEY,
+    posted_date TEXT NOT NULL DEFAULT '',
+    seniority TEXT NOT NULL DEFAULT '',
+    employment_type TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    fetched_at TEXT NOT NULL
+)
+"""
+
+_RELATIVE_AGE = re.compile(r"(\d+)\s+(minute|hour|day|week|month|year)s?\s+ago", re.IGNORECASE)
+_UNIT_DAYS = {"minute": 1 / 1440, "hour": 1 / 24, "day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def linkedin_job_id(url: str) -> Optional[str]:
+    """LinkedIn's numeric job id from a job view or guest posting URL"""
+    key = canonical_job_id("", "", url)
+    return key.split(":", 1)[1] if key.startswith("linkedin:") else None
+
+
+def _posted_date(text: str, now: datetime) -> str:
+    """Turn "2 weeks ago" into an approximate ISO date"""
+    match = _RELATIVE_AGE.search(text or "")
+    if not match:
+        return ""
+    days = int(match.group(1)) * _UNIT_DAYS[match.group(2).lower()]
+    return (now - timedelta(days=days)).date().isoformat()
+
+
+def parse_posting(html: str, now: Optional[datetime] = None) -> Dict[str, str]:
+    """Extract the enriched fields from a guest job-posting page"""
+    details = {field: "" for field in ENRICHED_FIELDS}
+    # Prefer the embedded JobPosting; seniority isn't part of it, so it still comes from the criteria list
+    posting = extract_job_posting(html)
+    if posting:
+        details.update({field: posting[field] for field in ENRICHED_FIELDS if field in posting})
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    description = soup.select_one(".show-more-less-html__markup") or soup.select_one(".description__text")
+    if description and not details["description"]:
+        details["description"] = description.get_text("\n", strip=True)
+
+    for item in soup.select("li.description__job-criteria-item"):
+        header = item.select_one(".description__job-criteria-subheader")
+        value = item.select_one(".description__job-criteria-text")
+        if not header or not value:
+            continue
+        label = header.get_text(strip=True).lower()
+        if label.startswith("seniority"):
+            details["seniority"] = value.get_text(strip=True)
+        elif label.startswith("employment") and not details["employment_type"]:
+            details["employment_type"] = value.get_text(strip=True)
+
+    posted = soup.select_one(".posted-time-ago__text")
+    if posted and not details["posted_date"]:
+        details["posted_date"] = _posted_date(posted.get_text(strip=True), now or datetime.now(timezone.utc))
+    return details
+
+
+class PostingCache:
+    """SQLite cache of enriched postings keyed by LinkedIn job id"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_config().get_data_path(CACHE_FILE)
+        conn = self._connect()
+        try:
+            conn.execute(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get_many(self, job_ids: List[str]) -> Dict[str, Dict[str, str]]:
+        found = {}
+        conn = self._connect()
+        try:
+            for start in range(0, len(job_ids), 500):
+                chunk = job_ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT * FROM postings WHERE job_id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                for row in rows:
+                    found[row["job_id"]] = {field: row[field] for field in ENRICHED_FIELDS}
+        finally:
+            conn.close()
+        return found
+
+    def put_many(self, postings: Dict[str, Dict[str, str]]):
+        if not postings:
+            return
+        fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO postings (job_id, posted_date, seniority, employment_type, description, fetched_at) "
+                    "VALUES (:job_id, :posted_date, :seniority, :employment_type, :description, :fetched_at)",
+                    [{"job_id": job_id, "fetched_at": fetched_at, **details} for job_id, details in postings.items()],
+                )
+        finally:
+            conn.close()
+
+
+def fetch_posting(job_id: str) -> Optional[Dict[str, str]]:
+    """Fetch and parse one guest posting page; None if LinkedIn didn't serve it"""
+    response = fetch(POSTING_URL.format(job_id=job_id), timeout=20)
+    if response.status_code != 200:
+        logger.debug(f"⚠️ LinkedIn posting {job_id} returned {response.status_code}")
+        return None
+    return parse_posting(response.text)
+
+
+def enrich_jobs(jobs: List[Dict[str, Any]], max_workers: int = 4, max_fetches: int = 50,
+                cache: Optional[PostingCache] = None) -> Dict[str, int]:
+    """
+    Add posted_date, seniority, employment_type and description to LinkedIn jobs in place.
+    Cached postings cost nothing; up to max_fetches others are fetched by a bounded thread
+    pool (the crawl scheduler's linkedin.com budget still paces the actual requests) and
+    the rest wait for the next run.
+    """
+    cache = cache or PostingCache()
+    by_id: Dict[str, List[Dict[str, Any]]] = {}
+    for job in jobs:
+        job_id = linkedin_job_id(job.get("url", ""))
+        if job_id:
+            by_id.setdefault(job_id, []).append(job)
+
+    cached = cache.get_many(list(by_id))
+    missing = [job_id for job_id in by_id if job_id not in cached]
+    deferred = max(0, len(missing) - max_fetches)
+    missing = missing[:max_fetches]
+    fetched: Dict[str, Dict[str, str]] = {}
+    failed = 0
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="linkedin-enrich") as pool:
+            futures = {job_id: pool.submit(fetch_posting, job_id) for job_id in missing}
+            for job_id, future in futures.items():
+                try:
+                    details = future.result()
+                except Exception as e:
+                    logger.warning(f"⚠️ Could not enrich LinkedIn posting {job_id}: {e}")
+                    details = None
+                if details is None:
+                    failed += 1
+                else:
+                    fetched[job_id] = details
+        cache.put_many(fetched)
+
+    for job_id, details in {**cached, **fetched}.items():
+        for job in by_id[job_id]:
+            job.update({field: value for field, value in details.items() if value})
+
+    report = {"cached": len(cached), "fetched": len(fetched), "failed": failed, "deferred": deferred}
+    logger.info(f"🧾 LinkedIn enrichment: {report['cached']} cached, {report['fetched']} fetched, "
+                f"{report['failed']} failed, {report['deferred']} deferred to the next run")
+    return report
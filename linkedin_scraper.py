@@ -1,44 +1,85 @@
-import requests
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 from config_loader import get_config
+from crawl_scheduler import fetch
+from locations import matches_location
+from resilience import ScrapeError
+from search_queries import run_queries, search_urls
+from snapshots import capture
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_URL = (
+    "https://www.linkedin.com/jobs/search/?currentJobId=4279913253&distance=25"
+    "&f_E=1%2C3%2C4&f_F=prdm%2Cmrkt%2Cit%2Cmgmt%2Canls"
+    "&f_JT=I"
+    "&f_PP=106233382%2C102571732%2C104116203%2C106504367%2C100075706%2C102277331%2C102250832%2C103112676"
+    "&f_T=27%2C270%2C9572%2C2995"
+    "&f_TPR=r2592000"
+    "&f_WT=1%2C3"
+    "&geoId=103644278"
+    "&keywords=Product%20Manager%20Intern"
+    "&origin=JOB_SEARCH_PAGE_JOB_FILTER&refresh=true&sortBy=R"
+)
+
+
 def scrape_linkedin_pm_internships():
     config = get_config()
-    url = config.get_scraper_url("linkedin")
-
-    if not url:
-        logger.warning("⚠️ LinkedIn scraper URL not configured, using default")
-        url = (
-            "https://www.linkedin.com/jobs/search/?currentJobId=4279913253&distance=25"
-            "&f_E=1%2C3%2C4&f_F=prdm%2Cmrkt%2Cit%2Cmgmt%2Canls"
-            "&f_JT=I"
-            "&f_PP=106233382%2C102571732%2C104116203%2C106504367%2C100075706%2C102277331%2C102250832%2C103112676"
-            "&f_T=27%2C270%2C9572%2C2995"
-            "&f_TPR=r2592000"
-            "&f_WT=1%2C3"
-            "&geoId=103644278"
-            "&keywords=Product%20Manager%20Intern"
-            "&origin=JOB_SEARCH_PAGE_JOB_FILTER&refresh=true&sortBy=R"
-        )
-
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
-
-    response = requests.get(url, headers=headers)
-    soup = BeautifulSoup(response.text, "html.parser")
+    settings = config.get_scraper_settings("linkedin")
+    urls = search_urls("linkedin", DEFAULT_URL)
+    # Queries share linkedin.com's crawl budget, so more queries add coverage, not request rate
+    results = run_queries("linkedin", urls, search_linkedin, settings.get("max_concurrent_queries", 3))
+    jobs = filter_jobs(results)
+
+    # Optional detail fetch per posting; a failure here never loses the search results
+    enrich = settings.get("enrich") or {}
+    if jobs and enrich.get("enabled"):
+        try:
+            from linkedin_enrichment import enrich_jobs
+            enrich_jobs(jobs, max_workers=enrich.get("max_workers", 4), max_fetches=enrich.get("max_fetches", 50))
+        except Exception as e:
+            logger.warning(f"⚠️ LinkedIn enrichment failed: {e}")
+
+    return jobs
+
 
+def filter_jobs(results):
+    """Keep the merged search results that match the title filter and a configured location"""
+    config = get_config()
     jobs = []
+    for job in results:
+        # Use config to match title filter instead of hardcoded check; out-of-area
+        # jobs are dropped here, before enrichment fetches or Notion lookups
+        if config.matches_title_filter(job["title"]) and matches_location(job["location"]):
+            jobs.append(job)
+            logger.info(f"✅ {job['title']} at {job['company']} — {job['location']}")
+            logger.info(f"🔗 {job['url']}")
+    return jobs
+
+
+def search_linkedin(url):
+    """Fetch one LinkedIn guest search page and return its job cards, unfiltered"""
+    response = fetch(url, timeout=30)
+    # LinkedIn answers blocked guests with an auth wall (redirect or 999) rather than results
+    if response.status_code != 200 or "authwall" in response.url:
+        raise ScrapeError(f"LinkedIn returned {response.status_code} for {response.url}")
+    capture("linkedin", url, response.text)
+    return parse_search_page(response.text)
+
+
+def parse_search_page(html):
+    """Job cards from a LinkedIn guest search page's HTML (live or a stored snapshot)"""
+    soup = BeautifulSoup(html, "html.parser")
 
     listings = soup.select("ul.jobs-search__results-list li")
+    if not listings and "authwall" in html:
+        raise ScrapeError("LinkedIn served an auth wall instead of search results")
 
     logger.info(f"🔍 Found {len(listings)} LinkedIn job cards")
 
+    jobs = []
     for card in listings:
         try:
             title_tag = card.select_one("h3")
@@ -46,22 +87,12 @@ def scrape_linkedin_pm_internships():
             location_tag = card.select_one(".job-search-card__location")
             link_tag = card.select_one("a")
 
-            title = title_tag.text.strip() if title_tag else "N/A"
-            company = company_tag.text.strip() if company_tag else "N/A"
-            location = location_tag.text.strip() if location_tag else "N/A"
-            job_url = urljoin("https://www.linkedin.com", link_tag["href"]) if link_tag and link_tag.has_attr("href") else ""
-
-            # Use config to match title filter instead of hardcoded check
-            if config.matches_title_filter(title):
-                jobs.append({
-                    "title": title,
-                    "company": company,
-                    "location": location,
-                    "url": job_url
-                })
-
-                logger.info(f"✅ {title} at {company} — {location}")
-                logger.info(f"🔗 {job_url}")
+            jobs.append({
+                "title": title_tag.text.strip() if title_tag else "N/A",
+                "company": company_tag.text.strip() if company_tag else "N/A",
+                "location": location_tag.text.strip() if location_tag else "N/A",
+                "url": urljoin("https://www.linkedin.com", link_tag["href"]) if link_tag and link_tag.has_attr("href") else ""
+            })
 
         except Exception as e:
             logger.error(f"❌ Error parsing LinkedIn job: {e}")
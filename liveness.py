@@ -0,0 +1,268 @@
+"""
+Posting liveness sweeper for JobBot
+Rechecks the application URLs of stored Notion pages and archives postings that have
+closed, so the database only holds live jobs. Each sweep takes the stalest slice of pages
+(never checked first), checks them concurrently through the crawl scheduler's pooled
+session and per-domain budgets, and records every result as it lands, so an interrupted
+sweep resumes where it stopped.
+"""
+import re
+import sqlite3
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from config_loader import get_config
+from crawl_scheduler import fetch
+from job_record import canonical_job_id
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "liveness.db"
+
+# Per-source rules, keyed by canonical ID prefix ("tc" and unknown sites use "default").
+#   closed_statuses: answers that mean the posting is gone
+#   search_redirects: final URLs that, reached through a redirect, mean we were bounced to a search page
+#   markers: page text that means the posting stopped taking applications (needs a GET)
+#   skip: sources behind a login, where an anonymous check says nothing
+LIVENESS_RULES: Dict[str, Dict[str, Any]] = {
+    "linkedin": {
+        "closed_statuses": (404, 410),
+        "search_redirects": (r"linkedin\.com/jobs/search", r"linkedin\.com/jobs/?(?:\?|$)"),
+        "markers": ("no longer accepting applications",),
+    },
+    "builtin": {
+        "closed_statuses": (404, 410),
+        "search_redirects": (r"builtin\.com/jobs(?:/|\?|$)",),
+        "markers": ("this job is no longer available", "this job has expired", "no longer accepting applications"),
+    },
+    "handshake": {"skip": True},
+    "12twenty": {"skip": True},
+    "default": {
+        "closed_statuses": (404, 410),
+        # Bare listing roots only; /careers?gh_jid=... and /jobs/?jobId=... are real postings
+        "search_redirects": (r"/(?:jobs|careers)/?$", r"[?&](?:error|expired)="),
+        "markers": ("no longer accepting applications", "position has been filled",
+                    "job is no longer available", "this job has expired"),
+    },
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checks (
+    page_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status TEXT NOT NULL,
+    reason TEXT NOT NULL DEFAULT '',
+    etag TEXT NOT NULL DEFAULT '',
+    last_modified TEXT NOT NULL DEFAULT '',
+    checked_at TEXT NOT NULL,
+    archived INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+
+def rules_for(url: str) -> Tuple[str, Dict[str, Any]]:
+    prefix = canonical_job_id("", "", url).split(":", 1)[0]
+    return prefix, LIVENESS_RULES.get(prefix, LIVENESS_RULES["default"])
+
+
+def _bounced(url: str, response, rules: Dict[str, Any]) -> bool:
+    """True if the request was redirected away from the posting to a search/listing page"""
+    if not response.history or response.url.rstrip("/") == url.rstrip("/"):
+        return False
+    return any(re.search(pattern, response.url) for pattern in rules["search_redirects"])
+
+
+def check_url(url: str, etag: str = "", last_modified: str = "") -> Dict[str, str]:
+    """
+    Classify one posting as "live", "closed" or "unknown". A HEAD settles status codes and
+    redirects; sources with text markers then get a conditional GET (304 means unchanged, so live).
+    """
+    source, rules = rules_for(url)
+    if rules.get("skip") or not url:
+        return {"status": "unknown", "reason": f"{source} needs a login" if url else "no url"}
+
+    response = fetch(url, method="HEAD", allow_redirects=True, timeout=15)
+    # Some sites refuse HEAD outright; their GET answer decides instead
+    if response.status_code in (405, 501):
+        response = None
+    elif response.status_code in rules["closed_statuses"]:
+        return {"status": "closed", "reason": f"HTTP {response.status_code}"}
+    elif _bounced(url, response, rules):
+        return {"status": "closed", "reason": f"redirected to {response.url}"}
+
+    if response is not None and (response.status_code >= 400 or not rules.get("markers")):
+        status = "live" if response.status_code < 400 else "unknown"
+        return {"status": status, "reason": f"HTTP {response.status_code}"}
+
+    headers = {}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+    response = fetch(url, headers=headers, allow_redirects=True, timeout=20)
+    result = {"etag": response.headers.get("ETag", etag), "last_modified": response.headers.get("Last-Modified", last_modified)}
+    if response.status_code == 304:
+        return {**result, "status": "live", "reason": "not modified"}
+    if response.status_code in rules["closed_statuses"]:
+        return {**result, "status": "closed", "reason": f"HTTP {response.status_code}"}
+    if _bounced(url, response, rules):
+        return {**result, "status": "closed", "reason": f"redirected to {response.url}"}
+    if response.status_code >= 400:
+        return {**result, "status": "unknown", "reason": f"HTTP {response.status_code}"}
+    text = response.text.lower()
+    for marker in rules["markers"]:
+        if marker in text:
+            return {**result, "status": "closed", "reason": f"page says '{marker}'"}
+    return {**result, "status": "live", "reason": f"HTTP {response.status_code}"}
+
+
+class LivenessSweeper:
+    """Incremental, resumable liveness checks over the Notion mirror's live pages"""
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = 200, max_workers: int = 8,
+                 recheck_hours: float = 72, archive: bool = True, archive_batch_size: int = 25):
+        self.path = path or get_config().get_data_path(STATE_FILE)
+        self.batch_size = batch_size
+        self.max_workers = max(1, max_workers)
+        self.recheck_after = timedelta(hours=recheck_hours)
+        self.archive = archive
+        self.archive_batch_size = max(1, archive_batch_size)
+        conn = self._connect()
+        try:
+            conn.execute(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def stalest(self, pages: Dict[str, str]) -> List[Tuple[str, str, Dict[str, str]]]:
+        """(page_id, url, previous check) for the next slice: never-checked pages, then oldest checks"""
+        conn = self._connect()
+        try:
+            checks = {row["page_id"]: dict(row) for row in conn.execute("SELECT * FROM checks WHERE archived = 0")}
+        finally:
+            conn.close()
+        cutoff = (datetime.now(timezone.utc) - self.recheck_after).isoformat()
+        due = [(checks.get(page_id, {}).get("checked_at", ""), page_id, url) for page_id, url in pages.items()]
+        due = sorted(entry for entry in due if entry[0] < cutoff)[:self.batch_size]
+        return [(page_id, url, checks.get(page_id, {})) for _, page_id, url in due]
+
+    def _record(self, page_id: str, url: str, result: Dict[str, str]):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO checks (page_id, url, status, reason, etag, last_modified, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (page_id, url, result["status"], result.get("reason", ""), result.get("etag", ""),
+                     result.get("last_modified", ""), datetime.now(timezone.utc).isoformat(timespec="seconds")),
+                )
+        finally:
+            conn.close()
+
+    def _check(self, page_id: str, url: str, previous: Dict[str, str]) -> Dict[str, str]:
+        try:
+            result = check_url(url, previous.get("etag", ""), previous.get("last_modified", ""))
+        except Exception as e:
+            result = {"status": "unknown", "reason": str(e)[:200]}
+        self._record(page_id, url, result)
+        return result
+
+    def sweep(self) -> Dict[str, int]:
+        """Check the stalest slice of pages and archive the ones that closed"""
+        from notion_mirror import get_notion_mirror
+
+        mirror = get_notion_mirror()
+        mirror.ensure_fresh()
+        pages = {entry["page_id"]: entry["fields"]["url"] for entry in mirror.index().values()}
+        slice_ = self.stalest(pages)
+        report = {"pages": len(pages), "checked": len(slice_), "live": 0, "closed": 0, "unknown": 0, "archived": 0}
+
+        logger.info(f"🩺 Checking {len(slice_)} of {len(pages)} postings for liveness...")
+        closed = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="liveness") as pool:
+            futures = {page_id: pool.submit(self._check, page_id, url, previous) for page_id, url, previous in slice_}
+            for page_id, future in futures.items():
+                result = future.result()
+                report[result["status"]] += 1
+                if result["status"] == "closed":
+                    closed.append(page_id)
+
+        if self.archive:
+            # Closed pages an interrupted sweep never got to archive are picked up here too
+            conn = self._connect()
+            try:
+                leftover = [row[0] for row in conn.execute("SELECT page_id FROM checks WHERE status = 'closed' AND archived = 0")]
+            finally:
+                conn.close()
+            closed += [page_id for page_id in leftover if page_id in pages and page_id not in closed]
+            if closed:
+                report["archived"] = self.archive_pages(closed, mirror)
+        logger.info(f"🩺 Liveness sweep: {report['live']} live, {report['closed']} closed "
+                    f"({report['archived']} archived), {report['unknown']} unknown")
+        return report
+
+    def archive_pages(self, page_ids: List[str], mirror) -> int:
+        """Archive closed pages in Notion, a batch of concurrent requests at a time"""
+        archived = 0
+        for start in range(0, len(page_ids), self.archive_batch_size):
+            chunk = page_ids[start:start + self.archive_batch_size]
+            with ThreadPoolExecutor(max_workers=min(3, len(chunk)), thread_name_prefix="archive") as pool:
+                outcomes = list(pool.map(self._archive_one, chunk))
+            done = [page_id for page_id, ok in zip(chunk, outcomes) if ok]
+            for page_id in done:
+                mirror.mark_archived(page_id)
+            conn = self._connect()
+            try:
+                with conn:
+                    conn.executemany("UPDATE checks SET archived = 1 WHERE page_id = ?", [(page_id,) for page_id in done])
+            finally:
+                conn.close()
+            archived += len(done)
+        return archived
+
+    @staticmethod
+    def _archive_one(page_id: str) -> bool:
+        from notion_api import archive_notion_page
+        try:
+            archive_notion_page(page_id)
+            return True
+        except Exception as e:
+            logger.warning(f"⚠️ Could not archive Notion page {page_id}: {e}")
+            return False
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM checks WHERE archived = 0 GROUP BY status").fetchall())
+            archived = conn.execute("SELECT COUNT(*) FROM checks WHERE archived = 1").fetchone()[0]
+            oldest = conn.execute("SELECT MIN(checked_at) FROM checks WHERE archived = 0").fetchone()[0]
+        finally:
+            conn.close()
+        return {**counts, "archived": archived, "oldest_check": oldest}
+
+
+_sweeper: Optional[LivenessSweeper] = None
+_sweeper_lock = threading.Lock()
+
+
+def get_liveness_sweeper() -> LivenessSweeper:
+    """Get the process-wide liveness sweeper (singleton pattern)"""
+    global _sweeper
+    with _sweeper_lock:
+        if _sweeper is None:
+            settings = get_config().get_liveness_settings()
+            _sweeper = LivenessSweeper(
+                batch_size=settings.get("batch_size", 200),
+                max_workers=settings.get("max_workers", 8),
+                recheck_hours=settings.get("recheck_hours", 72),
+                archive=settings.get("archive", True),
+                archive_batch_size=settings.get("archive_batch_size", 25),
+            )
+        return _sweeper
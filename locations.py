@@ -0,0 +1,255 @@
+"""
+Location normalization and geo filtering for JobBot
+Free-text locations from every scraper ("San Francisco, CA", "NYC / Remote",
+"Hybrid - Chicago, IL", BuiltIn's multi-location lists) are parsed against a precomputed
+alias index of US states, cities, metro areas and remote/hybrid markers, then matched
+against job_search.locations and remote_preferences with set lookups per token
+"""
+import re
+import logging
+import threading
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Set, Tuple
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+STATES = {
+    "AL": "alabama", "AK": "alaska", "AZ": "arizona", "AR": "arkansas", "CA": "california",
+    "CO": "colorado", "CT": "connecticut", "DE": "delaware", "DC": "district of columbia",
+    "FL": "florida", "GA": "georgia", "HI": "hawaii", "ID": "idaho", "IL": "illinois",
+    "IN": "indiana", "IA": "iowa", "KS": "kansas", "KY": "kentucky", "LA": "louisiana",
+    "ME": "maine", "MD": "maryland", "MA": "massachusetts", "MI": "michigan", "MN": "minnesota",
+    "MS": "mississippi", "MO": "missouri", "MT": "montana", "NE": "nebraska", "NV": "nevada",
+    "NH": "new hampshire", "NJ": "new jersey", "NM": "new mexico", "NY": "new york",
+    "NC": "north carolina", "ND": "north dakota", "OH": "ohio", "OK": "oklahoma", "OR": "oregon",
+    "PA": "pennsylvania", "RI": "rhode island", "SC": "south carolina", "SD": "south dakota",
+    "TN": "tennessee", "TX": "texas", "UT": "utah", "VT": "vermont", "VA": "virginia",
+    "WA": "washington", "WV": "west virginia", "WI": "wisconsin", "WY": "wyoming",
+}
+
+# metro -> (state, aliases). The metro's own cities and common nicknames all map to it.
+METROS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "sf-bay-area": ("CA", (
+        "san francisco", "sf", "bay area", "san francisco bay area", "oakland", "berkeley",
+        "san jose", "palo alto", "mountain view", "menlo park", "sunnyvale", "redwood city",
+        "santa clara", "san mateo", "south san francisco", "cupertino", "foster city",
+        "emeryville", "fremont", "san bruno", "burlingame", "los gatos", "milpitas",
+    )),
+    "nyc": ("NY", (
+        "new york city", "nyc", "manhattan", "brooklyn", "queens", "bronx", "staten island",
+        "greater new york city area", "jersey city", "hoboken", "long island city",
+    )),
+    "chicago": ("IL", ("chicago", "evanston", "greater chicago area", "chicagoland", "oak brook", "schaumburg")),
+    "los-angeles": ("CA", ("los angeles", "la", "santa monica", "culver city", "pasadena", "irvine", "burbank", "playa vista")),
+    "san-diego": ("CA", ("san diego", "la jolla")),
+    "seattle": ("WA", ("seattle", "bellevue", "redmond", "kirkland")),
+    "boston": ("MA", ("boston", "cambridge", "somerville", "waltham", "greater boston")),
+    "austin": ("TX", ("austin",)),
+    "dallas": ("TX", ("dallas", "fort worth", "plano", "irving")),
+    "houston": ("TX", ("houston",)),
+    "denver": ("CO", ("denver", "boulder")),
+    "washington-dc": ("DC", ("washington dc", "washington d c", "dc", "d c", "arlington", "mclean", "reston", "bethesda")),
+    "atlanta": ("GA", ("atlanta",)),
+    "miami": ("FL", ("miami",)),
+    "philadelphia": ("PA", ("philadelphia",)),
+    "pittsburgh": ("PA", ("pittsburgh",)),
+    "minneapolis": ("MN", ("minneapolis", "st paul", "saint paul")),
+    "salt-lake-city": ("UT", ("salt lake city", "lehi")),
+    "portland": ("OR", ("portland",)),
+    "phoenix": ("AZ", ("phoenix", "scottsdale", "tempe")),
+    "detroit": ("MI", ("detroit", "ann arbor")),
+    "columbus": ("OH", ("columbus",)),
+    "nashville": ("TN", ("nashville",)),
+    "raleigh": ("NC", ("raleigh", "durham", "research triangle")),
+}
+
+REMOTE_MARKERS = ("remote", "anywhere", "work from home", "wfh", "distributed", "virtual")
+HYBRID_MARKERS = ("hybrid",)
+ONSITE_MARKERS = ("onsite", "on site", "in office", "in person")
+COUNTRY_MARKERS = ("united states", "usa", "us", "united states of america")
+
+MAX_ALIAS_WORDS = 4
+
+# Separators between alternative locations ("NYC / SF", "Chicago; Remote", "Boston or Remote")
+_ALTERNATIVES = re.compile(r"\s*(?:;|\||/|\n|\bor\b|•)\s*", re.IGNORECASE)
+# "IL", "IL 60601", and with a work-mode suffix: "FL (On-site)", "CA - Remote"
+_STATE_ABBREV = re.compile(r"^([A-Z]{2})(?:\s+\d{5}(?:-\d{4})?)?(?:\s*[(\-–]\s*([^)]*)\)?)?$")
+
+
+class ParsedLocation(NamedTuple):
+    metros: FrozenSet[str]
+    states: FrozenSet[str]
+    remote: bool
+    hybrid: bool
+    onsite: bool
+
+    @property
+    def known(self) -> bool:
+        return bool(self.metros or self.states or self.remote or self.hybrid or self.onsite)
+
+
+def _build_alias_index() -> Dict[str, Tuple[str, str]]:
+    """Precompute alias -> (kind, value) for every phrase we recognize"""
+    index: Dict[str, Tuple[str, str]] = {}
+    for abbrev, name in STATES.items():
+        index[name] = ("state", abbrev)
+    for metro, (_, aliases) in METROS.items():
+        for alias in aliases:
+            index[alias] = ("metro", metro)
+    for marker in REMOTE_MARKERS:
+        index[marker] = ("remote", "")
+    for marker in HYBRID_MARKERS:
+        index[marker] = ("hybrid", "")
+    for marker in ONSITE_MARKERS:
+        index[marker] = ("onsite", "")
+    for marker in COUNTRY_MARKERS:
+        index[marker] = ("country", "")
+    # "New York" alone means the city far more often than the state in job postings;
+    # "New York, NY" still resolves to both through the abbreviation
+    index["new york"] = ("metro", "nyc")
+    return index
+
+
+ALIASES = _build_alias_index()
+METRO_STATES = {metro: state for metro, (state, _) in METROS.items()}
+# Every state a metro's cities are in, for checking a metro against an explicit "City, ST"
+METRO_AREA_STATES = {metro: {state} for metro, state in METRO_STATES.items()}
+METRO_AREA_STATES["nyc"] |= {"NJ"}
+METRO_AREA_STATES["washington-dc"] |= {"VA", "MD"}
+
+
+def _words(text: str) -> List[str]:
+    return re.sub(r"[^\w\s]", " ", text.lower()).split()
+
+
+def _match_words(words: List[str], found: Dict[str, Set[str]]):
+    """Greedy longest-match of word n-grams against the alias index"""
+    i = 0
+    while i < len(words):
+        for size in range(min(MAX_ALIAS_WORDS, len(words) - i), 0, -1):
+            hit = ALIASES.get(" ".join(words[i:i + size]))
+            if hit:
+                found[hit[0]].add(hit[1])
+                i += size
+                break
+        else:
+            i += 1
+
+
+def _parse_alternative(alternative: str, found: Dict[str, Set[str]]) -> Set[str]:
+    """Parse one alternative ("Portland, ME") into `found`; returns its explicit state codes"""
+    words_found: Dict[str, Set[str]] = {kind: set() for kind in found}
+    abbrevs: Set[str] = set()
+    for part in alternative.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        # Two-letter state codes only count as their own comma part ("Chicago, IL"),
+        # so words like "in" or "or" inside a phrase are never read as states
+        abbrev = _STATE_ABBREV.match(part)
+        if abbrev and abbrev.group(1) in STATES:
+            abbrevs.add(abbrev.group(1))
+            _match_words(_words(abbrev.group(2) or ""), words_found)
+            continue
+        _match_words(_words(part), words_found)
+
+    if abbrevs:
+        if "DC" in abbrevs and "WA" in words_found["state"]:
+            # "Washington, DC" is the capital, not Washington state
+            words_found["metro"].add("washington-dc")
+        # An explicit state wins over what the words suggest: "Portland, ME" is not the
+        # Oregon metro, and "Kansas City, MO" doesn't add Kansas
+        words_found["metro"] = {metro for metro in words_found["metro"] if METRO_AREA_STATES[metro] & abbrevs}
+        words_found["state"] = abbrevs
+    for kind, values in words_found.items():
+        found[kind] |= values
+    return abbrevs
+
+
+def parse_location(text: Optional[str]) -> ParsedLocation:
+    """Parse a free-text location (possibly several alternatives) into metros, states and markers"""
+    found: Dict[str, Set[str]] = {kind: set() for kind in ("metro", "state", "remote", "hybrid", "onsite", "country")}
+    abbrevs: Set[str] = set()
+    for alternative in _ALTERNATIVES.split(text or ""):
+        abbrevs |= _parse_alternative(alternative, found)
+
+    in_dc = "DC" in found["state"] or "washington-dc" in found["metro"]
+    if in_dc and "WA" in found["state"] and "WA" not in abbrevs:
+        # "Washington, DC" is the capital, not Washington state
+        found["state"].discard("WA")
+        found["metro"].add("washington-dc")
+    states = set(found["state"]) | {METRO_STATES[metro] for metro in found["metro"]}
+    return ParsedLocation(
+        metros=frozenset(found["metro"]),
+        states=frozenset(states),
+        remote=bool(found["remote"]),
+        hybrid=bool(found["hybrid"]),
+        onsite=bool(found["onsite"]),
+    )
+
+
+class LocationFilter:
+    """Matches parsed job locations against the configured areas and remote preferences"""
+
+    def __init__(self, locations: List[str], remote_preferences: List[str]):
+        self.metros: Set[str] = set()
+        self.states: Set[str] = set()
+        for location in locations:
+            parsed = parse_location(location)
+            if parsed.metros:
+                self.metros |= parsed.metros
+            else:
+                # A location with no city ("California, United States") covers the whole state
+                self.states |= parsed.states
+            if not parsed.metros and not parsed.states:
+                logger.warning(f"⚠️ Unrecognized job_search location: {location!r}")
+        preferences = {p.lower().replace("-", "") for p in remote_preferences}
+        self.allow_remote = "remote" in preferences
+        self.allow_hybrid = "hybrid" in preferences
+        self.allow_onsite = "onsite" in preferences
+
+    def in_area(self, parsed: ParsedLocation) -> bool:
+        if not self.metros and not self.states:
+            return True
+        return bool(parsed.metros & self.metros) or bool(parsed.states & self.states)
+
+    def matches(self, location: Optional[str]) -> bool:
+        """
+        True if a job at this location should be kept. Locations we can't parse are kept,
+        so a scraper's missing or odd location never silently drops a job.
+        """
+        parsed = parse_location(location)
+        if not parsed.known:
+            return True
+        if parsed.remote and self.allow_remote:
+            return True
+        if not (parsed.metros or parsed.states):
+            # Remote-only jobs need "remote"; a bare "Hybrid" or "Onsite" can't be placed
+            return not parsed.remote
+        if parsed.hybrid and not parsed.onsite and not self.allow_hybrid:
+            return False
+        if not parsed.hybrid and not parsed.remote and not self.allow_onsite:
+            return False
+        return self.in_area(parsed)
+
+
+_filter: Optional[LocationFilter] = None
+_filter_lock = threading.Lock()
+
+
+def get_location_filter() -> LocationFilter:
+    """Get the filter for job_search.locations / remote_preferences (singleton pattern)"""
+    global _filter
+    with _filter_lock:
+        if _filter is None:
+            config = get_config()
+            _filter = LocationFilter(config.get_locations(), config.get_remote_preferences())
+        return _filter
+
+
+def matches_location(location: Optional[str]) -> bool:
+    """Check a scraped location against the configured areas (always True if the filter is off)"""
+    if not get_config().location_filter_enabled():
+        return True
+    return get_location_filter().matches(location)
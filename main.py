@@ -1,14 +1,25 @@
+import asyncio
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
-from builtin_scraper import scrape_builtin_pm_internships
-from linkedin_scraper import scrape_linkedin_pm_internships
-from CMS_scraper import login_and_scrape as scrape_cms_jobs
-from handshake_scraper import login_and_scrape as scrape_handshake_jobs
-from notion_api import push_job_to_notion, get_jobs_from_notion
-from apscheduler.triggers.cron import CronTrigger
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from apscheduler.triggers.interval import IntervalTrigger
 import logging
 from apscheduler.schedulers.background import BackgroundScheduler
 from config_loader import get_config
+from browser_worker import get_browser_pool, shutdown_browser_pool
+from crawl_scheduler import get_crawl_scheduler
+from events import format_sse, get_event_broker, publish
+from forensics import get_forensics
+from job_record import JobBatch
+from liveness import get_liveness_sweeper
+from outbox import get_outbox
+from run_lease import LeaseHeldError, get_lease_backend, run_lease
+from selector_cache import get_selector_cache
+from snapshots import get_snapshot_store
+from source_schedule import get_source_schedule
+from storage_sink import sink_stats, store_batch
+from sources import (get_enabled_sources, get_loaded_sources, get_source_breaker, get_source_names,
+                     get_source_spec, run_sources)
 import os
 
 
@@ -30,10 +41,13 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("🚀 Starting scheduler...")
     scheduler.start()
+    # Finish any Notion writes a previous process queued but never completed
+    scheduler.add_job(resume_outbox, id="outbox_resume", replace_existing=True)
     yield
     # Shutdown
     logger.info("🛑 Shutting down scheduler...")
     scheduler.shutdown()
+    shutdown_browser_pool()
 
 
 app = FastAPI(
@@ -44,107 +58,160 @@ app = FastAPI(
 )
 
 
-def run_scraper_job():
+def run_scraper_job(names=None):
+    """
+    Run the given sources (default: every enabled source) through scrape, index and Notion sync.
+    Only one process at a time may run; others get a run_in_progress error instead.
+    """
+    try:
+        with run_lease():
+            return _run_pipeline(names)
+    except LeaseHeldError as e:
+        logger.warning(f"⏳ Skipping run: {e}")
+        return {
+            "error": "run_in_progress",
+            "message": str(e),
+            "holder": e.holder
+        }
+
+
+def _run_pipeline(names=None):
     logger.info("🚀 Running job scraper...")
 
-    # Initialize job lists
-    builtin_jobs = []
-    linkedin_jobs = []
-    cms_jobs = []
-    handshake_jobs = []
+    # Scraper modules (and Playwright/Notion clients) are imported only for enabled sources
+    enabled = get_enabled_sources()
+    if names is not None:
+        enabled = [name for name in enabled if name in names]
+    results = {}
+    publish("run", stage="started", sources=enabled)
 
     try:
-        # Run scrapers only if enabled in config
-        if config.is_scraper_enabled("builtin"):
-            logger.info("🔍 Running BuiltIn scraper...")
-            builtin_jobs = scrape_builtin_pm_internships()
-        else:
-            logger.info("⏭️ BuiltIn scraper disabled in config")
-
-        if config.is_scraper_enabled("linkedin"):
-            logger.info("🔍 Running LinkedIn scraper...")
-            linkedin_jobs = scrape_linkedin_pm_internships()
-        else:
-            logger.info("⏭️ LinkedIn scraper disabled in config")
-
-        if config.is_scraper_enabled("cms"):
-            logger.info("🔍 Running CMS scraper...")
-            cms_jobs = scrape_cms_jobs()
-        else:
-            logger.info("⏭️ CMS scraper disabled in config")
-
-        if config.is_scraper_enabled("handshake"):
-            logger.info("🔍 Running Handshake scraper...")
-            handshake_jobs = scrape_handshake_jobs()
-        else:
-            logger.info("⏭️ Handshake scraper disabled in config")
+        for name in get_source_names():
+            if name not in enabled and names is None:
+                logger.info(f"⏭️ {name} scraper disabled in config")
+        # Async browser sources share one worker and run concurrently
+        results = run_sources(enabled)
 
     except Exception as e:
         logger.exception(f"❌ Top-level scrape failure: {e}")
+        publish("run", stage="failed", error=str(e))
+        # Without a recorded run the sources stay the most overdue and are re-dispatched every stagger gap
+        schedule = get_source_schedule()
+        for name in enabled:
+            schedule.record_run(name, "error", 0)
         return {
             "error": "scrape_failed",
             "message": str(e)
         }
 
-    all_jobs = (builtin_jobs or []) + (linkedin_jobs or []) + (cms_jobs or []) + (handshake_jobs or [])
-
-    logger.info(f"📊 Scraped {len(builtin_jobs or [])} jobs from BuiltIn.")
-    logger.info(f"📊 Scraped {len(linkedin_jobs or [])} jobs from LinkedIn.")
-    logger.info(f"📊 Scraped {len(cms_jobs or [])} jobs from CMS (12twenty).")
-    logger.info(f"📊 Scraped {len(handshake_jobs or [])} jobs from Handshake.")
+    for name, result in results.items():
+        logger.info(f"📊 Scraped {result['count']} jobs from {result['label']} ({result['status']}, {result['duration']}s).")
+    # One columnar batch of validated records for the rest of the run
+    all_jobs = JobBatch.from_records(job for result in results.values() for job in result.pop("jobs"))
     logger.info(f"🔢 Total jobs scraped: {len(all_jobs)}")
-
-    added = 0
-    for job in all_jobs:
-        try:
-            title = job.get("title", "")
-            company = job.get("company", "")
-            location = job.get("location", "")
-            url = job.get("url", "")
-
-            if not title or not company:
-                logger.warning(f"⚠️ Skipping job with missing fields: title='{title}' company='{company}' url='{url}'")
-                continue
-
-            if get_jobs_from_notion(title, company, url):
-                logger.info(f"🟡 Skipping duplicate: {title} at {company}")
-                continue
-
-            logger.info(f"🆕 Adding job: {title} at {company} ({location})")
-            if url:
-                logger.info(f"→ URL: {url}")
-            else:
-                logger.warning(f"⚠️ No URL available for this job")
-            push_job_to_notion(job)
-            added += 1
-
-        except Exception as e:
-            logger.exception(f"❌ Failed to add job '{job}': {e}")
-
-    logger.info(f"✅ Finished run. Total new jobs added to Notion: {added}")
-
-    return {
-        "builtin_jobs": len(builtin_jobs),
-        "linkedin_jobs": len(linkedin_jobs),
-        "cms_jobs": len(cms_jobs),
-        "handshake_jobs": len(handshake_jobs),
-        "total_scraped": len(all_jobs),
-        "total_added": added
+    stored = store_batch(all_jobs)
+
+    # Feed each source's yield back into its schedule
+    schedule = get_source_schedule()
+    for name, result in results.items():
+        result["new"] = stored["new"].get(name, 0)
+        schedule.record_run(name, result["status"], result["new"])
+
+    # A run over its latency budget arms trace/HAR capture for that source's next run
+    forensics = get_forensics()
+    for name, result in results.items():
+        if result["status"] != "skipped":
+            forensics.record_run(name, result["duration"], get_source_spec(name).get("latency_budget"))
+
+    sink_reports = stored["sinks"]
+    primary = next(iter(sink_reports.values()))
+    added = primary["inserted"]
+
+    logger.info("✅ Finished run. " + "; ".join(
+        f"{name}: {sink_report['inserted']} inserted, {sink_report['updated']} updated, "
+        f"{sink_report['unchanged']} unchanged, {sink_report['failed']} failed"
+        for name, sink_report in sink_reports.items()
+    ))
+
+    report = {f"{name}_jobs": result["count"] for name, result in results.items()}
+    report["source_status"] = {
+        name: {key: result[key] for key in ("status", "new", "duration", "error", "attempts", "peak_rss_mb") if key in result}
+        for name, result in results.items()
     }
+    report["total_scraped"] = len(all_jobs)
+    report["total_added"] = added
+    report["total_indexed"] = stored["indexed"]
+    report["sinks"] = sink_reports
+    if "notion" in sink_reports:
+        report["notion_sync"] = sink_reports["notion"]
+    publish("run", stage="finished", total_scraped=len(all_jobs), total_added=added,
+            source_status=report["source_status"])
+    return report
+
+
+def resume_outbox():
+    """Drain outbox entries left by an earlier run or whose retry backoff has passed"""
+    outbox = get_outbox()
+    if not outbox.pending_count(due_only=True):
+        return None
+    try:
+        with run_lease():
+            return outbox.drain()
+    except LeaseHeldError as e:
+        # The running pipeline drains the outbox itself when it finishes
+        logger.debug(f"⏳ Outbox resume skipped: {e}")
+        return None
+
+
+def dispatch_due_source():
+    """Scheduler tick: run the most overdue source, if any, respecting the stagger gap"""
+    enabled = get_enabled_sources()
+    schedule = get_source_schedule()
+    try:
+        # Hold the lease while choosing, so two processes never pick the same due source
+        with run_lease():
+            schedule.reload()
+            schedule.plan(enabled)
+            name = schedule.due_source(enabled)
+            if name:
+                logger.info(f"⏰ {name} is due")
+                _run_pipeline([name])
+            elif get_outbox().pending_count(due_only=True):
+                get_outbox().drain()
+    except LeaseHeldError as e:
+        logger.debug(f"⏳ Dispatcher tick skipped: {e}")
+
+
+def sweep_liveness():
+    """Scheduled job: recheck the stalest stored postings and archive the closed ones"""
+    try:
+        # Its own lease, so sweeps never wait on scrapes but two workers never sweep at once
+        with run_lease("liveness"):
+            return get_liveness_sweeper().sweep()
+    except LeaseHeldError as e:
+        logger.debug(f"⏳ Liveness sweep skipped: {e}")
+        return None
 
 
 scheduler.add_job(
-    run_scraper_job,
-    CronTrigger.from_crontab(config.get_cron_schedule(), timezone=config.get_timezone()),
-    id="daily_scraper_job",
+    dispatch_due_source,
+    IntervalTrigger(seconds=config.get_scheduler_settings().get("tick_seconds", 60)),
+    id="source_dispatcher",
+    max_instances=1,
+    coalesce=True,
     replace_existing=True
 )
 
-
-@app.on_event("startup")
-def startup_scheduler():
-    logger.info("🚀 Starting scheduler...")
-    scheduler.start()
+liveness = config.get_liveness_settings()
+if liveness.get("enabled", True):
+    scheduler.add_job(
+        sweep_liveness,
+        IntervalTrigger(hours=liveness.get("interval_hours", 6)),
+        id="liveness_sweeper",
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
 
 
 @app.get("/health")
@@ -153,24 +220,72 @@ def health_check():
     return {
         "status": "healthy",
         "version": "2.0.0",
-        "scrapers": {
-            "builtin": config.is_scraper_enabled("builtin"),
-            "linkedin": config.is_scraper_enabled("linkedin"),
-            "cms": config.is_scraper_enabled("cms"),
-            "handshake": config.is_scraper_enabled("handshake")
-        },
+        "scrapers": {name: config.is_scraper_enabled(name) for name in get_source_names()},
+        "loaded_scrapers": get_loaded_sources(),
+        "circuit_breakers": {name: get_source_breaker(name).snapshot() for name in get_enabled_sources()},
+        "crawl": get_crawl_scheduler().stats(),
+        "browser_workers": get_browser_pool().stats(),
+        "notion_outbox": get_outbox().stats(),
+        "sinks": sink_stats(),
+        "selector_cache": get_selector_cache().stats(),
+        "events": get_event_broker().stats(),
+        "forensics": get_forensics().stats(),
+        "liveness": get_liveness_sweeper().stats(),
+        "snapshots": get_snapshot_store().stats(),
         "scheduler": {
             "cron": config.get_cron_schedule(),
-            "timezone": config.get_timezone()
+            "timezone": config.get_timezone(),
+            "sources": get_source_schedule().snapshot(),
+            "run_lease": get_lease_backend().holder("scrape")
         }
     }
 
 
+@app.get("/jobs")
+def search_jobs_endpoint(q: str = "", source: str = "", since: str = "", limit: int = 20, cursor: str = ""):
+    """Ranked full-text search over every scraped posting, with cursor pagination"""
+    from job_index import search_jobs
+    try:
+        return search_jobs(q=q, source=source, since=since, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@app.get("/events")
+async def events_stream(request: Request, types: str = ""):
+    """
+    Server-Sent Events: "job" as each job is committed to Notion, "source" progress during
+    a run, and "run" start/finish. `types` is an optional comma-separated filter.
+    """
+    broker = get_event_broker()
+    keepalive = config.get_event_settings().get("keepalive_seconds", 15)
+    kinds = {kind.strip() for kind in types.split(",") if kind.strip()} or None
+    subscription = broker.subscribe(asyncio.get_running_loop(), kinds)
+
+    async def stream():
+        try:
+            while not await request.is_disconnected():
+                event = await subscription.get(timeout=keepalive)
+                # A comment line keeps proxies from closing an idle connection
+                yield format_sse(event) if event else ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 @app.get("/run-scraper")
 def run_scraper_on_demand():
     logger.info("🚀 Received request to run scraper on demand.")
     try:
         results = run_scraper_job()
+        if results.get("error") == "run_in_progress":
+            return {
+                "status": "busy",
+                "message": results["message"],
+                "holder": results["holder"]
+            }
         return {
             "status": "ok",
             "sources": results
@@ -4,21 +4,34 @@ import logging
 from notion_client import Client
 from dotenv import load_dotenv
 from urllib.parse import urlparse, urlunparse
+from config_loader import get_config
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-# Expect NOTION_API_KEY to be set (aligns with README and deployment docs)
-NOTION_API_KEY = os.getenv("NOTION_API_KEY") or os.getenv("NOTION_TOKEN")
-NOTION_DATABASE_ID = os.getenv("NOTION_DATABASE_ID")
+_notion = None
 
-if not NOTION_API_KEY:
-    raise RuntimeError("NOTION_API_KEY (or NOTION_TOKEN) is not set in environment")
-if not NOTION_DATABASE_ID:
-    raise RuntimeError("NOTION_DATABASE_ID is not set in environment")
 
-notion = Client(auth=NOTION_API_KEY)
-db_id = NOTION_DATABASE_ID
+def get_notion_client():
+    """Create the Notion client on first use so importing this module is cheap"""
+    global _notion
+    if _notion is None:
+        # Expect NOTION_API_KEY to be set (aligns with README and deployment docs)
+        api_key = os.getenv("NOTION_API_KEY") or os.getenv("NOTION_TOKEN")
+        if not api_key:
+            raise RuntimeError("NOTION_API_KEY (or NOTION_TOKEN) is not set in environment")
+        if not os.getenv("NOTION_DATABASE_ID"):
+            raise RuntimeError("NOTION_DATABASE_ID is not set in environment")
+        _notion = Client(auth=api_key)
+    return _notion
+
+
+def get_database_id() -> str:
+    """Get the Notion database ID from the environment"""
+    database_id = os.getenv("NOTION_DATABASE_ID")
+    if not database_id:
+        raise RuntimeError("NOTION_DATABASE_ID is not set in environment")
+    return database_id
 
 
 def normalize_url(u: str) -> str:
@@ -35,6 +48,15 @@ def normalize_url(u: str) -> str:
 
 
 def get_jobs_from_notion(title: str, company: str, url: str = ""):
+    # Answer from the local mirror when it's available; fall back to a live query
+    try:
+        from notion_mirror import get_notion_mirror
+        mirror = get_notion_mirror()
+        mirror.ensure_fresh()
+        return mirror.contains(title, company, url)
+    except Exception as e:
+        logger.warning(f"⚠️ Notion mirror unavailable, querying the API directly: {e}")
+
     url = normalize_url(url)  # normalize before querying
     try:
         # Build filter conditions - only include URL if it's provided
@@ -56,8 +78,8 @@ def get_jobs_from_notion(title: str, company: str, url: str = ""):
                 "url": {"equals": url}
             })
         
-        response = notion.databases.query(
-            database_id=db_id,
+        response = get_notion_client().databases.query(
+            database_id=get_database_id(),
             filter={"and": filter_conditions}
         )
 
@@ -76,24 +98,86 @@ def get_jobs_from_notion(title: str, company: str, url: str = ""):
         return False
 
 
+def build_job_properties(fields):
+    """Build Notion page properties for the given job fields (title, company, location, url)"""
+    config = get_config()
+    properties = {}
+    if "title" in fields:
+        properties[config.get_notion_property("title")] = {"title": [{"text": {"content": fields["title"] or ""}}]}
+    if "company" in fields:
+        properties[config.get_notion_property("company")] = {"rich_text": [{"text": {"content": fields["company"] or ""}}]}
+    if "location" in fields:
+        properties[config.get_notion_property("location")] = {"rich_text": [{"text": {"content": fields["location"] or ""}}]}
+    if "url" in fields:
+        # Notion rejects empty strings for URL properties; None clears the value
+        properties[config.get_notion_property("url")] = {"url": normalize_url(fields["url"]) or None}
+    return properties
+
+
+def _plain_text(prop):
+    """Join the plain text of a title/rich_text property"""
+    parts = prop.get("title") or prop.get("rich_text") or []
+    return "".join(part.get("plain_text") or part.get("text", {}).get("content", "") for part in parts)
+
+
+def read_job_properties(page):
+    """Read job fields (title, company, location, url) back out of a Notion page"""
+    config = get_config()
+    props = page.get("properties", {})
+    return {
+        "title": _plain_text(props.get(config.get_notion_property("title"), {})),
+        "company": _plain_text(props.get(config.get_notion_property("company"), {})),
+        "location": _plain_text(props.get(config.get_notion_property("location"), {})),
+        "url": props.get(config.get_notion_property("url"), {}).get("url") or "",
+    }
+
+
+def query_notion_pages(filter=None, sorts=None, page_size=100):
+    """Yield every page in the database matching `filter`, following pagination"""
+    kwargs = {"database_id": get_database_id(), "page_size": page_size}
+    if filter:
+        kwargs["filter"] = filter
+    if sorts:
+        kwargs["sorts"] = sorts
+
+    while True:
+        response = get_notion_client().databases.query(**kwargs)
+        for page in response.get("results", []):
+            yield page
+        if not response.get("has_more"):
+            break
+        kwargs["start_cursor"] = response.get("next_cursor")
+
+
+def update_notion_page(page_id, properties):
+    """Patch only the given properties of an existing page"""
+    return get_notion_client().pages.update(page_id=page_id, properties=properties)
+
+
+def retrieve_notion_page(page_id):
+    """Fetch one page, archived or not (databases.query only returns live pages)"""
+    return get_notion_client().pages.retrieve(page_id=page_id)
+
+
+def archive_notion_page(page_id):
+    """Archive (soft-delete) a page; it can still be restored from Notion's trash"""
+    return get_notion_client().pages.update(page_id=page_id, archived=True)
+
+
 def push_job_to_notion(job):
     try:
-        normalized_url = normalize_url(job.get("url", ""))
-        
-        # Build properties dict
-        properties = {
-            "Job Title": {"title": [{"text": {"content": job.get("title", "")}}]},
-            "Company": {"rich_text": [{"text": {"content": job.get("company", "")}}]},
-            "Location": {"rich_text": [{"text": {"content": job.get("location", "")}}]}
+        fields = {
+            "title": job.get("title", ""),
+            "company": job.get("company", ""),
+            "location": job.get("location", ""),
         }
-        
         # Only add URL if it's provided
-        if normalized_url:
-            properties["Application URL"] = {"url": normalized_url}
-        
-        notion.pages.create(
-            parent={"database_id": db_id},
-            properties=properties
+        if normalize_url(job.get("url", "")):
+            fields["url"] = job.get("url", "")
+
+        return get_notion_client().pages.create(
+            parent={"database_id": get_database_id()},
+            properties=build_job_properties(fields)
         )
     except Exception as e:
         logger.error(f"❌ Error creating Notion page for '{job.get('title','')}' at '{job.get('company','')}': {e}")
@@ -0,0 +1,313 @@
+"""
+Persistent local mirror of the Notion jobs database
+Bootstrapped with one full scan, then refreshed with delta queries on last_edited_time
+so sync cost scales with the day's changes rather than the size of the database.
+Delta queries never return archived pages, so each delta refresh also re-reads a few
+live pages directly, least recently checked first, and a periodic full scan catches the rest.
+"""
+import sqlite3
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from config_loader import get_config
+from job_record import canonical_job_id, normalize_text
+from notion_api import normalize_url, query_notion_pages, read_job_properties, retrieve_notion_page
+
+logger = logging.getLogger(__name__)
+
+MIRROR_FILE = "notion_mirror.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    page_id TEXT PRIMARY KEY,
+    canonical_id TEXT NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    company TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    last_edited_time TEXT NOT NULL DEFAULT '',
+    archived INTEGER NOT NULL DEFAULT 0,
+    seen_in_scan INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS pages_canonical ON pages(canonical_id, archived);
+CREATE TABLE IF NOT EXISTS probes (
+    page_id TEXT PRIMARY KEY,
+    probed_at TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_UPSERT = """
+INSERT INTO pages (page_id, canonical_id, title, company, location, url, last_edited_time, archived, seen_in_scan)
+VALUES (:page_id, :canonical_id, :title, :company, :location, :url, :last_edited_time, :archived, 1)
+ON CONFLICT(page_id) DO UPDATE SET
+    canonical_id = excluded.canonical_id,
+    title = excluded.title,
+    company = excluded.company,
+    location = excluded.location,
+    url = excluded.url,
+    last_edited_time = excluded.last_edited_time,
+    archived = excluded.archived,
+    seen_in_scan = 1
+"""
+
+
+def _page_row(page: Dict[str, Any]) -> Dict[str, Any]:
+    fields = read_job_properties(page)
+    return {
+        "page_id": page["id"],
+        "canonical_id": canonical_job_id(fields["title"], fields["company"], fields["url"]),
+        "last_edited_time": page.get("last_edited_time") or "",
+        "archived": int(bool(page.get("archived") or page.get("in_trash"))),
+        **fields,
+    }
+
+
+class NotionMirror:
+    """SQLite copy of the Notion database's job pages"""
+
+    def __init__(self, path: Optional[str] = None, reconcile_hours: float = 168, max_age_seconds: float = 300,
+                 probe_pages: int = 10):
+        self.path = path or get_config().get_data_path(MIRROR_FILE)
+        self.reconcile_hours = reconcile_hours
+        self.max_age_seconds = max_age_seconds
+        self.probe_pages = max(0, int(probe_pages))
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _get_meta(self, conn: sqlite3.Connection, key: str) -> Optional[str]:
+        row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, conn: sqlite3.Connection, key: str, value: str):
+        conn.execute("INSERT INTO meta (key, value) VALUES (?, ?) "
+                     "ON CONFLICT(key) DO UPDATE SET value = excluded.value", (key, value))
+
+    def _full_scan_due(self, conn: sqlite3.Connection) -> bool:
+        if not self._get_meta(conn, "cursor"):
+            return True
+        last_full = self._get_meta(conn, "last_full_sync")
+        if not last_full or not self.reconcile_hours:
+            return not last_full
+        age = datetime.now(timezone.utc) - datetime.fromisoformat(last_full)
+        return age > timedelta(hours=self.reconcile_hours)
+
+    def refresh(self, full: bool = False) -> Dict[str, Any]:
+        """
+        Bring the mirror up to date. The first call (and a periodic reconcile) scans the whole
+        database and marks pages that disappeared as archived; every other call only fetches
+        pages edited since the stored cursor, then probes up to probe_pages live pages.
+        """
+        with self._lock:
+            started = time.monotonic()
+            conn = self._connect()
+            try:
+                full = full or self._full_scan_due(conn)
+                cursor = self._get_meta(conn, "cursor")
+                if full:
+                    pages = query_notion_pages()
+                else:
+                    # Notion's timestamps have minute precision, so re-read the cursor's minute
+                    pages = query_notion_pages(
+                        filter={"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": cursor}},
+                        sorts=[{"timestamp": "last_edited_time", "direction": "ascending"}],
+                    )
+
+                with conn:
+                    if full:
+                        conn.execute("UPDATE pages SET seen_in_scan = 0")
+                    fetched, newest = self._apply_pages(conn, pages, cursor or "")
+                    removed = 0
+                    if full:
+                        # databases.query never returns archived/trashed pages, so a page
+                        # missing from a full scan has been archived or deleted in Notion
+                        removed = conn.execute(
+                            "UPDATE pages SET archived = 1 WHERE seen_in_scan = 0 AND archived = 0"
+                        ).rowcount
+                        self._set_meta(conn, "last_full_sync", datetime.now(timezone.utc).isoformat())
+                    if newest:
+                        self._set_meta(conn, "cursor", newest)
+            finally:
+                conn.close()
+            if not full:
+                removed = self._probe_archived()
+
+            self._last_refresh = time.monotonic()
+            summary = {
+                "mode": "full" if full else "delta",
+                "fetched": fetched,
+                "archived": removed,
+                "duration": round(time.monotonic() - started, 2),
+            }
+            logger.info(f"🪞 Notion mirror {summary['mode']} refresh: {fetched} pages fetched, "
+                        f"{removed} archived ({summary['duration']}s)")
+            return summary
+
+    def _apply_pages(self, conn: sqlite3.Connection, pages: Iterable[Dict[str, Any]], cursor: str):
+        fetched, newest = 0, cursor
+        batch = []
+        for page in pages:
+            row = _page_row(page)
+            batch.append(row)
+            fetched += 1
+            newest = max(newest, row["last_edited_time"])
+            if len(batch) >= 500:
+                conn.executemany(_UPSERT, batch)
+                batch = []
+        if batch:
+            conn.executemany(_UPSERT, batch)
+        return fetched, newest
+
+    def _probe_archived(self) -> int:
+        """
+        Re-read the live pages checked least recently (never-checked first, newest edits first)
+        and mark the ones archived or deleted in Notion. Returns how many were marked.
+        """
+        if not self.probe_pages:
+            return 0
+        conn = self._connect()
+        try:
+            page_ids = [row["page_id"] for row in conn.execute(
+                "SELECT p.page_id FROM pages p LEFT JOIN probes r ON r.page_id = p.page_id "
+                "WHERE p.archived = 0 ORDER BY r.probed_at IS NOT NULL, r.probed_at, p.last_edited_time DESC LIMIT ?",
+                (self.probe_pages,),
+            )]
+        finally:
+            conn.close()
+
+        gone, probed = [], []
+        for page_id in page_ids:
+            try:
+                page = retrieve_notion_page(page_id)
+            except Exception as e:
+                if getattr(e, "code", "") != "object_not_found":
+                    # Notion is unhappy; the rest wait for the next refresh
+                    logger.warning(f"⚠️ Could not probe Notion page {page_id}: {e}")
+                    break
+                page = {"archived": True}
+            probed.append(page_id)
+            if page.get("archived") or page.get("in_trash"):
+                gone.append(page_id)
+
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("INSERT INTO probes (page_id, probed_at) VALUES (?, ?) "
+                                 "ON CONFLICT(page_id) DO UPDATE SET probed_at = excluded.probed_at",
+                                 [(page_id, now) for page_id in probed])
+                conn.executemany("UPDATE pages SET archived = 1 WHERE page_id = ?", [(page_id,) for page_id in gone])
+        finally:
+            conn.close()
+        return len(gone)
+
+    def ensure_fresh(self):
+        """Refresh if the mirror hasn't been refreshed in this process recently"""
+        if time.monotonic() - self._last_refresh > self.max_age_seconds or not self._last_refresh:
+            self.refresh()
+
+    # Reads
+    def index(self) -> Dict[str, Dict[str, Any]]:
+        """Map canonical ID -> {"page_id", "fields"} for every live page"""
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT * FROM pages WHERE archived = 0 ORDER BY last_edited_time"
+            ).fetchall()
+        finally:
+            conn.close()
+        index = {}
+        for row in rows:
+            index.setdefault(row["canonical_id"], {
+                "page_id": row["page_id"],
+                "fields": {key: row[key] for key in ("title", "company", "location", "url")},
+            })
+        return index
+
+    def contains(self, title: str, company: str, url: str = "") -> bool:
+        """Dedupe check against the mirror: same canonical ID, or same title/company (and URL if given)"""
+        url = normalize_url(url)
+        conn = self._connect()
+        try:
+            if conn.execute("SELECT 1 FROM pages WHERE canonical_id = ? AND archived = 0 LIMIT 1",
+                            (canonical_job_id(title, company, url),)).fetchone():
+                return True
+            rows = conn.execute(
+                "SELECT title, company, url FROM pages WHERE archived = 0 AND title = ? COLLATE NOCASE",
+                (title,),
+            ).fetchall()
+        finally:
+            conn.close()
+        for row in rows:
+            if normalize_text(row["company"]) != normalize_text(company):
+                continue
+            if not url or normalize_url(row["url"]) == url:
+                return True
+        return False
+
+    # Writes made by this process, applied locally so the mirror never lags our own changes
+    def upsert_page(self, page: Dict[str, Any]):
+        if not page or not page.get("id"):
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(_UPSERT, _page_row(page))
+        finally:
+            conn.close()
+
+    def mark_archived(self, page_id: str):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("UPDATE pages SET archived = 1 WHERE page_id = ?", (page_id,))
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            live = conn.execute("SELECT COUNT(*) FROM pages WHERE archived = 0").fetchone()[0]
+            archived = conn.execute("SELECT COUNT(*) FROM pages WHERE archived = 1").fetchone()[0]
+            return {
+                "live_pages": live,
+                "archived_pages": archived,
+                "cursor": self._get_meta(conn, "cursor"),
+                "last_full_sync": self._get_meta(conn, "last_full_sync"),
+            }
+        finally:
+            conn.close()
+
+
+_mirror: Optional[NotionMirror] = None
+_mirror_lock = threading.Lock()
+
+
+def get_notion_mirror() -> NotionMirror:
+    """Get the process-wide Notion mirror (singleton pattern)"""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            settings = get_config().get_notion_mirror_settings()
+            _mirror = NotionMirror(
+                reconcile_hours=settings.get("reconcile_hours", 168),
+                max_age_seconds=settings.get("max_age_seconds", 300),
+                probe_pages=settings.get("probe_pages", 10),
+            )
+        return _mirror
@@ -0,0 +1,123 @@
+"""
+Incremental Notion sync for JobBot
+Matches scraped jobs to existing pages by canonical ID and patches only the fields that changed
+"""
+import logging
+from typing import Any, Dict, Iterable, Optional
+
+from job_record import JobRecord, is_missing, strip_tracking_params
+from notion_api import build_job_properties, normalize_url, push_job_to_notion, update_notion_page
+from notion_mirror import NotionMirror, get_notion_mirror
+
+logger = logging.getLogger(__name__)
+
+SYNC_FIELDS = ("title", "company", "location", "url")
+
+
+def job_fields(job: JobRecord) -> Dict[str, str]:
+    """Extract the synced fields from a job record, normalizing the URL like Notion stores it"""
+    fields = {field: getattr(job, field) for field in SYNC_FIELDS}
+    fields["url"] = normalize_url(fields["url"])
+    return fields
+
+
+def diff_fields(stored: Dict[str, str], scraped: Dict[str, str]) -> Dict[str, str]:
+    """
+    Minimal set of fields to update. A missing scraped value (empty, "N/A", "Unknown")
+    never overwrites a stored one.
+    """
+    changes = {}
+    for field in SYNC_FIELDS:
+        new = scraped.get(field, "")
+        if is_missing(new):
+            continue
+        old = stored.get(field, "")
+        if field == "url":
+            old = normalize_url(strip_tracking_params(old))
+        if new != old:
+            changes[field] = new
+    return changes
+
+
+def _is_archived_error(error: Exception) -> bool:
+    """True if Notion rejected a write because the page was archived or deleted"""
+    code = getattr(error, "code", "")
+    return code == "object_not_found" or (code == "validation_error" and "archived" in str(error).lower())
+
+
+class NotionSync:
+    """
+    One sync pass over the Notion database. Existing pages come from the local
+    mirror (refreshed with a delta query), so unchanged jobs cost no API calls at all.
+    """
+
+    def __init__(self, mirror: Optional[NotionMirror] = None):
+        self.mirror = mirror or get_notion_mirror()
+        self._index: Optional[Dict[str, Dict[str, Any]]] = None
+        self.report = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+
+    def load_index(self) -> Dict[str, Dict[str, Any]]:
+        """Map canonical ID -> {"page_id", "fields"} for every live page in the database"""
+        if self._index is None:
+            self.mirror.refresh()
+            self._index = self.mirror.index()
+            logger.info(f"📚 Indexed {len(self._index)} existing Notion pages from the mirror")
+        return self._index
+
+    def _insert(self, key: str, fields: Dict[str, str]) -> str:
+        title, company = fields["title"], fields["company"]
+        logger.info(f"🆕 Adding job: {title} at {company} ({fields['location']})")
+        if fields["url"]:
+            logger.info(f"→ URL: {fields['url']}")
+        else:
+            logger.warning(f"⚠️ No URL available for this job")
+        page = push_job_to_notion(fields) or {}
+        self.mirror.upsert_page(page)
+        self._index[key] = {"page_id": page.get("id"), "fields": fields}
+        return "inserted"
+
+    def sync_job(self, job: JobRecord) -> str:
+        """Insert, patch or skip a single job. Returns the outcome name."""
+        fields = job_fields(job)
+        title, company = fields["title"], fields["company"]
+        if is_missing(title) or is_missing(company):
+            logger.warning(f"⚠️ Skipping job with missing fields: title='{title}' company='{company}' url='{fields['url']}'")
+            return "skipped"
+
+        index = self.load_index()
+        key = job.canonical_id
+        existing = index.get(key)
+
+        if existing is None:
+            return self._insert(key, fields)
+
+        changes = diff_fields(existing["fields"], fields)
+        if not changes:
+            logger.debug(f"🟡 Unchanged: {title} at {company}")
+            return "unchanged"
+
+        logger.info(f"✏️ Updating {title} at {company}: {', '.join(sorted(changes))}")
+        try:
+            page = update_notion_page(existing["page_id"], build_job_properties(changes))
+        except Exception as e:
+            if not _is_archived_error(e):
+                raise
+            # The mirror still had a page someone archived in Notion; treat the job as new
+            logger.info(f"🗑️ Page for {title} at {company} was archived in Notion; re-adding")
+            self.mirror.mark_archived(existing["page_id"])
+            del index[key]
+            return self._insert(key, fields)
+        self.mirror.upsert_page(page)
+        existing["fields"].update(changes)
+        return "updated"
+
+    def sync(self, jobs: Iterable[JobRecord]) -> Dict[str, int]:
+        """Sync a batch of jobs and return inserted/updated/unchanged/skipped/failed counts"""
+        for job in jobs:
+            try:
+                outcome = self.sync_job(job)
+            except Exception as e:
+                logger.exception(f"❌ Failed to sync job '{job.title}' at '{job.company}': {e}")
+                outcome = "failed"
+            self.report[outcome] += 1
+        return dict(self.report)
@@ -0,0 +1,222 @@
+"""
+Durable Notion outbox for JobBot
+Scraped jobs are written to a local SQLite outbox before any Notion call, and the writer
+drains it job by job. If the process dies mid-push, the next drain (on startup or the next
+run) finishes the writes instead of re-scraping. Draining is idempotent: rows are keyed by
+canonical ID, and a job that reached Notion before the crash is found in the mirror and
+comes out as "unchanged".
+"""
+import json
+import time
+import sqlite3
+import logging
+import threading
+from typing import Any, Dict, Iterable, Optional
+
+from config_loader import get_config
+from events import publish
+from job_record import JOB_FIELDS, JobRecord
+from resilience import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_FILE = "outbox.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    canonical_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT,
+    enqueued_at REAL NOT NULL,
+    next_attempt_at REAL NOT NULL,
+    first_failed_at REAL
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox(status, next_attempt_at, enqueued_at);
+"""
+
+# A newer scrape of the same job replaces the queued payload and gets a fresh retry budget
+_ENQUEUE = """
+INSERT INTO outbox (canonical_id, payload, status, attempts, last_error, enqueued_at, next_attempt_at)
+VALUES (?, ?, 'pending', 0, NULL, ?, ?)
+ON CONFLICT(canonical_id) DO UPDATE SET
+    payload = excluded.payload,
+    status = 'pending',
+    attempts = 0,
+    last_error = NULL,
+    next_attempt_at = excluded.next_attempt_at,
+    first_failed_at = NULL
+"""
+
+# Error codes (notion_client) and HTTP statuses that mean Notion itself is unavailable
+_OUTAGE_CODES = {"rate_limited", "internal_server_error", "service_unavailable", "bad_gateway",
+                 "gateway_timeout", "notionhq_client_request_timeout"}
+
+
+def _is_outage(error: Exception) -> bool:
+    """True if an error says Notion is unreachable, rather than that this one job was rejected"""
+    if isinstance(error, (ConnectionError, TimeoutError)) or getattr(error, "code", "") in _OUTAGE_CODES:
+        return True
+    status = getattr(error, "status", None)
+    if isinstance(status, int) and (status == 429 or status >= 500):
+        return True
+    try:
+        import httpx
+    except ImportError:
+        return False
+    return isinstance(error, httpx.TransportError)
+
+
+class Outbox:
+    """SQLite queue of jobs waiting to be synced to Notion"""
+
+    def __init__(self, path: Optional[str] = None, park_after_hours: float = 24,
+                 retry: Optional[Dict[str, Any]] = None):
+        self.path = path or get_config().get_data_path(OUTBOX_FILE)
+        self.park_after = float(park_after_hours) * 3600
+        # Equal jitter: a retry always waits at least half its backoff, never ~0s
+        self.retry = RetryPolicy.from_settings({"base_delay": 60, "max_delay": 3600, "jitter": "equal", **(retry or {})})
+        # One drain at a time within the process; across processes the run lease serializes
+        self._drain_lock = threading.Lock()
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+            # Outboxes created before first_failed_at existed
+            if "first_failed_at" not in {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}:
+                conn.execute("ALTER TABLE outbox ADD COLUMN first_failed_at REAL")
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, records: Iterable[JobRecord]) -> int:
+        """Persist jobs before pushing; returns the number queued"""
+        now = time.time()
+        rows = [(record.canonical_id, json.dumps(record.to_dict()), now, now) for record in records]
+        if not rows:
+            return 0
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(_ENQUEUE, rows)
+        finally:
+            conn.close()
+        logger.info(f"📮 Queued {len(rows)} jobs in the Notion outbox")
+        return len(rows)
+
+    def pending_count(self, due_only: bool = False) -> int:
+        """Jobs still waiting for Notion; with due_only, just those whose retry backoff has passed"""
+        cutoff = time.time() if due_only else float("inf")
+        conn = self._connect()
+        try:
+            return conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at <= ?", (cutoff,)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+
+    def drain(self, sync=None) -> Dict[str, int]:
+        """
+        Sync every due pending job to Notion. Successes are removed; failures are retried
+        with backoff on later drains and parked as "failed" once a job has kept failing for
+        park_after_hours. An error that means Notion is down ends the drain: the remaining
+        jobs wait, without being charged an attempt.
+        """
+        if sync is None:
+            from notion_sync import NotionSync
+            sync = NotionSync()
+
+        with self._drain_lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    "SELECT canonical_id, payload, attempts, first_failed_at FROM outbox "
+                    "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY enqueued_at",
+                    (time.time(),),
+                ).fetchall()
+                deferred = conn.execute(
+                    "SELECT COUNT(*) FROM outbox WHERE status = 'pending' AND next_attempt_at > ?",
+                    (time.time(),),
+                ).fetchone()[0]
+                report = {**sync.report, "retrying": 0, "dead": 0, "deferred": deferred}
+                if rows:
+                    # Read existing pages once up front; if that fails, every job would fail the same way
+                    try:
+                        sync.load_index()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not load existing Notion pages; leaving {len(rows)} queued jobs for later: {e}")
+                        report["deferred"] += len(rows)
+                        rows = []
+
+                for i, row in enumerate(rows):
+                    payload = json.loads(row["payload"])
+                    record = JobRecord(**{key: payload.get(key, "") for key in JOB_FIELDS})
+                    try:
+                        outcome = sync.sync_job(record)
+                    except Exception as e:
+                        self._record_failure(conn, row, e, report)
+                        if _is_outage(e):
+                            report["deferred"] += len(rows) - i - 1
+                            logger.warning(f"⚠️ Notion unavailable; leaving {len(rows) - i - 1} queued jobs for later")
+                            break
+                        continue
+                    report[outcome] += 1
+                    # Committed per job, so a crash loses at most the job in flight
+                    with conn:
+                        conn.execute("DELETE FROM outbox WHERE canonical_id = ?", (row["canonical_id"],))
+                    if outcome in ("inserted", "updated"):
+                        publish("job", sink="notion", outcome=outcome, **record.to_dict())
+            finally:
+                conn.close()
+
+        if rows or deferred:
+            logger.info(f"📬 Outbox drained {len(rows)} jobs: {report['inserted']} inserted, {report['updated']} updated, "
+                        f"{report['unchanged']} unchanged, {report['retrying']} retrying, {report['dead']} failed for good")
+        return report
+
+    def _record_failure(self, conn: sqlite3.Connection, row: sqlite3.Row, error: Exception, report: Dict[str, int]):
+        now = time.time()
+        attempts = row["attempts"] + 1
+        first_failed_at = row["first_failed_at"] or now
+        report["failed"] += 1
+        if now - first_failed_at >= self.park_after:
+            status, next_attempt = "failed", now
+            report["dead"] += 1
+            logger.error(f"❌ Giving up on {row['canonical_id']} after {attempts} attempts "
+                         f"over {(now - first_failed_at) / 3600:.1f}h: {error}")
+        else:
+            status, next_attempt = "pending", now + self.retry.delay(attempts)
+            report["retrying"] += 1
+            logger.warning(f"⚠️ Notion write for {row['canonical_id']} failed (attempt {attempts}): {error}")
+        with conn:
+            conn.execute(
+                "UPDATE outbox SET status = ?, attempts = ?, last_error = ?, next_attempt_at = ?, first_failed_at = ? "
+                "WHERE canonical_id = ?",
+                (status, attempts, str(error)[:500], next_attempt, first_failed_at, row["canonical_id"]),
+            )
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+        finally:
+            conn.close()
+        return {"pending": counts.get("pending", 0), "failed": counts.get("failed", 0)}
+
+
+_outbox: Optional[Outbox] = None
+_outbox_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    """Get the process-wide outbox (singleton pattern)"""
+    global _outbox
+    with _outbox_lock:
+        if _outbox is None:
+            settings = get_config().get_outbox_settings()
+            _outbox = Outbox(park_after_hours=settings.get("park_after_hours", 24), retry=settings.get("retry"))
+        return _outbox
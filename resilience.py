@@ -0,0 +1,222 @@
+"""
+Retry policies and circuit breakers for JobBot sources
+A source that keeps failing (auth walls, hung SSO) is skipped for a cool-down period
+instead of waiting out its full timeouts on every scheduled run
+"""
+import os
+import json
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+
+class ScrapeError(Exception):
+    """Raised by a scraper when its source is unusable (auth wall, login failure, bad response)"""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter (or "equal" jitter: at least half the backoff)"""
+
+    def __init__(self, attempts: int = 1, base_delay: float = 2.0, max_delay: float = 30.0, jitter: str = "full"):
+        self.attempts = max(1, int(attempts))
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.jitter = jitter
+
+    @classmethod
+    def from_settings(cls, settings: Optional[Dict[str, Any]]) -> "RetryPolicy":
+        """Build a policy from a `retry:` config block"""
+        settings = settings or {}
+        return cls(
+            attempts=settings.get("attempts", 1),
+            base_delay=settings.get("base_delay", 2.0),
+            max_delay=settings.get("max_delay", 30.0),
+            jitter=settings.get("jitter", "full"),
+        )
+
+    def delay(self, attempt: int) -> float:
+        """Seconds to sleep before retry number `attempt` (1-based)"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        floor = ceiling / 2 if self.jitter == "equal" else 0
+        return random.uniform(floor, ceiling)
+
+    def call(self, func: Callable[[], Any], label: str = "call", retry_on: tuple = (Exception,),
+             give_up_on: tuple = (), max_attempts: Optional[int] = None) -> Any:
+        """Call `func`, retrying on `retry_on` exceptions (except `give_up_on`) until attempts run out"""
+        attempts = min(self.attempts, max_attempts) if max_attempts else self.attempts
+        for attempt in range(1, attempts + 1):
+            try:
+                return func()
+            except retry_on as e:
+                if isinstance(e, give_up_on) or attempt >= attempts:
+                    raise
+                wait = self.delay(attempt)
+                logger.warning(f"🔁 {label} failed (attempt {attempt}/{attempts}): {e}. Retrying in {wait:.1f}s")
+                time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker:
+    closed -> open after `failure_threshold` consecutive failures,
+    open -> half_open once `cooldown_seconds` have passed (a single probe is allowed),
+    half_open -> closed on success, or back to open on failure
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, cooldown_seconds: float = 21600,
+                 on_change: Optional[Callable[["CircuitBreaker"], None]] = None):
+        self.name = name
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_seconds = float(cooldown_seconds)
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self._on_change = on_change
+
+    def allow_request(self) -> bool:
+        """Return True if a call may proceed; moves open -> half_open when the cool-down is over"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN:
+                if time.time() - (self.opened_at or 0) < self.cooldown_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+                logger.info(f"🟠 Circuit for '{self.name}' half-open, allowing one probe")
+            # Half-open: only one probe at a time
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        self._changed()
+        return True
+
+    @property
+    def is_probe(self) -> bool:
+        """True while the current call is the single half-open probe"""
+        return self.state == self.HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            was_closed = self.state == self.CLOSED and self.consecutive_failures == 0
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self.last_error = None
+            self._probe_in_flight = False
+        if not was_closed:
+            logger.info(f"🟢 Circuit for '{self.name}' closed")
+            self._changed()
+
+    def record_failure(self, error: str = ""):
+        with self._lock:
+            self.consecutive_failures += 1
+            self.last_error = error or None
+            self._probe_in_flight = False
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.time()
+                logger.warning(
+                    f"🔴 Circuit for '{self.name}' open after {self.consecutive_failures} consecutive failures; "
+                    f"skipping for {int(self.cooldown_seconds)}s"
+                )
+        self._changed()
+
+    def retry_after(self) -> float:
+        """Seconds until an open breaker will allow a probe (0 if not open)"""
+        if self.state != self.OPEN or self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown_seconds - (time.time() - self.opened_at))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Serializable view of the breaker, used for /health and persistence"""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "opened_at": self.opened_at,
+            "retry_after": round(self.retry_after(), 1),
+            "last_error": self.last_error,
+        }
+
+    def restore(self, data: Dict[str, Any]):
+        self.state = data.get("state", self.CLOSED)
+        self.consecutive_failures = int(data.get("consecutive_failures", 0))
+        self.opened_at = data.get("opened_at")
+        self.last_error = data.get("last_error")
+        # A probe that was in flight when the process died never reported back
+        if self.state == self.HALF_OPEN:
+            self.state = self.OPEN
+
+    def _changed(self):
+        if self._on_change:
+            self._on_change(self)
+
+
+# Breaker state survives restarts (Render spin-down) so a dead source stays skipped
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+_STATE_FILE = "circuit_breakers.json"
+
+
+def _load_state() -> Dict[str, Any]:
+    try:
+        with open(get_config().get_data_path(_STATE_FILE), "r") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logger.warning(f"⚠️ Could not read circuit breaker state: {e}")
+        return {}
+
+
+def _save_state(_breaker: CircuitBreaker = None):
+    with _breakers_lock:
+        data = {name: b.snapshot() for name, b in _breakers.items()}
+    path = get_config().get_data_path(_STATE_FILE)
+    try:
+        # Written aside and swapped in, so a crash or a second writer never leaves a truncated file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"⚠️ Could not persist circuit breaker state: {e}")
+
+
+def get_breaker(name: str, settings: Optional[Dict[str, Any]] = None) -> CircuitBreaker:
+    """Get (or create) the breaker for a source, restoring persisted state on first use"""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is not None:
+            return breaker
+        settings = settings or {}
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.get("failure_threshold", 3),
+            cooldown_seconds=settings.get("cooldown_seconds", 21600),
+            on_change=_save_state,
+        )
+        persisted = _load_state().get(name)
+        if persisted:
+            breaker.restore(persisted)
+        _breakers[name] = breaker
+        return breaker
+
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Snapshot of every breaker created in this process"""
+    with _breakers_lock:
+        return {name: b.snapshot() for name, b in _breakers.items()}
@@ -0,0 +1,141 @@
+"""
+Parquet run history for JobBot
+Every run's job batch is appended to a Parquet dataset under data/history, partitioned
+by date and source, with dictionary-encoded string columns. Small per-run files are
+compacted into one file per partition once their day is over.
+"""
+import os
+import uuid
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Sequence
+
+from config_loader import get_config
+from job_record import JOB_FIELDS, JobBatch
+
+logger = logging.getLogger(__name__)
+
+HISTORY_DIR = "history"
+PARTITION_COLS = ["date", "source"]
+COMPACTED_FILE = "compacted.parquet"
+
+
+def history_root() -> str:
+    path = get_config().get_data_path(HISTORY_DIR)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _frame(batch: JobBatch, run_id: str, run_at: datetime):
+    import pandas as pd
+
+    df = pd.DataFrame({name: batch.column(name) for name in JOB_FIELDS})
+    df["run_id"] = run_id
+    df["run_at"] = pd.Timestamp(run_at)
+    df["date"] = run_at.date().isoformat()
+    # Categoricals are written as Parquet dictionary pages: each distinct company,
+    # location or source string is stored once per file
+    for name in df.columns:
+        if name not in ("run_at", "description"):
+            df[name] = df[name].astype("category")
+    return df
+
+
+def append_batch(batch: JobBatch, run_at: Optional[datetime] = None, run_id: Optional[str] = None,
+                 root: Optional[str] = None) -> int:
+    """Append a run's jobs to the history dataset; returns the number of rows written"""
+    if not len(batch):
+        return 0
+    run_at = run_at or datetime.now(timezone.utc)
+    run_id = run_id or f"{run_at:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:6]}"
+    df = _frame(batch, run_id, run_at)
+    df.to_parquet(
+        root or history_root(),
+        engine="pyarrow",
+        partition_cols=PARTITION_COLS,
+        index=False,
+        use_dictionary=True,
+        compression="zstd",
+        basename_template=f"run-{run_id}-{{i}}.parquet",
+        existing_data_behavior="overwrite_or_ignore",
+    )
+    logger.info(f"🗄️ Appended {len(df)} jobs to run history ({run_id})")
+    return len(df)
+
+
+def query_history(columns: Optional[Sequence[str]] = None, sources: Optional[Sequence[str]] = None,
+                  since: Optional[str] = None, until: Optional[str] = None, root: Optional[str] = None):
+    """
+    Load history as a DataFrame. `since`/`until` are inclusive ISO dates; partition
+    filters mean only the matching date/source directories are read.
+    """
+    import pandas as pd
+
+    root = root or history_root()
+    filters = []
+    if sources:
+        filters.append(("source", "in", list(sources)))
+    if since:
+        filters.append(("date", ">=", since))
+    if until:
+        filters.append(("date", "<=", until))
+    if not any(entry.startswith("date=") for entry in os.listdir(root)):
+        return pd.DataFrame(columns=list(columns or [*JOB_FIELDS, "run_id", "run_at", "date"]))
+    return pd.read_parquet(root, engine="pyarrow", columns=list(columns) if columns else None,
+                           filters=filters or None)
+
+
+def daily_counts(since: Optional[str] = None, root: Optional[str] = None):
+    """Distinct postings seen per source per day"""
+    df = query_history(columns=["date", "source", "canonical_id"], since=since, root=root)
+    if df.empty:
+        return df
+    return (df.groupby(["date", "source"], observed=True)["canonical_id"]
+              .nunique().rename("jobs").reset_index())
+
+
+def _partitions(root: str) -> List[str]:
+    partitions = []
+    for date_dir in sorted(os.listdir(root)):
+        if not date_dir.startswith("date="):
+            continue
+        for source_dir in sorted(os.listdir(os.path.join(root, date_dir))):
+            if source_dir.startswith("source="):
+                partitions.append(os.path.join(root, date_dir, source_dir))
+    return partitions
+
+
+def compact(before: Optional[date] = None, root: Optional[str] = None) -> int:
+    """
+    Merge the per-run files of each partition dated before `before` (default: today, UTC)
+    into a single file. Returns the number of partitions compacted.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    root = root or history_root()
+    cutoff = (before or datetime.now(timezone.utc).date()).isoformat()
+    compacted = 0
+    for partition in _partitions(root):
+        partition_date = os.path.basename(os.path.dirname(partition)).split("=", 1)[1]
+        files = sorted(f for f in os.listdir(partition) if f.endswith(".parquet"))
+        if partition_date >= cutoff or len(files) < 2:
+            continue
+        paths = [os.path.join(partition, f) for f in files]
+        merged = pa.concat_tables([pq.read_table(path) for path in paths], promote_options="default")
+        # Write next to the old files and swap in, so a crash never loses rows
+        tmp_path = os.path.join(partition, f".{COMPACTED_FILE}.tmp")
+        pq.write_table(merged, tmp_path, use_dictionary=True, compression="zstd")
+        os.replace(tmp_path, os.path.join(partition, COMPACTED_FILE))
+        for f in files:
+            if f != COMPACTED_FILE:
+                os.remove(os.path.join(partition, f))
+        compacted += 1
+    if compacted:
+        logger.info(f"🧹 Compacted {compacted} run history partitions")
+    return compacted
+
+
+def compact_old_partitions(keep_days: int = 1) -> int:
+    """Compact every partition older than `keep_days` days"""
+    return compact(before=datetime.now(timezone.utc).date() - timedelta(days=max(0, keep_days - 1)))
@@ -0,0 +1,219 @@
+"""
+Cross-process run lease for JobBot
+Every scrape run (scheduled or on demand) holds a named lease, so extra uvicorn workers or
+replicas sharing the data directory never run the pipeline twice at once. The holder renews
+the lease while it works; a lease whose holder died stops being renewed and is taken over.
+"""
+import os
+import time
+import socket
+import sqlite3
+import logging
+import importlib
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+LEASE_FILE = "leases.db"
+
+
+class LeaseHeldError(Exception):
+    """Raised when another process holds the lease"""
+
+    def __init__(self, name: str, holder: Optional[Dict[str, Any]]):
+        self.name = name
+        self.holder = holder or {}
+        super().__init__(f"lease '{name}' is held by {self.holder.get('owner', 'another process')}")
+
+
+def make_owner_id() -> str:
+    """host:pid:nonce, so a holder on this host can be checked for liveness"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _owner_is_dead(owner: str) -> bool:
+    """True if the owner ran on this host and its process is gone"""
+    try:
+        host, pid, _ = owner.split(":")
+        pid = int(pid)
+    except ValueError:
+        return False
+    if host != socket.gethostname():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except OSError:
+        return False
+    return False
+
+
+class LeaseBackend(ABC):
+    """Interface for lease storage. Implementations must make acquire() atomic."""
+
+    @abstractmethod
+    def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        """Take the lease for ttl seconds if it is free, expired, held by a dead process or already ours"""
+
+    @abstractmethod
+    def renew(self, name: str, owner: str, ttl: float) -> bool:
+        """Extend our lease by ttl seconds; False if another owner has taken it over"""
+
+    @abstractmethod
+    def release(self, name: str, owner: str):
+        """Give up the lease if we still hold it"""
+
+    @abstractmethod
+    def holder(self, name: str) -> Optional[Dict[str, Any]]:
+        """The current unexpired holder (owner, acquired_at, expires_at), or None"""
+
+
+class SQLiteLeaseBackend(LeaseBackend):
+    """Leases in a SQLite file; works across workers and containers that share the data directory"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_config().get_data_path(LEASE_FILE)
+        conn = self._connect()
+        try:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS leases ("
+                "name TEXT PRIMARY KEY, owner TEXT NOT NULL, acquired_at REAL NOT NULL, expires_at REAL NOT NULL)"
+            )
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit mode so BEGIN IMMEDIATE below controls the write lock explicitly
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def acquire(self, name: str, owner: str, ttl: float) -> bool:
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT owner, expires_at FROM leases WHERE name = ?", (name,)).fetchone()
+            now = time.time()
+            if row and row["owner"] != owner and row["expires_at"] > now and not _owner_is_dead(row["owner"]):
+                conn.execute("ROLLBACK")
+                return False
+            if row and row["owner"] != owner:
+                logger.warning(f"🔓 Taking over stale lease '{name}' from {row['owner']}")
+            conn.execute(
+                "INSERT INTO leases (name, owner, acquired_at, expires_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET owner = excluded.owner, "
+                "acquired_at = excluded.acquired_at, expires_at = excluded.expires_at",
+                (name, owner, now, now + ttl),
+            )
+            conn.execute("COMMIT")
+            return True
+        except Exception:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def renew(self, name: str, owner: str, ttl: float) -> bool:
+        conn = self._connect()
+        try:
+            cursor = conn.execute("UPDATE leases SET expires_at = ? WHERE name = ? AND owner = ?",
+                                  (time.time() + ttl, name, owner))
+            return cursor.rowcount == 1
+        finally:
+            conn.close()
+
+    def release(self, name: str, owner: str):
+        conn = self._connect()
+        try:
+            conn.execute("DELETE FROM leases WHERE name = ? AND owner = ?", (name, owner))
+        finally:
+            conn.close()
+
+    def holder(self, name: str) -> Optional[Dict[str, Any]]:
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT * FROM leases WHERE name = ?", (name,)).fetchone()
+        finally:
+            conn.close()
+        if not row or row["expires_at"] <= time.time():
+            return None
+        return {"owner": row["owner"], "acquired_at": row["acquired_at"], "expires_at": row["expires_at"]}
+
+
+class RunLease:
+    """
+    Context manager holding a named lease for the duration of a run, renewing it from a
+    heartbeat thread. Raises LeaseHeldError on entry if another live process holds it.
+    """
+
+    def __init__(self, name: str, backend: LeaseBackend, ttl: float = 600, heartbeat: float = 60):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.heartbeat = min(heartbeat, ttl / 3)
+        self.owner = make_owner_id()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "RunLease":
+        if not self.backend.acquire(self.name, self.owner, self.ttl):
+            raise LeaseHeldError(self.name, self.backend.holder(self.name))
+        logger.debug(f"🔒 Acquired lease '{self.name}' as {self.owner}")
+        self._thread = threading.Thread(target=self._renew_loop, name=f"lease-{self.name}", daemon=True)
+        self._thread.start()
+        return self
+
+    def _renew_loop(self):
+        while not self._stop.wait(self.heartbeat):
+            try:
+                if not self.backend.renew(self.name, self.owner, self.ttl):
+                    logger.error(f"❌ Lost lease '{self.name}'; another process took it over")
+                    return
+            except Exception as e:
+                logger.warning(f"⚠️ Could not renew lease '{self.name}': {e}")
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        try:
+            self.backend.release(self.name, self.owner)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not release lease '{self.name}': {e}")
+        return False
+
+
+_backend: Optional[LeaseBackend] = None
+_backend_lock = threading.Lock()
+
+
+def get_lease_backend() -> LeaseBackend:
+    """Get the configured lease backend: "sqlite" (default) or a "module:Class" path"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            backend = get_config().get_lease_settings().get("backend", "sqlite")
+            if backend == "sqlite":
+                _backend = SQLiteLeaseBackend()
+            else:
+                module_name, class_name = backend.split(":", 1)
+                _backend = getattr(importlib.import_module(module_name), class_name)()
+        return _backend
+
+
+def run_lease(name: str = "scrape") -> RunLease:
+    """A lease for one run of the named pipeline, with ttl/heartbeat from config"""
+    settings = get_config().get_lease_settings()
+    return RunLease(
+        name,
+        get_lease_backend(),
+        ttl=settings.get("ttl_seconds", 600),
+        heartbeat=settings.get("heartbeat_seconds", 60),
+    )
@@ -0,0 +1,94 @@
+"""
+Multi-query search for JobBot
+A source can run several searches per run (scrapers.<name>.search_urls, or a
+search_url_template filled from `queries` or the title keyword groups). Queries run
+concurrently, paced by the crawl scheduler's per-domain budget, and their results are
+merged and deduplicated by canonical ID before the title and location filters run.
+A run can be limited to one shard of a source's queries (JOBBOT_SHARD="2/4", set by
+`python -m jobbot run --shard 2/4`), so a run can be spread over several runners.
+"""
+import os
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from config_loader import get_config
+from job_record import canonical_job_id
+
+logger = logging.getLogger(__name__)
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """"2/4" -> (2, 4); shards are numbered from 1"""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"shard must look like 2/4, got {value!r}")
+    if not 1 <= index <= count:
+        raise ValueError(f"shard {index}/{count} is out of range")
+    return index, count
+
+
+def current_shard() -> Tuple[int, int]:
+    """This process's shard; (1, 1) when the run isn't sharded"""
+    value = os.getenv("JOBBOT_SHARD", "").strip()
+    return parse_shard(value) if value else (1, 1)
+
+
+def shard_of(items: List[Any], shard: Tuple[int, int]) -> List[Any]:
+    """Every count-th item starting at the shard's index, so shards split the list evenly"""
+    index, count = shard
+    return items[index - 1::count]
+
+
+def search_urls(source: str, default_url: str = "") -> List[str]:
+    """The configured search URLs for a source, falling back to its built-in default"""
+    urls = get_config().get_scraper_urls(source)
+    if not urls and default_url:
+        logger.warning(f"⚠️ {source} search URL not configured, using default")
+        urls = [default_url]
+    shard = current_shard()
+    if shard != (1, 1):
+        total = len(urls)
+        urls = shard_of(urls, shard)
+        logger.info(f"🧩 {source} shard {shard[0]}/{shard[1]}: {len(urls)} of {total} queries")
+    return urls
+
+
+def dedupe_jobs(jobs: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Keep the first job seen for each canonical ID, in order"""
+    merged: Dict[str, Dict[str, Any]] = {}
+    for job in jobs:
+        key = canonical_job_id(job.get("title", ""), job.get("company", ""), job.get("url", ""))
+        merged.setdefault(key, job)
+    return list(merged.values())
+
+
+def run_queries(source: str, urls: List[str], search: Callable[[str], List[Dict[str, Any]]],
+                max_workers: int = 3) -> List[Dict[str, Any]]:
+    """
+    Call search(url) for every URL concurrently and return the merged, deduplicated jobs.
+    A failed query is logged and skipped; if every query fails, the first error is raised.
+    """
+    if not urls:
+        return []
+    if len(urls) == 1:
+        return dedupe_jobs(search(urls[0]))
+
+    results: List[Dict[str, Any]] = []
+    errors: List[Exception] = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(urls))),
+                            thread_name_prefix=f"{source}-query") as pool:
+        futures = [pool.submit(search, url) for url in urls]
+        for url, future in zip(urls, futures):
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                logger.warning(f"⚠️ {source} query failed ({url}): {e}")
+                errors.append(e)
+    if errors and len(errors) == len(urls):
+        raise errors[0]
+
+    merged = dedupe_jobs(results)
+    logger.info(f"🔎 {source}: {len(urls)} queries, {len(results)} results, {len(merged)} unique")
+    return merged
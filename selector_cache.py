@@ -0,0 +1,131 @@
+"""
+Learned selector cache for JobBot
+Browser scrapers keep fallback chains of CSS selectors for fields whose markup drifts
+(CMS row titles and links, Handshake company/location, login inputs and buttons). The
+cache remembers which selector last succeeded per source and field, persists it across
+runs, and tries it first, so a steady-state lookup costs one round-trip instead of a walk
+down the whole chain. Generic fallbacks ("span", "a") are kept out of the learnable chain:
+they match almost any row, so once learned they would shadow the specific selectors for good.
+Hit rates are reported per field.
+"""
+import os
+import json
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "selector_cache.json"
+
+
+class SelectorCache:
+    """Last successful selector and hit/miss counts per source and field"""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or get_config().get_data_path(STATE_FILE)
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Dict[str, Any]]] = self._load()
+        # Counts for the current run, folded into the persisted totals on flush()
+        self._run: Dict[str, Dict[str, Dict[str, int]]] = {}
+
+    def _load(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read selector cache: {e}")
+            return {}
+
+    def ordered(self, source: str, field: str, selectors: Sequence[str]) -> List[str]:
+        """The chain with the learned selector moved to the front"""
+        learned = self._state.get(source, {}).get(field, {}).get("selector")
+        if learned not in selectors:
+            return list(selectors)
+        return [learned] + [selector for selector in selectors if selector != learned]
+
+    def record(self, source: str, field: str, selector: Optional[str], first_try: bool, learn: bool = True):
+        """Note the outcome of one lookup: a first-try hit, a fallback miss, or nothing found"""
+        with self._lock:
+            counts = self._run.setdefault(source, {}).setdefault(field, {"hits": 0, "misses": 0, "empty": 0})
+            if selector is None:
+                counts["empty"] += 1
+                return
+            counts["hits" if first_try else "misses"] += 1
+            if learn:
+                self._state.setdefault(source, {}).setdefault(field, {})["selector"] = selector
+
+    async def first_match(self, source: str, field: str, selectors: Sequence[str],
+                          probe: Callable[[str], Awaitable[Any]], fallbacks: Sequence[str] = ()) -> Any:
+        """
+        Await probe(selector) for each selector, learned one first, then for each generic
+        fallback, and return the first truthy result (None if every selector misses).
+        Exceptions from probe count as a miss. Only `selectors` are ever learned.
+        """
+        for i, selector in enumerate(list(self.ordered(source, field, selectors)) + list(fallbacks)):
+            try:
+                result = await probe(selector)
+            except Exception:
+                result = None
+            if result:
+                self.record(source, field, selector, first_try=i == 0, learn=selector in selectors)
+                return result
+        self.record(source, field, None, first_try=False)
+        return None
+
+    def flush(self, source: str):
+        """Persist the source's learned selectors and totals, and log this run's hit rates"""
+        with self._lock:
+            run = self._run.pop(source, {})
+            learned = self._state.get(source, {})
+            if not run:
+                return
+            # Merge into the file as it is now: other worker processes may have flushed other sources
+            state = self._load()
+            entry = state.setdefault(source, {})
+            for field, counts in run.items():
+                stored = entry.setdefault(field, {"hits": 0, "misses": 0, "empty": 0})
+                for key, value in counts.items():
+                    stored[key] = stored.get(key, 0) + value
+                if learned.get(field, {}).get("selector"):
+                    stored["selector"] = learned[field]["selector"]
+            self._state[source] = entry
+            try:
+                tmp_path = f"{self.path}.{os.getpid()}.tmp"
+                with open(tmp_path, "w") as f:
+                    json.dump(state, f, indent=2)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                logger.warning(f"⚠️ Could not persist selector cache: {e}")
+
+        summary = ", ".join(f"{field} {_hit_rate(counts):.0%}" for field, counts in sorted(run.items()))
+        logger.info(f"🎯 Selector cache hit rates for {source}: {summary}")
+
+    def stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Learned selectors and lifetime hit rates, as persisted"""
+        return {
+            source: {field: {**entry, "hit_rate": round(_hit_rate(entry), 3)} for field, entry in fields.items()}
+            for source, fields in self._load().items()
+        }
+
+
+def _hit_rate(counts: Dict[str, Any]) -> float:
+    found = counts.get("hits", 0) + counts.get("misses", 0)
+    return counts.get("hits", 0) / found if found else 0.0
+
+
+_cache: Optional[SelectorCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_selector_cache() -> SelectorCache:
+    """Get the process-wide selector cache (singleton pattern)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = SelectorCache()
+        return _cache
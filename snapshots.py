@@ -0,0 +1,241 @@
+"""
+Raw page snapshots for JobBot
+With storage.snapshots.enabled (or `python -m jobbot run --capture`), every fetched search
+results page and browser DOM snapshot is kept in data/snapshots/: zstd-compressed objects
+named by the SHA-256 of their content, so a page that hasn't changed is stored once, plus a
+SQLite index of where and when each was seen. Replay feeds stored search pages back through
+the sources' parsers and filters with no network, spread over a process pool.
+"""
+import os
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DIR = "snapshots"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS snapshots (
+    source TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    url TEXT NOT NULL,
+    sha TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    first_seen_at TEXT NOT NULL,
+    last_seen_at TEXT NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (source, kind, url, sha)
+)
+"""
+
+
+def _parse_builtin(html: str, url: str) -> List[Dict[str, Any]]:
+    from builtin_scraper import parse_search_page
+    return parse_search_page(html)
+
+
+def _parse_linkedin(html: str, url: str) -> List[Dict[str, Any]]:
+    from linkedin_scraper import parse_search_page
+    return parse_search_page(html)
+
+
+def _filter_builtin(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from builtin_scraper import filter_jobs
+    return filter_jobs(jobs)
+
+
+def _filter_linkedin(jobs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    from linkedin_scraper import filter_jobs
+    return filter_jobs(jobs)
+
+
+# (source, kind) -> (parse(html, url), filter(jobs)). Browser DOM snapshots ("dom") are
+# archived for inspection only: those scrapers parse live element handles, not HTML.
+REPLAYERS: Dict[Tuple[str, str], Tuple[Callable, Callable]] = {
+    ("builtin", "search"): (_parse_builtin, _filter_builtin),
+    ("linkedin", "search"): (_parse_linkedin, _filter_linkedin),
+}
+
+
+class SnapshotStore:
+    """Content-addressed, zstd-compressed page store with a SQLite index"""
+
+    def __init__(self, root: Optional[str] = None, level: int = 10):
+        self.root = root or get_config().get_data_path(SNAPSHOT_DIR)
+        self.level = level
+        os.makedirs(os.path.join(self.root, "objects"), exist_ok=True)
+        self.index_path = os.path.join(self.root, "index.db")
+        conn = self._connect()
+        try:
+            conn.execute(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.index_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def object_path(self, sha: str) -> str:
+        return os.path.join(self.root, "objects", sha[:2], f"{sha}.zst")
+
+    def put(self, source: str, url: str, content: str, kind: str = "search") -> str:
+        """Store a page (once per distinct content) and note where it was seen; returns its hash"""
+        data = content.encode("utf-8")
+        sha = hashlib.sha256(data).hexdigest()
+        path = self.object_path(sha)
+        if not os.path.exists(path):
+            import zstandard
+
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # A compressor per call: zstandard compressors can't be shared between threads
+            compressed = zstandard.ZstdCompressor(level=self.level).compress(data)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.replace(tmp_path, path)
+
+        now = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(
+                    "INSERT INTO snapshots (source, kind, url, sha, size, first_seen_at, last_seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (source, kind, url, sha) DO UPDATE SET last_seen_at = excluded.last_seen_at, hits = hits + 1",
+                    (source, kind, url, sha, len(data), now, now),
+                )
+        finally:
+            conn.close()
+        return sha
+
+    def get(self, sha: str) -> str:
+        return read_object(self.object_path(sha))
+
+    def select(self, sources: Optional[List[str]] = None, kind: str = "search",
+               since: str = "", until: str = "") -> List[Dict[str, Any]]:
+        """One row per distinct page (source, url, sha) seen in the window, oldest first"""
+        query = "SELECT source, kind, url, sha, MIN(first_seen_at) AS first_seen_at FROM snapshots WHERE kind = ?"
+        params: List[Any] = [kind]
+        if sources:
+            query += f" AND source IN ({','.join('?' * len(sources))})"
+            params += sources
+        if since:
+            query += " AND last_seen_at >= ?"
+            params.append(since)
+        if until:
+            query += " AND first_seen_at < ?"
+            params.append(until)
+        query += " GROUP BY source, kind, url, sha ORDER BY first_seen_at"
+        conn = self._connect()
+        try:
+            return [dict(row) for row in conn.execute(query, params)]
+        finally:
+            conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                "SELECT source, COUNT(*) AS captures, COUNT(DISTINCT sha) AS objects, SUM(hits) AS fetches "
+                "FROM snapshots GROUP BY source"
+            ).fetchall()
+        finally:
+            conn.close()
+        return {row["source"]: {key: row[key] for key in ("captures", "objects", "fetches")} for row in rows}
+
+
+def read_object(path: str) -> str:
+    import zstandard
+
+    with open(path, "rb") as f:
+        return zstandard.ZstdDecompressor().decompress(f.read()).decode("utf-8")
+
+
+def capture_enabled() -> bool:
+    if os.getenv("JOBBOT_SNAPSHOTS", "").strip() in ("1", "true", "yes"):
+        return True
+    return bool(get_config().get_snapshot_settings().get("enabled", False))
+
+
+_store: Optional[SnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_snapshot_store() -> SnapshotStore:
+    """Get the process-wide snapshot store (singleton pattern)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SnapshotStore(level=get_config().get_snapshot_settings().get("level", 10))
+        return _store
+
+
+def capture(source: str, url: str, content: str, kind: str = "search"):
+    """Archive a fetched page when capture is on; never raises into the scraper"""
+    if not content or not capture_enabled():
+        return
+    try:
+        get_snapshot_store().put(source, url, content, kind)
+    except Exception as e:
+        logger.warning(f"⚠️ Could not store {source} snapshot of {url}: {e}")
+
+
+def _replay_one(task: Tuple[str, str, str, str]) -> Tuple[str, List[Dict[str, Any]], str]:
+    """Worker: decompress and parse one snapshot -> (source, jobs, error)"""
+    source, kind, url, path = task
+    try:
+        parse, _ = REPLAYERS[(source, kind)]
+        return source, parse(read_object(path), url), ""
+    except Exception as e:
+        return source, [], f"{url}: {e}"
+
+
+def replay(sources: Optional[List[str]] = None, since: str = "", until: str = "",
+           workers: Optional[int] = None, store: Optional[SnapshotStore] = None) -> Dict[str, Any]:
+    """
+    Re-run the parsers over stored search pages across a process pool, then merge and filter
+    each source's jobs as a live run would. Returns {"jobs": {source: [job dicts]}, "pages",
+    "errors", "seconds"}.
+    """
+    from search_queries import dedupe_jobs
+
+    store = store or get_snapshot_store()
+    sources = sources or sorted({source for source, _ in REPLAYERS})
+    unsupported = [source for source in sources if (source, "search") not in REPLAYERS]
+    if unsupported:
+        raise ValueError(f"no offline parser for {', '.join(unsupported)} (replayable: "
+                         f"{', '.join(sorted(source for source, _ in REPLAYERS))})")
+
+    rows = store.select(sources, "search", since, until)
+    tasks = [(row["source"], row["kind"], row["url"], store.object_path(row["sha"])) for row in rows]
+    workers = max(1, workers or os.cpu_count() or 1)
+    started = time.monotonic()
+
+    parsed: Dict[str, List[Dict[str, Any]]] = {source: [] for source in sources}
+    errors: List[str] = []
+    if tasks:
+        # spawn, not fork: the same reasoning as the browser workers
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            for source, jobs, error in pool.map(_replay_one, tasks, chunksize=max(1, len(tasks) // (workers * 4))):
+                parsed[source].extend(jobs)
+                if error:
+                    errors.append(error)
+
+    jobs = {source: REPLAYERS[(source, "search")][1](dedupe_jobs(found)) for source, found in parsed.items()}
+    seconds = round(time.monotonic() - started, 2)
+    logger.info(f"⏪ Replayed {len(tasks)} pages on {workers} workers in {seconds}s "
+                f"({len(tasks) / seconds if seconds else 0:.0f} pages/s): "
+                + ", ".join(f"{source} {len(found)}" for source, found in jobs.items()))
+    for error in errors[:10]:
+        logger.warning(f"⚠️ Replay failed for {error}")
+    return {"jobs": jobs, "pages": len(tasks), "errors": len(errors), "seconds": seconds}
@@ -0,0 +1,194 @@
+"""
+Per-source scheduling for JobBot
+Each source gets its own next-run time, either from a cron expression or from an adaptive
+interval that shortens after runs that found new jobs and stretches after runs that didn't.
+A single dispatcher starts one due source at a time, spaced by a stagger gap, so browser
+and Notion budgets are never all spent at once.
+"""
+import os
+import json
+import random
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from config_loader import get_config
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "source_schedule.json"
+
+DEFAULT_SCHEDULE = {
+    "mode": "cron",             # "cron" or "adaptive"
+    "cron": None,               # Defaults to scheduler.cron
+    "jitter_seconds": 300,      # Random offset added to every next-run time
+    "min_interval_hours": 4,    # Adaptive bounds
+    "max_interval_hours": 72,
+    "initial_interval_hours": 24,
+    "speedup": 0.5,             # Interval multiplier after a run that found new jobs
+    "backoff": 1.5,             # Interval multiplier after a run that found nothing new or failed
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _parse_time(value: Optional[str]) -> Optional[datetime]:
+    return datetime.fromisoformat(value) if value else None
+
+
+class SourceSchedule:
+    """Next-run times and adaptive intervals for every source, persisted across restarts"""
+
+    def __init__(self, path: Optional[str] = None):
+        config = get_config()
+        self.path = path or config.get_data_path(STATE_FILE)
+        self.settings = config.get_scheduler_settings()
+        self.stagger = timedelta(seconds=float(self.settings.get("stagger_seconds", 600)))
+        self._lock = threading.Lock()
+        self._state: Dict[str, Dict[str, Any]] = self._load()
+        self._last_dispatch_end: Optional[datetime] = None
+
+    # Persistence
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        try:
+            with open(self.path, "r") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logger.warning(f"⚠️ Could not read source schedule state: {e}")
+            return {}
+
+    def _save(self):
+        try:
+            # Written aside and swapped in, so a crash or a second writer never leaves a truncated file
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self._state, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not persist source schedule state: {e}")
+
+    def reload(self):
+        """Re-read state another process may have written (call while holding the run lease)"""
+        with self._lock:
+            self._state = self._load()
+            # Runs finished by other processes count towards the stagger gap too
+            for entry in self._state.values():
+                last_run = _parse_time(entry.get("last_run"))
+                if last_run and (self._last_dispatch_end is None or last_run > self._last_dispatch_end):
+                    self._last_dispatch_end = last_run
+
+    # Settings
+    def schedule_settings(self, name: str) -> Dict[str, Any]:
+        """Global defaults from `scheduler`, overridden by the scraper's own `schedule` block"""
+        defaults = {key: self.settings[key] for key in DEFAULT_SCHEDULE if key in self.settings}
+        overrides = get_config().get_scraper_settings(name).get("schedule") or {}
+        schedule = {**DEFAULT_SCHEDULE, **defaults, **overrides}
+        schedule["cron"] = schedule["cron"] or get_config().get_cron_schedule()
+        return schedule
+
+    def _jitter(self, schedule: Dict[str, Any]) -> timedelta:
+        return timedelta(seconds=random.uniform(0, float(schedule["jitter_seconds"] or 0)))
+
+    def _next_cron_time(self, schedule: Dict[str, Any], after: datetime) -> datetime:
+        from apscheduler.triggers.cron import CronTrigger
+
+        trigger = CronTrigger.from_crontab(schedule["cron"], timezone=get_config().get_timezone())
+        return trigger.get_next_fire_time(None, after).astimezone(timezone.utc)
+
+    def _entry(self, name: str, schedule: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self._state.setdefault(name, {})
+        entry.setdefault("interval_hours", float(schedule["initial_interval_hours"]))
+        return entry
+
+    def _compute_next_run(self, name: str, entry: Dict[str, Any], after: datetime) -> datetime:
+        schedule = self.schedule_settings(name)
+        if schedule["mode"] == "adaptive":
+            base = after + timedelta(hours=entry["interval_hours"])
+        else:
+            base = self._next_cron_time(schedule, after)
+        return base + self._jitter(schedule)
+
+    # Scheduling
+    def plan(self, names: List[str]):
+        """Give every source without a pending next run one, staggering the first runs"""
+        with self._lock:
+            now = _now()
+            planned = 0
+            for name in names:
+                schedule = self.schedule_settings(name)
+                entry = self._entry(name, schedule)
+                if entry.get("next_run"):
+                    continue
+                if schedule["mode"] == "adaptive":
+                    # New adaptive sources start soon, one stagger gap apart
+                    next_run = now + self.stagger * planned + self._jitter(schedule)
+                else:
+                    next_run = self._compute_next_run(name, entry, now)
+                entry["next_run"] = next_run.isoformat()
+                planned += 1
+            if planned:
+                self._save()
+
+    def due_source(self, names: List[str]) -> Optional[str]:
+        """The most overdue source, or None if nothing is due or the stagger gap hasn't passed"""
+        now = _now()
+        if self._last_dispatch_end and now - self._last_dispatch_end < self.stagger:
+            return None
+        with self._lock:
+            due = [
+                (_parse_time(self._state[name]["next_run"]), name)
+                for name in names
+                if name in self._state and self._state[name].get("next_run")
+                and _parse_time(self._state[name]["next_run"]) <= now
+            ]
+        return min(due)[1] if due else None
+
+    def record_run(self, name: str, status: str, new_jobs: int):
+        """Adapt the source's interval to the run's yield and schedule its next run"""
+        with self._lock:
+            schedule = self.schedule_settings(name)
+            entry = self._entry(name, schedule)
+            now = _now()
+            if status != "skipped":
+                # Failed runs back off like empty ones, so a broken source isn't hammered
+                factor = schedule["speedup"] if status == "ok" and new_jobs > 0 else schedule["backoff"]
+                entry["interval_hours"] = min(
+                    float(schedule["max_interval_hours"]),
+                    max(float(schedule["min_interval_hours"]), entry["interval_hours"] * factor),
+                )
+            entry.update({
+                "last_run": now.isoformat(),
+                "last_status": status,
+                "last_new_jobs": new_jobs,
+                "next_run": self._compute_next_run(name, entry, now).isoformat(),
+            })
+            self._last_dispatch_end = now
+            self._save()
+            if schedule["mode"] == "adaptive":
+                logger.info(f"📈 {name}: {new_jobs} new jobs, polling every {entry['interval_hours']:.1f}h, "
+                            f"next run {entry['next_run']}")
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                name: {**entry, "mode": self.schedule_settings(name)["mode"]}
+                for name, entry in self._state.items()
+            }
+
+
+_schedule: Optional[SourceSchedule] = None
+_schedule_lock = threading.Lock()
+
+
+def get_source_schedule() -> SourceSchedule:
+    """Get the process-wide source schedule (singleton pattern)"""
+    global _schedule
+    with _schedule_lock:
+        if _schedule is None:
+            _schedule = SourceSchedule()
+        return _schedule
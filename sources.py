@@ -0,0 +1,295 @@
+"""
+Source registry for JobBot
+Maps source names to scraper entry points that are imported only when a run needs them
+"""
+import time
+import logging
+import importlib
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from config_loader import get_config
+from events import publish
+from job_record import to_job_records
+from resilience import CircuitBreaker, RetryPolicy, get_breaker
+
+logger = logging.getLogger(__name__)
+
+
+# Built-in sources. Entry points are "module:function" strings so that nothing
+# (Playwright, credentials, HTTP clients) is touched until a source actually runs.
+# Any of these keys can be overridden per scraper in config.yaml, and new sources
+# can be added there by giving them an `entrypoint`.
+# Browser sources default to no retries (a second SSO attempt rarely helps and costs minutes)
+# and run in a supervised worker process (`isolation: process`) so Chromium can't take the API down.
+# An `async_entrypoint` (a coroutine taking on_job) lets the worker run several browser
+# sources concurrently on one event loop instead of one after another.
+SOURCES: Dict[str, Dict[str, Any]] = {
+    "builtin": {
+        "label": "BuiltIn",
+        "entrypoint": "builtin_scraper:scrape_builtin_pm_internships",
+        "timeout": 120,
+        "retry": {"attempts": 3, "base_delay": 2, "max_delay": 30},
+    },
+    "linkedin": {
+        "label": "LinkedIn",
+        "entrypoint": "linkedin_scraper:scrape_linkedin_pm_internships",
+        "timeout": 240,  # Leaves room for detail enrichment at LinkedIn's slower crawl rate
+        "retry": {"attempts": 2, "base_delay": 5, "max_delay": 30},
+    },
+    "cms": {
+        "label": "CMS (12twenty)",
+        "entrypoint": "CMS_scraper:login_and_scrape",
+        "async_entrypoint": "CMS_scraper:login_and_scrape_async",
+        "timeout": 300,
+        "latency_budget": 150,  # Seconds; a slower run arms trace/HAR capture for the next one
+        "isolation": "process",
+        "retry": {"attempts": 1},
+    },
+    "handshake": {
+        "label": "Handshake",
+        "entrypoint": "handshake_scraper:login_and_scrape",
+        "async_entrypoint": "handshake_scraper:login_and_scrape_async",
+        "timeout": 600,
+        "latency_budget": 300,
+        "isolation": "process",
+        "retry": {"attempts": 1},
+    },
+}
+
+_loaded: Dict[str, Callable[[], List[Dict[str, Any]]]] = {}
+_loaded_async: Dict[str, Callable[..., Awaitable[List[Dict[str, Any]]]]] = {}
+
+
+def get_source_spec(name: str) -> Dict[str, Any]:
+    """Get the registry entry for a source, with config.yaml overrides applied"""
+    spec = dict(SOURCES.get(name, {}))
+    settings = get_config().get_scraper_settings(name)
+    # API mode has no browser context to trace, so its runs never arm slow-run forensics
+    if settings.get("mode") == "api":
+        spec.pop("latency_budget", None)
+    for key in ("label", "entrypoint", "async_entrypoint", "timeout", "isolation", "latency_budget"):
+        if settings.get(key) is not None:
+            spec[key] = settings[key]
+    for key in ("retry", "circuit_breaker"):
+        spec[key] = {**spec.get(key, {}), **(settings.get(key) or {})}
+    spec.setdefault("label", name)
+    spec.setdefault("timeout", 300)
+    spec.setdefault("isolation", "thread")
+    return spec
+
+
+def get_source_names() -> List[str]:
+    """Get every known source: built-ins first, then config-only sources"""
+    names = list(SOURCES.keys())
+    for name in get_config().get_scraper_names():
+        if name not in names and get_config().get_scraper_settings(name).get("entrypoint"):
+            names.append(name)
+    return names
+
+
+def get_enabled_sources() -> List[str]:
+    """Get the sources enabled in config, in registry order"""
+    config = get_config()
+    return [name for name in get_source_names() if config.is_scraper_enabled(name)]
+
+
+def get_loaded_sources() -> List[str]:
+    """Get the sources whose modules have been imported in this process"""
+    return list(dict.fromkeys([*_loaded, *_loaded_async]))
+
+
+def get_source_breaker(name: str) -> CircuitBreaker:
+    """Get the circuit breaker guarding a source"""
+    return get_breaker(name, get_source_spec(name)["circuit_breaker"])
+
+
+def _import_entrypoint(name: str, entrypoint: Optional[str]) -> Callable:
+    if not entrypoint or ":" not in entrypoint:
+        raise ValueError(f"Source '{name}' has no valid entrypoint (expected 'module:function')")
+    module_name, func_name = entrypoint.split(":", 1)
+    logger.debug(f"📦 Importing {module_name} for source '{name}'")
+    module = importlib.import_module(module_name)
+    return getattr(module, func_name)
+
+
+def load_source(name: str) -> Callable[[], List[Dict[str, Any]]]:
+    """Import a source's scraper module and return its entry point"""
+    if name not in _loaded:
+        _loaded[name] = _import_entrypoint(name, get_source_spec(name).get("entrypoint"))
+    return _loaded[name]
+
+
+def load_async_source(name: str) -> Optional[Callable[..., Awaitable[List[Dict[str, Any]]]]]:
+    """Import a source's async entry point, or None if it only has a sync one"""
+    entrypoint = get_source_spec(name).get("async_entrypoint")
+    if not entrypoint:
+        return None
+    if name not in _loaded_async:
+        _loaded_async[name] = _import_entrypoint(name, entrypoint)
+    return _loaded_async[name]
+
+
+class SourceTimeoutError(Exception):
+    """Raised when a source run exceeds its timeout"""
+
+
+def _call_with_timeout(name: str, timeout: float) -> Tuple[List[Dict[str, Any]], Dict[str, Any]]:
+    """Run a source's entry point, giving up on it after `timeout` seconds. Returns (jobs, stats)."""
+    if get_source_spec(name)["isolation"] == "process":
+        from browser_worker import WorkerTimeoutError, get_browser_pool
+        try:
+            return get_browser_pool().run(name, timeout)
+        except WorkerTimeoutError as e:
+            raise SourceTimeoutError(str(e))
+
+    func = load_source(name)
+    # Run in a dedicated worker thread so a hung call can't block the caller past its timeout.
+    # The thread can't be killed, but it is abandoned and the run moves on.
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"source-{name}")
+    try:
+        return executor.submit(func).result(timeout=timeout) or [], {}
+    except FutureTimeoutError:
+        raise SourceTimeoutError(f"timed out after {timeout}s")
+    finally:
+        executor.shutdown(wait=False)
+
+
+def _new_result(name: str, spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "source": name,
+        "label": spec["label"],
+        "status": "ok",
+        "jobs": [],
+        "count": 0,
+        "error": None,
+        "duration": 0.0,
+        "attempts": 0,
+    }
+
+
+def _breaker_allows(breaker: CircuitBreaker, result: Dict[str, Any]) -> bool:
+    """Check a source's breaker, marking the result skipped if its circuit is open"""
+    if breaker.allow_request():
+        return True
+    result["status"] = "skipped"
+    result["error"] = f"circuit open, next probe in {int(breaker.retry_after())}s"
+    logger.warning(f"⛔ Skipping {result['label']}: {result['error']}")
+    return False
+
+
+def run_source(name: str, timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Run a single source and return a uniform result:
+    {"source", "label", "status", "jobs", "count", "error", "duration", "attempts"}
+    where "jobs" is a list of validated JobRecords,
+    plus "peak_rss_mb" for sources run in a worker process
+    status is one of "ok", "error", "timeout" or "skipped" (circuit open)
+    """
+    spec = get_source_spec(name)
+    timeout = timeout if timeout is not None else spec["timeout"]
+    result = _new_result(name, spec)
+
+    breaker = get_source_breaker(name)
+    if not _breaker_allows(breaker, result):
+        return result
+
+    publish("source", source=name, stage="started")
+    # A half-open breaker gets exactly one probe, never a retry burst
+    policy = RetryPolicy.from_settings(spec["retry"])
+    max_attempts = 1 if breaker.is_probe else None
+
+    def attempt():
+        result["attempts"] += 1
+        return _call_with_timeout(name, timeout)
+
+    started = time.monotonic()
+    try:
+        jobs, stats = policy.call(attempt, label=f"{spec['label']} scraper",
+                                  give_up_on=(SourceTimeoutError,), max_attempts=max_attempts)
+        if "peak_rss_mb" in stats:
+            result["peak_rss_mb"] = stats["peak_rss_mb"]
+        # Validated once here; every later stage works with JobRecords
+        result["jobs"] = to_job_records(jobs, name)
+        result["count"] = len(result["jobs"])
+        breaker.record_success()
+    except SourceTimeoutError as e:
+        result["status"] = "timeout"
+        result["error"] = str(e)
+        breaker.record_failure(result["error"])
+        logger.error(f"⏱️ {spec['label']} scraper {e}")
+    except Exception as e:
+        result["status"] = "error"
+        result["error"] = str(e)
+        breaker.record_failure(result["error"])
+        logger.exception(f"❌ {spec['label']} scraper failed: {e}")
+    finally:
+        result["duration"] = round(time.monotonic() - started, 2)
+
+    _publish_finished(result)
+    return result
+
+
+def _publish_finished(result: Dict[str, Any]):
+    publish("source", source=result["source"], stage="finished",
+            **{key: result[key] for key in ("status", "count", "duration", "error")})
+
+
+def _batchable(spec: Dict[str, Any]) -> bool:
+    """Single-attempt async browser sources can share one worker run"""
+    return (spec["isolation"] == "process" and bool(spec.get("async_entrypoint"))
+            and int(spec["retry"].get("attempts", 1)) <= 1)
+
+
+def run_sources(names: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Run several sources and return {name: result} in the given order. Async browser sources
+    run concurrently in a single worker (one event loop, shared Chromium budget); everything
+    else goes through run_source() one at a time.
+    """
+    names = list(names)
+    specs = {name: get_source_spec(name) for name in names}
+    results: Dict[str, Dict[str, Any]] = {}
+
+    batchable = [name for name in names if _batchable(specs[name])]
+    if len(batchable) > 1:
+        batch, breakers = {}, {}
+        for name in batchable:
+            result = results[name] = _new_result(name, specs[name])
+            breakers[name] = get_source_breaker(name)
+            if _breaker_allows(breakers[name], result):
+                batch[name] = specs[name]["timeout"]
+
+        if batch:
+            from browser_worker import get_browser_pool
+
+            logger.info(f"🔍 Running {', '.join(batch)} concurrently in one browser worker...")
+            found = dict.fromkeys(batch, 0)
+            for name in batch:
+                publish("source", source=name, stage="started")
+
+            def on_job(name, job):
+                # Progress while the worker is still scraping; jobs are validated once it is done
+                found[name] += 1
+                publish("source", source=name, stage="found", count=found[name], title=job.get("title", ""))
+
+            outcomes, stats = get_browser_pool().run_batch(batch, on_job)
+            for name, outcome in outcomes.items():
+                result, breaker = results[name], breakers[name]
+                result.update(attempts=1, duration=outcome["duration"], peak_rss_mb=stats["peak_rss_mb"])
+                if outcome["status"] == "ok":
+                    result["jobs"] = to_job_records(outcome["jobs"], name)
+                    result["count"] = len(result["jobs"])
+                    breaker.record_success()
+                else:
+                    result["status"] = "timeout" if outcome["status"] == "timeout" else "error"
+                    result["error"] = outcome["error"]
+                    breaker.record_failure(outcome["error"])
+                    logger.error(f"❌ {result['label']} scraper failed: {outcome['error']}")
+                _publish_finished(result)
+
+    for name in names:
+        if name not in results:
+            logger.info(f"🔍 Running {name} scraper...")
+            results[name] = run_source(name)
+    return {name: results[name] for name in names}
@@ -0,0 +1,235 @@
+"""
+Pluggable job storage for JobBot
+Each run's JobBatch is written to one primary sink, selected by storage.sink.backend:
+"notion" (the default: per-page writes through the durable outbox), "postgres" (one bulk
+COPY + upsert per batch over pooled connections) or a "module:Class" JobSink. With a
+non-Notion primary, Notion can stay on as a downstream mirror (storage.sink.notion_mirror).
+store_batch() is the one write path for a batch, shared by server runs and `jobbot merge`.
+"""
+import os
+import logging
+import importlib
+import threading
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from config_loader import get_config
+from events import publish
+from job_record import JOB_FIELDS, JobBatch
+
+logger = logging.getLogger(__name__)
+
+
+class JobSink(ABC):
+    """Interface for job storage (whether a posting is new is answered by the local job index)"""
+
+    name = "sink"
+
+    @abstractmethod
+    def write_batch(self, batch: JobBatch) -> Dict[str, int]:
+        """Store a run's jobs; returns at least inserted/updated/unchanged/failed counts"""
+
+    def stats(self) -> Dict[str, Any]:
+        return {}
+
+
+class NotionSink(JobSink):
+    """Notion pages, written one by one through the outbox"""
+
+    name = "notion"
+
+    def write_batch(self, batch: JobBatch) -> Dict[str, int]:
+        from outbox import get_outbox
+        # Persist the batch before any Notion call, so a crash mid-push resumes from the outbox.
+        # Only pages that are new or whose fields changed cost a Notion write.
+        outbox = get_outbox()
+        outbox.enqueue(batch)
+        return outbox.drain()
+
+    def stats(self) -> Dict[str, Any]:
+        from outbox import get_outbox
+        return {"outbox": get_outbox().stats()}
+
+
+_PG_TABLE = """
+CREATE TABLE IF NOT EXISTS {table} (
+    canonical_id TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    title TEXT NOT NULL,
+    company TEXT NOT NULL DEFAULT '',
+    location TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    description TEXT NOT NULL DEFAULT '',
+    posted_date TEXT NOT NULL DEFAULT '',
+    seniority TEXT NOT NULL DEFAULT '',
+    employment_type TEXT NOT NULL DEFAULT '',
+    scraped_at TEXT NOT NULL,
+    first_seen_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)
+"""
+
+# Fields a rescrape may change; an empty scraped value never overwrites a stored one
+_PG_MUTABLE = ("title", "company", "location", "url", "description", "posted_date", "seniority", "employment_type")
+
+
+class PostgresSink(JobSink):
+    """
+    Jobs in a Postgres table keyed by canonical ID. A batch is streamed with COPY into a
+    temporary staging table and merged with a single INSERT ... ON CONFLICT DO UPDATE, in
+    one transaction on a pooled connection.
+    """
+
+    name = "postgres"
+
+    def __init__(self, dsn: Optional[str] = None, table: str = "jobs", pool_size: int = 5, max_overflow: int = 5):
+        from sqlalchemy import create_engine
+
+        dsn = dsn or os.getenv("DATABASE_URL")
+        if not dsn:
+            raise RuntimeError("DATABASE_URL (or storage.sink.dsn) is not set")
+        # psycopg 3 driver: SQLAlchemy owns the pool, psycopg's cursor.copy() does the bulk load
+        if dsn.startswith(("postgres://", "postgresql://")):
+            dsn = "postgresql+psycopg://" + dsn.split("://", 1)[1]
+        self.table = table
+        self.engine = create_engine(dsn, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+        with self.engine.begin() as conn:
+            conn.exec_driver_sql(_PG_TABLE.format(table=table))
+
+    def _upsert_sql(self) -> str:
+        columns = ", ".join(JOB_FIELDS)
+        updates = ", ".join(
+            f"{field} = COALESCE(NULLIF(EXCLUDED.{field}, ''), {self.table}.{field})" for field in _PG_MUTABLE
+        )
+        changed = " OR ".join(
+            f"(EXCLUDED.{field} <> '' AND EXCLUDED.{field} IS DISTINCT FROM {self.table}.{field})" for field in _PG_MUTABLE
+        )
+        # DISTINCT ON: a batch may carry the same posting twice, which ON CONFLICT can't merge
+        return (
+            f"INSERT INTO {self.table} ({columns}) "
+            f"SELECT DISTINCT ON (canonical_id) {columns} FROM jobs_staging ORDER BY canonical_id "
+            f"ON CONFLICT (canonical_id) DO UPDATE SET {updates}, updated_at = now() WHERE {changed} "
+            f"RETURNING canonical_id, (xmax = 0) AS inserted"
+        )
+
+    def write_batch(self, batch: JobBatch) -> Dict[str, int]:
+        report = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 0}
+        if not len(batch):
+            return report
+        records = {record.canonical_id: record for record in batch}
+        try:
+            with self.engine.begin() as conn:
+                raw = conn.connection.driver_connection
+                with raw.cursor() as cursor:
+                    cursor.execute(f"CREATE TEMP TABLE jobs_staging (LIKE {self.table} INCLUDING DEFAULTS) ON COMMIT DROP")
+                    with cursor.copy(f"COPY jobs_staging ({', '.join(JOB_FIELDS)}) FROM STDIN") as copy:
+                        for row in batch.rows(JOB_FIELDS):
+                            copy.write_row(row)
+                    cursor.execute(self._upsert_sql())
+                    written = cursor.fetchall()
+        except Exception as e:
+            logger.exception(f"❌ Postgres batch write failed: {e}")
+            report["failed"] = len(records)
+            return report
+
+        for canonical_id, inserted in written:
+            outcome = "inserted" if inserted else "updated"
+            report[outcome] += 1
+            publish("job", sink=self.name, outcome=outcome, **records[canonical_id].to_dict())
+        report["unchanged"] = len(records) - len(written)
+        logger.info(f"🐘 Postgres: {report['inserted']} inserted, {report['updated']} updated, "
+                    f"{report['unchanged']} unchanged in one batch")
+        return report
+
+    def stats(self) -> Dict[str, Any]:
+        return {"table": self.table, "pool": self.engine.pool.status()}
+
+
+_sinks: Optional[List[JobSink]] = None
+_unavailable: Dict[str, str] = {}
+_sinks_lock = threading.Lock()
+
+
+def _build_sink(backend: str, settings: Dict[str, Any]) -> JobSink:
+    if backend == "notion":
+        return NotionSink()
+    if backend == "postgres":
+        return PostgresSink(dsn=settings.get("dsn"), table=settings.get("table", "jobs"),
+                            pool_size=settings.get("pool_size", 5), max_overflow=settings.get("max_overflow", 5))
+    module_name, class_name = backend.split(":", 1)
+    return getattr(importlib.import_module(module_name), class_name)()
+
+
+def get_sinks() -> List[JobSink]:
+    """
+    The primary sink, followed by the Notion mirror when it is enabled (singleton pattern).
+    If the primary can't be built, Notion takes the batches so no run is lost; the primary
+    is reported as unavailable and retried only after a restart.
+    """
+    global _sinks
+    with _sinks_lock:
+        if _sinks is None:
+            settings = get_config().get_sink_settings()
+            backend = settings.get("backend", "notion")
+            sinks: List[JobSink] = []
+            try:
+                sinks.append(_build_sink(backend, settings))
+            except Exception as e:
+                logger.exception(f"❌ Could not start the {backend} sink; falling back to Notion: {e}")
+                _unavailable[backend] = str(e)
+            if not sinks or (backend != "notion" and settings.get("notion_mirror", True)):
+                sinks.append(NotionSink())
+            _sinks = sinks
+        return _sinks
+
+
+def unavailable_sinks() -> Dict[str, str]:
+    """Configured sinks that failed to start, with their errors"""
+    return dict(_unavailable)
+
+
+def sink_stats() -> Dict[str, Any]:
+    """Stats of the sinks built so far; never connects to anything itself"""
+    stats: Dict[str, Any] = {name: {"error": error} for name, error in _unavailable.items()}
+    stats.update({sink.name: sink.stats() for sink in _sinks or []})
+    return stats
+
+
+def store_batch(all_jobs: JobBatch) -> Dict[str, Any]:
+    """
+    Write a batch of JobRecords to the local search index, the run history and every sink.
+    Returns {"new": unseen postings per source, "indexed", "sinks": per-sink reports}.
+    """
+    # Bulk write every scraped posting to the local search index, noting which ones are new
+    new_counts = {}
+    try:
+        from job_index import ingest_jobs, unseen_jobs
+        for source in unseen_jobs(all_jobs).column("source"):
+            new_counts[source] = new_counts.get(source, 0) + 1
+        indexed = ingest_jobs(all_jobs)
+    except Exception as e:
+        logger.exception(f"❌ Failed to index jobs locally: {e}")
+        indexed = 0
+
+    # Append the batch to the Parquet run history for analytics
+    history = get_config().get_history_settings()
+    if history.get("enabled", True):
+        try:
+            from run_history import append_batch, compact_old_partitions
+            append_batch(all_jobs)
+            compact_old_partitions(history.get("compact_after_days", 1))
+        except Exception as e:
+            logger.exception(f"❌ Failed to write run history: {e}")
+
+    # The primary sink stores the batch; Notion may follow as a downstream mirror
+    failed = {"inserted": 0, "updated": 0, "unchanged": 0, "failed": len(all_jobs)}
+    sinks = get_sinks()
+    # A primary that couldn't start is reported first, as failed; Notion has stood in for it
+    sink_reports = {name: dict(failed, error=error) for name, error in unavailable_sinks().items()}
+    for sink in sinks:
+        try:
+            sink_reports[sink.name] = sink.write_batch(all_jobs)
+        except Exception as e:
+            logger.exception(f"❌ {sink.name} sink failed: {e}")
+            sink_reports[sink.name] = dict(failed, error=str(e))
+    return {"new": new_counts, "indexed": indexed, "sinks": sink_reports}
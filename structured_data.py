@@ -0,0 +1,208 @@
+"""
+Structured job data for JobBot
+Many job pages embed a schema.org JobPosting, as JSON-LD or as microdata, with the title,
+hiring organization, location and posting date. This finds those blobs straight in the page
+source, without building a DOM: the JSON-LD scripts come out with a regex, and microdata is
+read with a streaming parser that only runs when the page declares a JobPosting itemtype.
+Scrapers try it first and fall back to their selectors when a page has none.
+"""
+import re
+import json
+import html
+import logging
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+POSTING_FIELDS = ("title", "company", "location", "url", "description", "posted_date", "employment_type")
+
+_JSON_LD = re.compile(r"<script[^>]*type\s*=\s*[\"']?application/ld\+json[\"']?[^>]*>(.*?)</script>",
+                      re.IGNORECASE | re.DOTALL)
+_MICRODATA_POSTING = re.compile(r"itemtype\s*=\s*[\"']?https?://schema\.org/JobPosting", re.IGNORECASE)
+_TAG = re.compile(r"<[^>]+>")
+_BLOCK_TAG = re.compile(r"<\s*(?:br|/p|/li|/div|/h\d)\b[^>]*>", re.IGNORECASE)
+_ISO_DATE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+# schema.org employmentType values, as the other sources word them
+_EMPLOYMENT_TYPES = {
+    "FULL_TIME": "Full-time", "PART_TIME": "Part-time", "CONTRACTOR": "Contract",
+    "TEMPORARY": "Temporary", "INTERN": "Internship", "VOLUNTEER": "Volunteer",
+    "PER_DIEM": "Per diem", "OTHER": "Other",
+}
+
+
+def _type_names(node: Dict[str, Any]) -> List[str]:
+    types = node.get("@type", [])
+    types = types if isinstance(types, list) else [types]
+    return [str(t).rsplit("/", 1)[-1] for t in types]
+
+
+def _walk(node: Any) -> Iterator[Dict[str, Any]]:
+    """Every JSON-LD object, including those nested in @graph, ItemLists and arrays"""
+    if isinstance(node, list):
+        for item in node:
+            yield from _walk(item)
+    elif isinstance(node, dict):
+        yield node
+        for key in ("@graph", "itemListElement", "item", "mainEntity"):
+            if key in node:
+                yield from _walk(node[key])
+
+
+def iter_json_ld(page_html: str) -> Iterator[Dict[str, Any]]:
+    """Parsed JSON-LD objects embedded in a page; malformed blobs are skipped"""
+    for match in _JSON_LD.finditer(page_html or ""):
+        raw = match.group(1).strip()
+        # Some sites wrap the JSON in an HTML comment or CDATA section
+        raw = re.sub(r"^(?:<!--|<!\[CDATA\[)|(?:-->|\]\]>)$", "", raw).strip()
+        try:
+            data = json.loads(raw, strict=False)
+        except ValueError as e:
+            logger.debug(f"⚠️ Skipping malformed JSON-LD block: {e}")
+            continue
+        yield from _walk(data)
+
+
+def _text(value: Any) -> str:
+    """Plain text from a JSON-LD value: first item of a list, name of an object, tags stripped"""
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if isinstance(value, dict):
+        value = value.get("name") or value.get("@value") or ""
+    value = _BLOCK_TAG.sub("\n", str(value or ""))
+    value = html.unescape(_TAG.sub(" ", value))
+    return "\n".join(" ".join(line.split()) for line in value.splitlines() if line.strip())
+
+
+def _place(place: Any) -> str:
+    """"City, ST" from a Place / PostalAddress (or whatever a site put there)"""
+    if not isinstance(place, dict):
+        return _text(place)
+    address = place.get("address", place)
+    if not isinstance(address, dict):
+        return _text(address)
+    parts = [_text(address.get(key)) for key in ("addressLocality", "addressRegion")]
+    parts = [part for part in parts if part]
+    if not parts:
+        parts = [part for part in (_text(address.get("addressCountry")), _text(place.get("name"))) if part]
+    return ", ".join(parts)
+
+
+def _location(posting: Dict[str, Any]) -> str:
+    places = posting.get("jobLocation") or []
+    places = places if isinstance(places, list) else [places]
+    locations = [location for location in (_place(place) for place in places) if location]
+    if "TELECOMMUTE" in str(posting.get("jobLocationType", "")).upper():
+        locations.append("Remote")
+    # "; " keeps "City, ST" pairs apart for the location parser
+    return "; ".join(dict.fromkeys(locations))
+
+
+def _employment_type(value: Any) -> str:
+    values = value if isinstance(value, list) else [value]
+    names = [_EMPLOYMENT_TYPES.get(str(v).upper().replace("-", "_"), _text(v)) for v in values if v]
+    return ", ".join(name for name in names if name)
+
+
+def normalize_posting(posting: Dict[str, Any]) -> Dict[str, str]:
+    """A schema.org JobPosting as a scraper job dict (POSTING_FIELDS, "" when absent)"""
+    posted = _text(posting.get("datePosted"))
+    return {
+        "title": _text(posting.get("title") or posting.get("name")),
+        "company": _text(posting.get("hiringOrganization")),
+        "location": _location(posting),
+        "url": _text(posting.get("url")),
+        "description": _text(posting.get("description")),
+        "posted_date": posted[:10] if _ISO_DATE.match(posted) else posted,
+        "employment_type": _employment_type(posting.get("employmentType")),
+    }
+
+
+class _MicrodataParser(HTMLParser):
+    """Collects itemscope objects as nested dicts, the way JSON-LD would express them"""
+
+    _VOID = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+    _URL_ATTRS = {"a": "href", "link": "href", "area": "href", "img": "src", "source": "src"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.items: List[Dict[str, Any]] = []
+        self._depth = 0
+        self._scopes: List[tuple] = []     # (depth, item)
+        self._captures: List[list] = []    # [depth, item, prop, text parts]
+
+    def _add(self, item: Dict[str, Any], prop: str, value: Any):
+        for name in prop.split():
+            item.setdefault(name, value)
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        prop = attrs.get("itemprop")
+        parent = self._scopes[-1][1] if self._scopes else None
+        void = tag in self._VOID
+
+        if "itemscope" in attrs:
+            item = {"@type": attrs.get("itemtype", "")}
+            if prop and parent is not None:
+                self._add(parent, prop, item)
+            else:
+                self.items.append(item)
+            if not void:
+                self._scopes.append((self._depth, item))
+        elif prop and parent is not None:
+            value = attrs.get("content") or attrs.get("datetime") or attrs.get(self._URL_ATTRS.get(tag, ""))
+            if value is not None:
+                self._add(parent, prop, value)
+            elif not void:
+                self._captures.append([self._depth, parent, prop, []])
+        if not void:
+            self._depth += 1
+
+    def handle_endtag(self, tag):
+        if tag in self._VOID:
+            return
+        self._depth = max(0, self._depth - 1)
+        while self._captures and self._captures[-1][0] >= self._depth:
+            _, item, prop, parts = self._captures.pop()
+            self._add(item, prop, " ".join("".join(parts).split()))
+        while self._scopes and self._scopes[-1][0] >= self._depth:
+            self._scopes.pop()
+
+    def handle_data(self, data):
+        for capture in self._captures:
+            capture[3].append(data)
+
+
+def iter_microdata(page_html: str) -> Iterator[Dict[str, Any]]:
+    """Top-level microdata items (and their nested items) of a page that declares a JobPosting"""
+    if not page_html or not _MICRODATA_POSTING.search(page_html):
+        return
+    parser = _MicrodataParser()
+    try:
+        parser.feed(page_html)
+        parser.close()
+    except Exception as e:
+        logger.debug(f"⚠️ Could not read microdata: {e}")
+    for item in parser.items:
+        yield from _walk(item)
+
+
+def extract_job_postings(page_html: str) -> List[Dict[str, str]]:
+    """Every JobPosting embedded in a page, normalized; [] when the page has none"""
+    postings = []
+    for source in (iter_json_ld(page_html), iter_microdata(page_html)):
+        for node in source:
+            if "JobPosting" in _type_names(node):
+                postings.append(normalize_posting(node))
+        if postings:
+            break
+    return postings
+
+
+def extract_job_posting(page_html: str) -> Optional[Dict[str, str]]:
+    """The page's own JobPosting (the first one with a title), or None"""
+    for posting in extract_job_postings(page_html):
+        if posting["title"]:
+            return posting
+    return None
@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import config_loader  # noqa: E402
+
+# The shipped config, whatever directory pytest runs from
+config_loader._config_instance = config_loader.Config(os.path.join(ROOT, "config.yaml"))
+
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Every test gets its own data directory for SQLite state"""
+    monkeypatch.setenv("JOBBOT_DATA_DIR", str(tmp_path))
+    return tmp_path
@@ -0,0 +1,86 @@
+import json
+
+import pytest
+
+pytest.importorskip("bs4")
+
+from builtin_scraper import parse_search_page
+
+
+def posting(title, url="", company="Acme", location=""):
+    blob = {"@type": "JobPosting", "title": title, "hiringOrganization": {"name": company}, "url": url}
+    if location:
+        blob["jobLocation"] = {"address": {"addressLocality": location}}
+    return f'<script type="application/ld+json">{json.dumps(blob)}</script>'
+
+
+def card(title, href="", company="Acme", locations=()):
+    link = f' href="{href}"' if href else ""
+    tooltip = "".join(f"<div>{location}</div>" for location in locations)
+    where = f'<span data-bs-toggle="tooltip" data-bs-title="{tooltip}"></span>' if locations else ""
+    return (f'<div data-id="job-card"><a data-id="job-card-title"{link}>{title}</a>'
+            f'<a data-id="company-title"><span>{company}</span></a>{where}</div>')
+
+
+def page(*parts):
+    return f"<html><body>{''.join(parts)}</body></html>"
+
+
+def test_structured_data_alone_when_it_covers_every_card():
+    jobs = parse_search_page(page(posting("PM Intern", "/job/1", location="Chicago"), card("PM Intern", "/job/1")))
+    assert [(job["title"], job["url"], job["location"]) for job in jobs] == [
+        ("PM Intern", "https://builtin.com/job/1", "Chicago"),
+    ]
+
+
+def test_cards_without_a_posting_are_kept():
+    jobs = parse_search_page(page(
+        posting("PM Intern", "/job/1"),
+        card("PM Intern", "/job/1"),
+        card("APM Intern", "/job/2", company="Beta", locations=["Austin, TX"]),
+    ))
+    assert [(job["title"], job["company"], job["url"], job["location"]) for job in jobs] == [
+        ("PM Intern", "Acme", "https://builtin.com/job/1", "N/A"),
+        ("APM Intern", "Beta", "https://builtin.com/job/2", "Austin, TX"),
+    ]
+
+
+def test_posting_without_url_is_merged_with_its_card_by_title():
+    jobs = parse_search_page(page(
+        posting("PM Intern", company="Acme"),
+        card("pm  intern", "/job/1", company="ACME", locations=["Remote"]),
+    ))
+    assert len(jobs) == 1
+    assert jobs[0]["title"] == "PM Intern"
+    assert jobs[0]["url"] == "https://builtin.com/job/1"
+    assert jobs[0]["location"] == "Remote"
+
+
+def test_same_title_at_another_company_is_not_merged():
+    jobs = parse_search_page(page(
+        posting("PM Intern", "/job/1", company="Acme"),
+        card("PM Intern", "/job/1"),
+        card("PM Intern", "/job/2", company="Beta"),
+    ))
+    assert [(job["company"], job["url"]) for job in jobs] == [
+        ("Acme", "https://builtin.com/job/1"),
+        ("Beta", "https://builtin.com/job/2"),
+    ]
+
+
+def test_structured_fields_win_over_card_placeholders():
+    jobs = parse_search_page(page(
+        posting("PM Intern", "/job/1", company="Acme", location="Chicago"),
+        card("PM Intern", "/job/1", company="Unknown"),
+        card("Other Intern", "/job/3"),
+    ))
+    assert (jobs[0]["company"], jobs[0]["location"]) == ("Acme", "Chicago")
+    assert len(jobs) == 2
+
+
+def test_cards_only_page():
+    jobs = parse_search_page(page(card("PM Intern", "/job/1"), card("No Link Intern")))
+    assert [(job["title"], job["url"], job["location"]) for job in jobs] == [
+        ("PM Intern", "https://builtin.com/job/1", "N/A"),
+        ("No Link Intern", "", "N/A"),
+    ]
@@ -0,0 +1,73 @@
+import base64
+import json
+
+import pytest
+
+from job_index import _decode_cursor, ingest_jobs, search_jobs, unseen_jobs
+from job_record import JobBatch, JobRecord
+
+
+def batch(*titles, source="builtin"):
+    return JobBatch.from_records(
+        JobRecord.from_scraped({"title": title, "company": f"Company {i}", "location": "Chicago, IL"}, source)
+        for i, title in enumerate(titles)
+    )
+
+
+def cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def test_unseen_jobs_and_upsert():
+    jobs = batch("Product Manager Intern", "Data Analyst")
+    assert len(unseen_jobs(jobs)) == 2
+    assert ingest_jobs(jobs) == 2
+    assert len(unseen_jobs(jobs)) == 0
+    # Re-ingesting updates rows instead of duplicating them
+    ingest_jobs(jobs)
+    assert search_jobs()["count"] == 2
+
+
+def test_search_ranks_and_filters():
+    ingest_jobs(batch("Product Manager Intern", "Data Analyst", "Software Engineer"))
+    ingest_jobs(batch("Product Designer", source="linkedin"))
+
+    titles = [row["title"] for row in search_jobs(q="product")["results"]]
+    assert sorted(titles) == ["Product Designer", "Product Manager Intern"]
+    # The last term matches as a prefix
+    assert [row["title"] for row in search_jobs(q="soft")["results"]] == ["Software Engineer"]
+    assert [row["title"] for row in search_jobs(q="product", source="linkedin")["results"]] == ["Product Designer"]
+    assert search_jobs(q="!!!")["count"] == 4
+
+
+@pytest.mark.parametrize("q", ["", "intern"])
+def test_cursor_pages_through_every_result(q):
+    ingest_jobs(batch(*(f"Intern {i}" for i in range(7))))
+    seen, next_cursor = [], ""
+    while True:
+        page = search_jobs(q=q, limit=3, cursor=next_cursor)
+        seen += [row["canonical_id"] for row in page["results"]]
+        next_cursor = page["next_cursor"]
+        if not next_cursor:
+            break
+    assert len(seen) == 7
+    assert len(set(seen)) == 7
+
+
+@pytest.mark.parametrize("value", [
+    "not base64!",
+    cursor({"rank": 1}),
+    cursor([1]),
+    cursor([1, 2, 3]),
+    cursor([True, 1]),
+    cursor([[1], 2]),
+    cursor([None, 2]),
+])
+def test_invalid_cursors_raise_value_error(value):
+    with pytest.raises(ValueError):
+        _decode_cursor(value)
+
+
+def test_valid_cursor_round_trips():
+    assert _decode_cursor(cursor(["2025-01-01T00:00:00+00:00", 5])) == ["2025-01-01T00:00:00+00:00", 5]
+    assert _decode_cursor(cursor([-1.5, 5])) == [-1.5, 5]
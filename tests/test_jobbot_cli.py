@@ -0,0 +1,75 @@
+import json
+import os
+
+import pytest
+
+import config_loader
+import jobbot
+from config_loader import Config
+from job_record import JobRecord
+from search_queries import parse_shard, shard_of
+
+
+def record(**fields):
+    return JobRecord.from_scraped({"title": "Product Intern", "company": "Acme", **fields}, "builtin",
+                                  "2025-09-01T00:00:00+00:00")
+
+
+def test_parse_shard():
+    assert parse_shard("2/4") == (2, 4)
+    for value in ("0/4", "5/4", "two/4", "2"):
+        with pytest.raises(ValueError):
+            parse_shard(value)
+
+
+def test_shards_split_queries_evenly():
+    queries = list(range(10))
+    shards = [shard_of(queries, (index, 4)) for index in range(1, 5)]
+    assert shards[0] == [0, 4, 8]
+    assert sorted(item for shard in shards for item in shard) == queries
+    assert shard_of([None], (2, 4)) == []
+
+
+def test_shipped_config_runs_one_search_per_source():
+    for source in ("builtin", "linkedin"):
+        assert jobbot.shard_has_work(source, (1, 4))
+        assert not any(jobbot.shard_has_work(source, (index, 4)) for index in range(2, 5))
+
+
+def test_sharded_overrides_give_every_workflow_shard_work(monkeypatch):
+    root = os.path.dirname(config_loader.__file__)
+    config = Config(os.path.join(root, "config.yaml"), os.path.join(root, "config.sharded.yaml"))
+    monkeypatch.setattr(config_loader, "_config_instance", config)
+    for source in ("builtin", "linkedin"):
+        assert all(jobbot.shard_has_work(source, (index, 4)) for index in range(1, 5))
+    # Everything else still comes from config.yaml
+    assert config.is_scraper_enabled("linkedin")
+    assert config.get_scraper_settings("linkedin")["enrich"]["enabled"]
+
+
+def test_merge_records_fills_missing_fields():
+    first = record(url="https://example.com/1")
+    second = record(location="Chicago, IL", description="Ship things")
+    other = record(title="Data Intern")
+    merged = jobbot.merge_records([first, second, other])
+    assert len(merged) == 2
+    assert merged[0].location == "Chicago, IL"
+    assert merged[0].description == "Ship things"
+    assert merged[0].url == "https://example.com/1"
+    assert merged[1] == other
+
+
+def test_merge_command_reads_jsonl_and_json(tmp_path):
+    lines = tmp_path / "shard-1.jsonl"
+    lines.write_text(json.dumps(record().to_dict()) + "\n\n")
+    array = tmp_path / "shard-2.json"
+    array.write_text(json.dumps([record(location="NYC").to_dict(), record(title="Data Intern").to_dict()]))
+    out = tmp_path / "merged.jsonl"
+
+    assert jobbot.main(["merge", str(lines), str(array), "--dry-run", "--out", str(out)]) == 0
+    rows = [json.loads(line) for line in out.read_text().splitlines()]
+    assert [(row["title"], row["location"]) for row in rows] == [("Product Intern", "NYC"), ("Data Intern", "")]
+
+
+def test_merge_command_reports_missing_files(tmp_path):
+    assert jobbot.main(["merge", str(tmp_path / "shard-*.jsonl"), "--dry-run"]) == 2
@@ -0,0 +1,98 @@
+import pytest
+
+import liveness
+from liveness import check_url
+
+
+class Response:
+    def __init__(self, status_code=200, url="", text="", headers=None, redirected=False):
+        self.status_code = status_code
+        self.url = url
+        self.text = text
+        self.headers = headers or {}
+        self.history = [object()] if redirected else []
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    """Queue of responses returned by fetch, with the calls that were made"""
+    queue, calls = [], []
+
+    def fetch(url, method="GET", **kwargs):
+        calls.append((method, kwargs.get("headers") or {}))
+        response = queue.pop(0)
+        response.url = response.url or url
+        return response
+
+    monkeypatch.setattr(liveness, "fetch", fetch)
+    return queue, calls
+
+
+LINKEDIN = "https://www.linkedin.com/jobs/view/123"
+COMPANY = "https://example.com/careers/42"
+
+
+def test_login_sources_are_skipped(responses):
+    assert check_url("https://app.joinhandshake.com/jobs/1")["status"] == "unknown"
+    assert check_url("")["reason"] == "no url"
+    assert responses[1] == []
+
+
+def test_gone_status_is_closed(responses):
+    queue, calls = responses
+    queue.append(Response(404))
+    assert check_url(LINKEDIN) == {"status": "closed", "reason": "HTTP 404"}
+    assert len(calls) == 1
+
+
+def test_redirect_to_search_is_closed(responses):
+    queue, _ = responses
+    queue.append(Response(200, url="https://www.linkedin.com/jobs/search/?keywords=pm", redirected=True))
+    assert check_url(LINKEDIN)["status"] == "closed"
+
+
+def test_redirect_to_another_posting_is_not_closed(responses):
+    queue, _ = responses
+    queue.append(Response(200, url="https://example.com/careers?gh_jid=42", redirected=True))
+    queue.append(Response(200, text="Apply now"))
+    assert check_url(COMPANY)["status"] == "live"
+
+
+def test_unredirected_listing_url_is_not_closed(responses):
+    queue, _ = responses
+    queue.append(Response(200))
+    queue.append(Response(200, text="Apply now"))
+    assert check_url("https://example.com/jobs/")["status"] == "live"
+
+
+def test_closed_marker_in_page_text(responses):
+    queue, calls = responses
+    queue.append(Response(200))
+    queue.append(Response(200, text="This job is No Longer Accepting Applications", headers={"ETag": '"v2"'}))
+    result = check_url(LINKEDIN, etag='"v1"')
+    assert result["status"] == "closed"
+    assert result["etag"] == '"v2"'
+    assert calls[1] == ("GET", {"If-None-Match": '"v1"'})
+
+
+def test_not_modified_is_live(responses):
+    queue, _ = responses
+    queue.append(Response(200))
+    queue.append(Response(304))
+    result = check_url(LINKEDIN, etag='"v1"', last_modified="Mon, 01 Sep 2025 00:00:00 GMT")
+    assert result["status"] == "live"
+    assert result["last_modified"] == "Mon, 01 Sep 2025 00:00:00 GMT"
+
+
+def test_head_refused_falls_back_to_get(responses):
+    queue, calls = responses
+    queue.append(Response(405))
+    queue.append(Response(410))
+    assert check_url(LINKEDIN)["status"] == "closed"
+    assert [method for method, _ in calls] == ["HEAD", "GET"]
+
+
+def test_server_errors_are_unknown(responses):
+    queue, _ = responses
+    queue.append(Response(503))
+    assert check_url(LINKEDIN)["status"] == "unknown"
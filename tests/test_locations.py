@@ -0,0 +1,51 @@
+import pytest
+
+from locations import LocationFilter, matches_location, parse_location
+
+
+@pytest.mark.parametrize("text, metros, states", [
+    ("San Francisco, CA", {"sf-bay-area"}, {"CA"}),
+    ("Palo Alto, CA", {"sf-bay-area"}, {"CA"}),
+    ("Washington, DC", {"washington-dc"}, {"DC"}),
+    ("Seattle, WA", {"seattle"}, {"WA"}),
+    ("Arlington, VA", {"washington-dc"}, {"DC", "VA"}),
+    # An explicit state beats a metro alias from another state
+    ("Portland, ME", set(), {"ME"}),
+    ("Kansas City, MO", set(), {"MO"}),
+    ("Hybrid - Chicago, IL 60601", {"chicago"}, {"IL"}),
+])
+def test_parse_location_areas(text, metros, states):
+    parsed = parse_location(text)
+    assert parsed.metros == metros
+    assert parsed.states == states
+
+
+def test_parse_location_work_modes():
+    assert parse_location("Orlando, FL (On-site)").onsite
+    assert parse_location("Orlando, FL (On-site)").states == {"FL"}
+    assert parse_location("Kansas City, MO - Hybrid").hybrid
+    remote = parse_location("Remote - US")
+    assert remote.remote and not remote.metros and not remote.states
+    either = parse_location("New York, NY or Remote")
+    assert either.remote and either.metros == {"nyc"}
+
+
+def test_location_filter():
+    area = LocationFilter(["San Francisco, CA", "Chicago, IL", "New York, NY"], ["onsite", "hybrid"])
+    assert area.matches("Oakland, CA")
+    assert area.matches("Hybrid - Chicago, IL 60601")
+    assert not area.matches("Seattle, WA")
+    assert not area.matches("Remote - US")
+    # Unparseable locations are kept
+    assert area.matches("")
+    assert area.matches("Somewhere")
+
+    state = LocationFilter(["California, United States"], ["onsite", "remote"])
+    assert state.matches("Los Angeles, CA")
+    assert state.matches("Remote - US")
+    assert not state.matches("Kansas City, MO - Hybrid")
+
+
+def test_shipped_config_keeps_every_location():
+    assert matches_location("Seattle, WA")
+    assert matches_location("Remote - US")
@@ -0,0 +1,74 @@
+import pytest
+
+pytest.importorskip("notion_client")
+
+import notion_mirror  # noqa: E402
+from notion_mirror import NotionMirror  # noqa: E402
+
+
+def page(page_id, title, edited, **extra):
+    return {
+        "id": page_id,
+        "last_edited_time": edited,
+        "properties": {
+            "Job Title": {"title": [{"plain_text": title}]},
+            "Company": {"rich_text": [{"plain_text": "Acme"}]},
+            "Location": {"rich_text": []},
+            "Application URL": {"url": f"https://example.com/jobs/{page_id}"},
+        },
+        **extra,
+    }
+
+
+class NotFound(Exception):
+    code = "object_not_found"
+
+
+@pytest.fixture
+def notion(monkeypatch):
+    """Fake database: query returns live pages only, retrieve returns any page"""
+    pages = {}
+
+    def query(filter=None, sorts=None):
+        since = (filter or {}).get("last_edited_time", {}).get("on_or_after", "")
+        return [p for p in pages.values() if not p.get("archived") and p["last_edited_time"] >= since]
+
+    def retrieve(page_id):
+        if page_id not in pages:
+            raise NotFound()
+        return pages[page_id]
+
+    monkeypatch.setattr(notion_mirror, "query_notion_pages", query)
+    monkeypatch.setattr(notion_mirror, "retrieve_notion_page", retrieve)
+    return pages
+
+
+def test_delta_refresh_notices_archived_pages(notion, tmp_path):
+    for i in range(3):
+        notion[f"p{i}"] = page(f"p{i}", f"Job {i}", f"2025-09-0{i + 1}T00:00:00.000Z")
+    mirror = NotionMirror(str(tmp_path / "mirror.db"), probe_pages=2)
+    assert mirror.refresh()["mode"] == "full"
+    assert mirror.stats()["live_pages"] == 3
+
+    notion["p0"]["archived"] = True
+    del notion["p2"]
+    notion["p3"] = page("p3", "Job 3", "2025-09-05T00:00:00.000Z")
+
+    first = mirror.refresh()
+    second = mirror.refresh()
+    assert first["mode"] == second["mode"] == "delta"
+    assert first["archived"] + second["archived"] == 2
+    assert {entry["page_id"] for entry in mirror.index().values()} == {"p1", "p3"}
+
+
+def test_probe_stops_on_api_errors(notion, tmp_path, monkeypatch):
+    notion["p0"] = page("p0", "Job 0", "2025-09-01T00:00:00.000Z")
+    mirror = NotionMirror(str(tmp_path / "mirror.db"))
+    mirror.refresh()
+
+    def retrieve(page_id):
+        raise ConnectionError("Notion is down")
+
+    monkeypatch.setattr(notion_mirror, "retrieve_notion_page", retrieve)
+    assert mirror.refresh()["archived"] == 0
+    assert mirror.stats()["live_pages"] == 1
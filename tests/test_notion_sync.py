@@ -0,0 +1,96 @@
+import pytest
+
+pytest.importorskip("notion_client")
+
+import notion_sync  # noqa: E402
+from job_record import JobRecord  # noqa: E402
+from notion_sync import NotionSync, diff_fields  # noqa: E402
+
+STORED = {"title": "Product Intern", "company": "Acme", "location": "Chicago, IL",
+          "url": "https://example.com/jobs/1"}
+
+
+class FakeMirror:
+    def __init__(self, index):
+        self._index = index
+        self.upserted, self.archived = [], []
+
+    def refresh(self):
+        pass
+
+    def index(self):
+        return self._index
+
+    def upsert_page(self, page):
+        self.upserted.append(page)
+
+    def mark_archived(self, page_id):
+        self.archived.append(page_id)
+
+
+class ArchivedError(Exception):
+    code = "validation_error"
+
+    def __str__(self):
+        return "Can't edit block that is archived."
+
+
+def record(**fields):
+    return JobRecord.from_scraped({**STORED, **fields}, "builtin")
+
+
+def test_diff_fields_only_reports_real_changes():
+    assert diff_fields(STORED, dict(STORED)) == {}
+    assert diff_fields(STORED, {**STORED, "location": "New York, NY"}) == {"location": "New York, NY"}
+    # Placeholders never overwrite stored values
+    assert diff_fields(STORED, {**STORED, "company": "Unknown", "location": "N/A"}) == {}
+    # Tracking parameters and trailing slashes on the stored URL aren't changes
+    stored = {**STORED, "url": "https://example.com/jobs/1/?utm_source=x"}
+    assert diff_fields(stored, STORED) == {}
+
+
+@pytest.fixture
+def notion(monkeypatch):
+    calls = {"create": [], "update": []}
+
+    def push(fields):
+        calls["create"].append(fields)
+        return {"id": "new-page"}
+
+    def update(page_id, properties):
+        calls["update"].append((page_id, properties))
+        return {"id": page_id}
+
+    monkeypatch.setattr(notion_sync, "push_job_to_notion", push)
+    monkeypatch.setattr(notion_sync, "update_notion_page", update)
+    return calls
+
+
+def test_sync_inserts_updates_and_skips(notion):
+    job = record()
+    mirror = FakeMirror({job.canonical_id: {"page_id": "page-1", "fields": dict(STORED)}})
+    sync = NotionSync(mirror)
+
+    assert sync.sync_job(job) == "unchanged"
+    assert sync.sync_job(record(location="New York, NY")) == "updated"
+    assert [page_id for page_id, _ in notion["update"]] == ["page-1"]
+    assert len(notion["update"][0][1]) == 1
+    # The local index follows the update, so the same change isn't sent twice
+    assert sync.sync_job(record(location="New York, NY")) == "unchanged"
+
+    assert sync.sync_job(record(title="Data Intern")) == "inserted"
+    assert sync.sync_job(record(company="N/A")) == "skipped"
+    assert [page["id"] for page in mirror.upserted] == ["page-1", "new-page"]
+
+
+def test_update_of_archived_page_re_adds_the_job(notion, monkeypatch):
+    def update(page_id, properties):
+        raise ArchivedError()
+
+    monkeypatch.setattr(notion_sync, "update_notion_page", update)
+    job = record()
+    mirror = FakeMirror({job.canonical_id: {"page_id": "page-1", "fields": dict(STORED)}})
+
+    assert NotionSync(mirror).sync_job(record(location="New York, NY")) == "inserted"
+    assert mirror.archived == ["page-1"]
+    assert notion["create"][0]["location"] == "New York, NY"
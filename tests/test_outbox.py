@@ -0,0 +1,132 @@
+import sqlite3
+
+import outbox as outbox_module
+from job_record import JobRecord
+from outbox import Outbox
+
+
+class FakeSync:
+    """Stands in for NotionSync: outcomes by title, raising `error` for titles in `failing`"""
+
+    def __init__(self, failing=(), error=ValueError("rejected"), index_error=None):
+        self.report = {"inserted": 0, "updated": 0, "unchanged": 0, "skipped": 0, "failed": 0}
+        self.failing = set(failing)
+        self.error = error
+        self.index_error = index_error
+        self.synced = []
+
+    def load_index(self):
+        if self.index_error:
+            raise self.index_error
+        return {}
+
+    def sync_job(self, record):
+        if record.title in self.failing:
+            raise self.error
+        self.synced.append(record)
+        return "inserted"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def records(*titles):
+    return [JobRecord.from_scraped({"title": title, "company": "Acme"}, "builtin") for title in titles]
+
+
+def make_outbox(tmp_path, monkeypatch, **kwargs):
+    clock = Clock()
+    monkeypatch.setattr(outbox_module.time, "time", clock)
+    return Outbox(str(tmp_path / "outbox.db"), **kwargs), clock
+
+
+def test_enqueue_is_keyed_by_canonical_id(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    assert outbox.enqueue(records("A", "B")) == 2
+    assert outbox.enqueue(records("A")) == 1
+    assert outbox.pending_count() == 2
+    assert outbox.enqueue([]) == 0
+
+
+def test_drain_removes_synced_jobs(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue(records("A", "B"))
+    sync = FakeSync()
+    report = outbox.drain(sync)
+    assert report["inserted"] == 2
+    assert [record.title for record in sync.synced] == ["A", "B"]
+    assert outbox.stats() == {"pending": 0, "failed": 0}
+
+
+def test_retries_wait_at_least_half_the_backoff(tmp_path, monkeypatch):
+    outbox, clock = make_outbox(tmp_path, monkeypatch, retry={"base_delay": 60, "max_delay": 3600})
+    outbox.enqueue(records("A"))
+    outbox.drain(FakeSync(failing={"A"}))
+
+    clock.now += 29
+    assert outbox.pending_count(due_only=True) == 0
+    assert outbox.drain(FakeSync())["deferred"] == 1
+    clock.now += 31
+    assert outbox.drain(FakeSync())["inserted"] == 1
+
+
+def test_jobs_are_parked_after_failing_for_park_after_hours(tmp_path, monkeypatch):
+    outbox, clock = make_outbox(tmp_path, monkeypatch, park_after_hours=1, retry={"base_delay": 60, "max_delay": 60})
+    outbox.enqueue(records("A", "B"))
+
+    report = outbox.drain(FakeSync(failing={"B"}))
+    assert (report["inserted"], report["failed"], report["retrying"], report["dead"]) == (1, 1, 1, 0)
+
+    # Many quick failures aren't enough; the hour since the first one is
+    for _ in range(10):
+        clock.now += 60
+        assert outbox.drain(FakeSync(failing={"B"}))["dead"] == 0
+    clock.now += 3000
+    assert outbox.drain(FakeSync(failing={"B"}))["dead"] == 1
+    assert outbox.stats() == {"pending": 0, "failed": 1}
+
+    # A parked job is no longer drained, until a newer scrape queues it again
+    assert outbox.drain(FakeSync())["inserted"] == 0
+    outbox.enqueue(records("B"))
+    assert outbox.drain(FakeSync())["inserted"] == 1
+    assert outbox.stats() == {"pending": 0, "failed": 0}
+
+
+def test_outage_stops_the_drain(tmp_path, monkeypatch):
+    outbox, clock = make_outbox(tmp_path, monkeypatch)
+    outbox.enqueue(records("A", "B", "C"))
+
+    sync = FakeSync(failing={"A", "B", "C"}, error=ConnectionError("Notion is down"))
+    report = outbox.drain(sync)
+    assert (report["failed"], report["deferred"]) == (1, 2)
+
+    # Only the job that hit the outage is charged an attempt
+    conn = sqlite3.connect(outbox.path)
+    attempts = dict(conn.execute("SELECT payload, attempts FROM outbox").fetchall()).values()
+    conn.close()
+    assert sorted(attempts) == [0, 0, 1]
+
+
+def test_unreadable_index_defers_the_whole_drain(tmp_path):
+    outbox = Outbox(str(tmp_path / "outbox.db"))
+    outbox.enqueue(records("A", "B"))
+    report = outbox.drain(FakeSync(index_error=RuntimeError("NOTION_API_KEY is not set")))
+    assert (report["failed"], report["deferred"]) == (0, 2)
+    assert outbox.pending_count(due_only=True) == 2
+
+
+def test_old_outbox_files_are_migrated(tmp_path):
+    path = str(tmp_path / "outbox.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE outbox (canonical_id TEXT PRIMARY KEY, payload TEXT NOT NULL, "
+                 "status TEXT NOT NULL DEFAULT 'pending', attempts INTEGER NOT NULL DEFAULT 0, last_error TEXT, "
+                 "enqueued_at REAL NOT NULL, next_attempt_at REAL NOT NULL)")
+    conn.close()
+    outbox = Outbox(path)
+    outbox.enqueue(records("A"))
+    assert outbox.drain(FakeSync(failing={"A"}))["retrying"] == 1
@@ -0,0 +1,107 @@
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, RetryPolicy
+
+
+def test_retry_policy_retries_until_success(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise ConnectionError("down")
+        return "ok"
+
+    assert RetryPolicy(attempts=3).call(flaky) == "ok"
+    assert len(calls) == 3
+
+
+def test_retry_policy_gives_up(monkeypatch):
+    monkeypatch.setattr(resilience.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def broken():
+        calls.append(1)
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        RetryPolicy(attempts=3).call(broken)
+    assert len(calls) == 3
+
+    calls.clear()
+    with pytest.raises(ConnectionError):
+        RetryPolicy(attempts=3).call(broken, give_up_on=(ConnectionError,))
+    assert len(calls) == 1
+
+    calls.clear()
+    with pytest.raises(ConnectionError):
+        RetryPolicy(attempts=3).call(broken, max_attempts=2)
+    assert len(calls) == 2
+
+
+def test_retry_delay_is_capped():
+    policy = RetryPolicy.from_settings({"attempts": 5, "base_delay": 2, "max_delay": 5})
+    assert policy.attempts == 5
+    for attempt in range(1, 10):
+        assert 0 <= policy.delay(attempt) <= 5
+
+
+def test_breaker_opens_after_threshold():
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown_seconds=60)
+    breaker.record_failure("one")
+    assert breaker.allow_request()
+    breaker.record_failure("two")
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert 0 < breaker.retry_after() <= 60
+    assert breaker.snapshot()["last_error"] == "two"
+
+
+def test_breaker_half_open_allows_one_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(resilience.time, "time", lambda: now[0])
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown_seconds=60)
+    breaker.record_failure("down")
+
+    now[0] += 61
+    assert breaker.allow_request()
+    assert breaker.is_probe
+    assert not breaker.allow_request()
+
+    # A failed probe reopens at once; a successful one closes
+    breaker.record_failure("still down")
+    assert breaker.state == CircuitBreaker.OPEN
+    now[0] += 61
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_breaker_restore_reopens_interrupted_probe():
+    breaker = CircuitBreaker("test")
+    breaker.restore({"state": "half_open", "consecutive_failures": 3, "opened_at": 1.0})
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.consecutive_failures == 3
+
+
+def test_breaker_state_survives_a_restart(monkeypatch, data_dir):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    breaker = resilience.get_breaker("cms", {"failure_threshold": 1})
+    breaker.record_failure("SSO timeout")
+    assert not list(data_dir.glob("*.tmp"))
+
+    monkeypatch.setattr(resilience, "_breakers", {})
+    restored = resilience.get_breaker("cms", {"failure_threshold": 1})
+    assert restored is not breaker
+    assert restored.state == CircuitBreaker.OPEN
+    assert restored.last_error == "SSO timeout"
+
+
+def test_equal_jitter_waits_at_least_half():
+    policy = RetryPolicy.from_settings({"base_delay": 10, "max_delay": 100, "jitter": "equal"})
+    for attempt in range(1, 6):
+        ceiling = min(100, 10 * 2 ** (attempt - 1))
+        assert ceiling / 2 <= policy.delay(attempt) <= ceiling
@@ -0,0 +1,64 @@
+import os
+
+import pytest
+
+import run_lease
+from run_lease import LeaseHeldError, RunLease, SQLiteLeaseBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    return SQLiteLeaseBackend(str(tmp_path / "leases.db"))
+
+
+def test_second_holder_is_refused(backend):
+    with RunLease("scrape", backend, ttl=60):
+        assert backend.holder("scrape") is not None
+        with pytest.raises(LeaseHeldError) as error:
+            with RunLease("scrape", backend, ttl=60):
+                pass
+        assert error.value.holder["owner"]
+        # Other names are independent
+        with RunLease("sweep", backend, ttl=60):
+            pass
+    assert backend.holder("scrape") is None
+
+
+def test_expired_lease_is_taken_over(backend):
+    assert backend.acquire("scrape", "elsewhere:1:abc", ttl=-1)
+    assert backend.holder("scrape") is None
+    with RunLease("scrape", backend, ttl=60) as lease:
+        assert backend.holder("scrape")["owner"] == lease.owner
+
+
+def test_dead_local_owner_is_taken_over(backend, monkeypatch):
+    host = run_lease.socket.gethostname()
+    assert backend.acquire("scrape", f"{host}:{os.getpid()}:abc", ttl=600)
+    # A live holder on this host keeps its lease
+    assert not backend.acquire("scrape", f"{host}:1:def", ttl=600)
+
+    def kill(pid, signal):
+        raise ProcessLookupError(pid)
+
+    monkeypatch.setattr(run_lease.os, "kill", kill)
+    assert backend.acquire("scrape", f"{host}:1:def", ttl=600)
+    assert backend.holder("scrape")["owner"] == f"{host}:1:def"
+
+
+def test_renew_and_release_need_the_owner(backend):
+    assert backend.acquire("scrape", "a:1:x", ttl=60)
+    assert not backend.renew("scrape", "b:2:y", ttl=60)
+    assert backend.renew("scrape", "a:1:x", ttl=60)
+    backend.release("scrape", "b:2:y")
+    assert backend.holder("scrape")["owner"] == "a:1:x"
+    backend.release("scrape", "a:1:x")
+    assert backend.holder("scrape") is None
+
+
+def test_backends_must_implement_the_interface():
+    class Partial(run_lease.LeaseBackend):
+        def acquire(self, name, owner, ttl):
+            return True
+
+    with pytest.raises(TypeError):
+        Partial()
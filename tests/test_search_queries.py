@@ -0,0 +1,84 @@
+import threading
+
+import pytest
+
+import search_queries
+from search_queries import dedupe_jobs, run_queries, search_urls
+
+
+def job(title, url="", company="Acme"):
+    return {"title": title, "company": company, "url": url}
+
+
+def test_dedupe_keeps_the_first_copy_in_order():
+    jobs = [
+        job("Product Intern", "https://www.linkedin.com/jobs/view/1?trk=a"),
+        job("Data Intern"),
+        job("Product Intern (renamed)", "https://www.linkedin.com/jobs/view/1?trk=b"),
+        job("data intern!"),
+    ]
+    assert dedupe_jobs(jobs) == [jobs[0], jobs[1]]
+
+
+def test_run_queries_merges_concurrent_results():
+    seen_threads = set()
+    barrier = threading.Barrier(2, timeout=5)
+
+    def search(url):
+        seen_threads.add(threading.current_thread().name)
+        barrier.wait()
+        return [job("Shared"), job(f"Only {url}")]
+
+    jobs = run_queries("builtin", ["q1", "q2"], search, max_workers=2)
+    assert [j["title"] for j in jobs] == ["Shared", "Only q1", "Only q2"]
+    assert len(seen_threads) == 2
+
+
+def test_run_queries_skips_failed_queries():
+    def search(url):
+        if url == "bad":
+            raise ConnectionError("blocked")
+        return [job(url)]
+
+    assert [j["title"] for j in run_queries("builtin", ["bad", "good"], search)] == ["good"]
+    with pytest.raises(ConnectionError):
+        run_queries("builtin", ["bad", "bad"], search)
+    assert run_queries("builtin", [], search) == []
+
+
+def test_search_urls_honours_the_shard(monkeypatch):
+    monkeypatch.setattr(search_queries.get_config(), "get_scraper_urls", lambda source: ["a", "b", "c"])
+    assert search_urls("builtin") == ["a", "b", "c"]
+    monkeypatch.setenv("JOBBOT_SHARD", "2/2")
+    assert search_urls("builtin") == ["b"]
+
+
+def test_search_urls_falls_back_to_the_default(monkeypatch):
+    monkeypatch.setattr(search_queries.get_config(), "get_scraper_urls", lambda source: [])
+    assert search_urls("builtin", "https://default") == ["https://default"]
+
+
+def test_scraper_urls_from_template_and_queries(tmp_path):
+    from config_loader import Config
+
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "job_search:\n"
+        "  title_keywords:\n"
+        "    - keywords: [product, intern]\n"
+        "scrapers:\n"
+        "  builtin:\n"
+        "    search_url: https://single\n"
+        "    search_urls: [https://extra]\n"
+        "    search_url_template: https://t?q={query}\n"
+        "    queries: [product intern, 'data & ai']\n"
+        "  linkedin:\n"
+        "    search_url_template: https://t?q={query}\n"
+        "  handshake:\n"
+        "    search_url: https://single\n"
+    )
+    config = Config(str(path))
+    assert config.get_scraper_urls("builtin") == ["https://extra", "https://t?q=product+intern", "https://t?q=data+%26+ai"]
+    # Without queries, one search per title keyword group
+    assert config.get_scraper_urls("linkedin") == ["https://t?q=product+intern"]
+    assert config.get_scraper_urls("handshake") == ["https://single"]
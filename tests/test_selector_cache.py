@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from selector_cache import SelectorCache
+
+CHAIN = ["span.primary-item-text", "a.job-title"]
+FALLBACKS = ["span", "a"]
+
+
+def probe_for(present, calls=None):
+    """A probe that matches only the selectors in `present`"""
+    async def probe(selector):
+        if calls is not None:
+            calls.append(selector)
+        return f"<{selector}>" if selector in present else None
+    return probe
+
+
+def lookup(cache, present, calls=None):
+    return asyncio.run(cache.first_match("cms", "title", CHAIN, probe_for(present, calls), FALLBACKS))
+
+
+def test_ordered_moves_the_learned_selector_first(tmp_path):
+    cache = SelectorCache(str(tmp_path / "cache.json"))
+    assert cache.ordered("cms", "title", CHAIN) == CHAIN
+    cache.record("cms", "title", "a.job-title", first_try=False)
+    assert cache.ordered("cms", "title", CHAIN) == ["a.job-title", "span.primary-item-text"]
+    # A learned selector that's no longer in the chain is ignored
+    cache.record("cms", "title", "td a", first_try=False)
+    assert cache.ordered("cms", "title", CHAIN) == CHAIN
+
+
+def test_first_match_learns_and_counts(tmp_path):
+    cache = SelectorCache(str(tmp_path / "cache.json"))
+    calls = []
+    assert lookup(cache, {"a.job-title", "span", "a"}, calls) == "<a.job-title>"
+    assert calls == CHAIN
+
+    calls.clear()
+    assert lookup(cache, {"a.job-title", "span", "a"}, calls) == "<a.job-title>"
+    assert calls == ["a.job-title"]
+
+    assert lookup(cache, set()) is None
+    assert cache._run["cms"]["title"] == {"hits": 1, "misses": 1, "empty": 1}
+
+
+def test_generic_fallbacks_are_never_learned(tmp_path):
+    cache = SelectorCache(str(tmp_path / "cache.json"))
+    assert lookup(cache, {"a.job-title"}) == "<a.job-title>"
+    # A row without the specific markup falls through to a generic selector...
+    assert lookup(cache, {"span", "a"}) == "<span>"
+    # ...which must not displace the specific one for the rows that have it
+    calls = []
+    assert lookup(cache, {"a.job-title", "span", "a"}, calls) == "<a.job-title>"
+    assert calls == ["a.job-title"]
+
+    fresh = SelectorCache(str(tmp_path / "empty.json"))
+    assert lookup(fresh, {"span", "a"}) == "<span>"
+    assert fresh.ordered("cms", "title", CHAIN) == CHAIN
+
+
+def test_flush_persists_learned_selectors_and_totals(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = SelectorCache(str(path))
+    lookup(cache, {"a.job-title"})
+    lookup(cache, {"a.job-title"})
+    cache.flush("cms")
+
+    stored = json.loads(path.read_text())["cms"]["title"]
+    assert stored["selector"] == "a.job-title"
+    assert (stored["hits"], stored["misses"]) == (1, 1)
+    assert not list(tmp_path.glob("*.tmp"))
+    assert SelectorCache(str(path)).ordered("cms", "title", CHAIN)[0] == "a.job-title"
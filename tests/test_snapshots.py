@@ -0,0 +1,69 @@
+import json
+import sqlite3
+
+import pytest
+
+pytest.importorskip("zstandard")
+
+from snapshots import SnapshotStore, replay
+
+
+def page(*titles):
+    postings = [{"@type": "JobPosting", "title": title, "hiringOrganization": {"name": "Acme"},
+                 "url": f"/job/{index}"} for index, title in enumerate(titles)]
+    return f'<script type="application/ld+json">{json.dumps(postings)}</script>'
+
+
+def seen(store, sha, first, last):
+    with sqlite3.connect(store.index_path) as conn:
+        conn.execute("UPDATE snapshots SET first_seen_at = ?, last_seen_at = ? WHERE sha = ?", (first, last, sha))
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snapshots"), level=1)
+
+
+def test_put_stores_identical_content_once(store):
+    first = store.put("builtin", "https://builtin.com/jobs?page=1", page("PM Intern"))
+    again = store.put("builtin", "https://builtin.com/jobs?page=1", page("PM Intern"))
+    elsewhere = store.put("builtin", "https://builtin.com/jobs?page=2", page("PM Intern"))
+    changed = store.put("builtin", "https://builtin.com/jobs?page=1", page("APM Intern"))
+
+    assert first == again == elsewhere != changed
+    assert store.get(first) == page("PM Intern")
+    assert store.stats() == {"builtin": {"captures": 3, "objects": 2, "fetches": 4}}
+
+
+def test_select_filters_by_source_and_window(store):
+    old = store.put("builtin", "https://builtin.com/a", page("Old"))
+    new = store.put("builtin", "https://builtin.com/b", page("New"))
+    other = store.put("linkedin", "https://linkedin.com/a", page("Other"))
+    dom = store.put("builtin", "https://builtin.com/a", "<html></html>", kind="dom")
+    seen(store, old, "2025-08-01T00:00:00+00:00", "2025-08-02T00:00:00+00:00")
+    seen(store, new, "2025-09-05T00:00:00+00:00", "2025-09-06T00:00:00+00:00")
+    seen(store, other, "2025-09-01T00:00:00+00:00", "2025-09-01T00:00:00+00:00")
+    seen(store, dom, "2025-09-01T00:00:00+00:00", "2025-09-01T00:00:00+00:00")
+
+    assert [row["sha"] for row in store.select()] == [old, other, new]
+    assert [row["sha"] for row in store.select(["builtin"])] == [old, new]
+    assert [row["sha"] for row in store.select(since="2025-09-01")] == [other, new]
+    assert [row["sha"] for row in store.select(until="2025-09-01")] == [old]
+    assert [row["sha"] for row in store.select(kind="dom")] == [dom]
+
+
+def test_replay_parses_and_dedupes_stored_pages(store):
+    pytest.importorskip("bs4")
+    store.put("builtin", "https://builtin.com/jobs?page=1", page("PM Intern", "APM Intern"))
+    store.put("builtin", "https://builtin.com/jobs?page=2", page("PM Intern"))
+    store.put("builtin", "https://builtin.com/jobs?page=3", "not a search page")
+
+    result = replay(["builtin"], workers=2, store=store)
+    assert result["pages"] == 3
+    assert result["errors"] == 0
+    assert sorted(job["title"] for job in result["jobs"]["builtin"]) == ["APM Intern", "PM Intern"]
+
+
+def test_replay_rejects_sources_without_a_parser(store):
+    with pytest.raises(ValueError):
+        replay(["cms"], store=store)
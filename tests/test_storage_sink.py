@@ -0,0 +1,87 @@
+import pytest
+
+import storage_sink
+from job_record import JobBatch, JobRecord
+from storage_sink import JobSink, NotionSink, PostgresSink, get_sinks, sink_stats, store_batch, unavailable_sinks
+
+
+class MemorySink(JobSink):
+    name = "memory"
+
+    def write_batch(self, batch):
+        return {"inserted": len(batch), "updated": 0, "unchanged": 0, "failed": 0}
+
+
+class BrokenSink(JobSink):
+    name = "broken"
+
+    def __init__(self):
+        raise RuntimeError("warehouse unreachable")
+
+    def write_batch(self, batch):
+        return {}
+
+
+@pytest.fixture
+def sink_config(monkeypatch):
+    """Fresh sink singletons, built from the settings this returns"""
+    monkeypatch.setattr(storage_sink, "_sinks", None)
+    monkeypatch.setattr(storage_sink, "_unavailable", {})
+    settings = {}
+    monkeypatch.setattr(storage_sink.get_config(), "get_sink_settings", lambda: settings)
+    return settings
+
+
+def test_default_sink_is_notion(sink_config):
+    assert [type(sink) for sink in get_sinks()] == [NotionSink]
+
+
+def test_custom_sink_with_notion_mirror(sink_config):
+    sink_config.update(backend="test_storage_sink:MemorySink")
+    assert [sink.name for sink in get_sinks()] == ["memory", "notion"]
+
+
+def test_custom_sink_without_mirror(sink_config):
+    sink_config.update(backend="test_storage_sink:MemorySink", notion_mirror=False)
+    assert [sink.name for sink in get_sinks()] == ["memory"]
+
+
+def test_unbuildable_primary_falls_back_to_notion(sink_config):
+    sink_config.update(backend="test_storage_sink:BrokenSink", notion_mirror=False)
+    assert [sink.name for sink in get_sinks()] == ["notion"]
+    assert unavailable_sinks() == {"test_storage_sink:BrokenSink": "warehouse unreachable"}
+    assert sink_stats()["test_storage_sink:BrokenSink"] == {"error": "warehouse unreachable"}
+
+
+def test_store_batch_reports_every_sink(sink_config, monkeypatch):
+    sink_config.update(backend="test_storage_sink:BrokenSink")
+    monkeypatch.setattr(storage_sink, "_sinks", [MemorySink()])
+    monkeypatch.setattr(storage_sink, "_unavailable", {"postgres": "no DSN"})
+    monkeypatch.setattr(storage_sink.get_config(), "get_history_settings", lambda: {"enabled": False})
+    batch = JobBatch.from_records(
+        JobRecord.from_scraped({"title": title, "company": "Acme"}, "builtin") for title in ("A", "B"))
+
+    stored = store_batch(batch)
+    assert stored["new"] == {"builtin": 2}
+    assert stored["indexed"] == 2
+    assert stored["sinks"]["memory"]["inserted"] == 2
+    assert stored["sinks"]["postgres"] == {"inserted": 0, "updated": 0, "unchanged": 0, "failed": 2, "error": "no DSN"}
+    # Indexed now, so nothing in the batch is new the second time
+    assert store_batch(batch)["new"] == {}
+
+
+def test_postgres_upsert_sql():
+    sink = PostgresSink.__new__(PostgresSink)
+    sink.table = "jobs"
+    sql = sink._upsert_sql()
+
+    assert "SELECT DISTINCT ON (canonical_id)" in sql
+    assert "ON CONFLICT (canonical_id) DO UPDATE SET" in sql
+    for field in storage_sink._PG_MUTABLE:
+        # An empty scraped value keeps the stored one, and only a real change counts as an update
+        assert f"{field} = COALESCE(NULLIF(EXCLUDED.{field}, ''), jobs.{field})" in sql
+        assert f"(EXCLUDED.{field} <> '' AND EXCLUDED.{field} IS DISTINCT FROM jobs.{field})" in sql
+    # A rescrape that only changes bookkeeping columns is "unchanged"
+    _, where = sql.split(" WHERE ", 1)
+    assert "scraped_at" not in where and "source" not in where
+    assert sql.endswith("RETURNING canonical_id, (xmax = 0) AS inserted")
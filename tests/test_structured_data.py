@@ -0,0 +1,73 @@
+import json
+
+from structured_data import extract_job_posting, extract_job_postings
+
+POSTING = {
+    "@context": "https://schema.org",
+    "@type": "JobPosting",
+    "title": "Product Manager Intern",
+    "hiringOrganization": {"@type": "Organization", "name": "Acme &amp; Co"},
+    "jobLocation": [
+        {"@type": "Place", "address": {"addressLocality": "Chicago", "addressRegion": "IL"}},
+        {"@type": "Place", "address": {"addressLocality": "Chicago", "addressRegion": "IL"}},
+    ],
+    "jobLocationType": "TELECOMMUTE",
+    "datePosted": "2025-09-01T08:00:00Z",
+    "employmentType": ["INTERN", "PART_TIME"],
+    "description": "<p>Ship things.</p><ul><li>Talk   to users</li></ul>",
+    "url": "https://example.com/jobs/1",
+}
+
+
+def page(*blobs):
+    scripts = "".join(f'<script type="application/ld+json">{blob}</script>' for blob in blobs)
+    return f"<html><head>{scripts}</head><body></body></html>"
+
+
+def test_json_ld_posting_is_normalized():
+    posting = extract_job_posting(page(json.dumps(POSTING)))
+    assert posting == {
+        "title": "Product Manager Intern",
+        "company": "Acme & Co",
+        "location": "Chicago, IL; Remote",
+        "url": "https://example.com/jobs/1",
+        "description": "Ship things.\nTalk to users",
+        "posted_date": "2025-09-01",
+        "employment_type": "Internship, Part-time",
+    }
+
+
+def test_nested_graph_and_malformed_blocks():
+    graph = {"@graph": [{"@type": "Organization", "name": "Acme"}, {"@type": ["JobPosting"], "title": "Analyst"}]}
+    postings = extract_job_postings(page("{not json", json.dumps(graph)))
+    assert [posting["title"] for posting in postings] == ["Analyst"]
+
+
+def test_microdata_posting():
+    html = """
+    <div itemscope itemtype="https://schema.org/JobPosting">
+      <h1 itemprop="title">Data <b>Analyst</b></h1>
+      <div itemprop="hiringOrganization" itemscope itemtype="https://schema.org/Organization">
+        <span itemprop="name">Acme</span>
+      </div>
+      <div itemprop="jobLocation" itemscope itemtype="https://schema.org/Place">
+        <div itemprop="address" itemscope itemtype="https://schema.org/PostalAddress">
+          <span itemprop="addressLocality">Austin</span>, <span itemprop="addressRegion">TX</span>
+        </div>
+      </div>
+      <meta itemprop="datePosted" content="2025-08-15">
+      <a itemprop="url" href="https://example.com/jobs/2">Apply</a>
+    </div>
+    """
+    posting = extract_job_posting(html)
+    assert posting["title"] == "Data Analyst"
+    assert posting["company"] == "Acme"
+    assert posting["location"] == "Austin, TX"
+    assert posting["posted_date"] == "2025-08-15"
+    assert posting["url"] == "https://example.com/jobs/2"
+
+
+def test_pages_without_postings():
+    assert extract_job_postings("") == []
+    assert extract_job_posting(page(json.dumps({"@type": "Organization", "name": "Acme"}))) is None
+    assert extract_job_posting('<div itemscope itemtype="https://schema.org/Person"></div>') is None